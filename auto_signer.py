@@ -1,9 +1,13 @@
 import os
-import json
-import time
-from datetime import datetime, time as dtime
-from dotenv import load_dotenv
-from cli import ensure_note_contents_file
+import sys
+import asyncio
+import argparse
+from datetime import datetime, timedelta, time as dtime
+from dotenv import load_dotenv, dotenv_values
+from note_store import NoteStore
+from keystore import Keystore, KEYSTORE_PATH
+from metrics import metrics, serve_metrics
+from partial_signatures import contribute, expire_signer_sets
 
 # Load config from .env
 load_dotenv()
@@ -12,25 +16,39 @@ SIGN_END = os.getenv("SIGN_END")
 SHARE_ID = os.getenv("SHARE_ID")
 
 SECRETS_DIR = "keys"
-MESSAGES_FILE = "note_contents.txt"
 LOG_FILE = "signed_notes.log"
 
-def is_signing_allowed():
-    now = datetime.now().time()
-    start_hour, start_minute = map(int, SIGN_START.split(":"))
-    end_hour, end_minute = map(int, SIGN_END.split(":"))
-    return dtime(start_hour, start_minute) <= now <= dtime(end_hour, end_minute)
+# The daemon polls the store quickly right after a change and backs off while idle.
+POLL_MIN_INTERVAL = 0.005
+POLL_MAX_INTERVAL = 0.05
+# How often an idle daemon looks for signer sets that timed out.
+EXPIRE_INTERVAL = 30.0
 
-def load_note_contents():
-    if not os.path.exists(MESSAGES_FILE):
-        return []
-    with open(MESSAGES_FILE, "r") as f:
-        return [json.loads(line) for line in f if line.strip()]
+def parse_window(sign_start, sign_end):
+    start_hour, start_minute = map(int, sign_start.split(":"))
+    end_hour, end_minute = map(int, sign_end.split(":"))
+    return dtime(start_hour, start_minute), dtime(end_hour, end_minute)
 
-def save_note_contents(note_contents):
-    with open(MESSAGES_FILE, "w") as f:
-        for note in note_contents:
-            f.write(json.dumps(note) + "\n")
+def is_signing_allowed(sign_start=None, sign_end=None, now=None):
+    start, end = parse_window(sign_start or SIGN_START, sign_end or SIGN_END)
+    now = (now or datetime.now()).time()
+    return start <= now <= end
+
+def seconds_until_window_opens(sign_start, sign_end, now=None):
+    now = now or datetime.now()
+    if is_signing_allowed(sign_start, sign_end, now):
+        return 0.0
+    start, _ = parse_window(sign_start, sign_end)
+    opens = datetime.combine(now.date(), start)
+    if opens <= now:
+        opens += timedelta(days=1)
+    return (opens - now).total_seconds()
+
+def seconds_until_window_closes(sign_start, sign_end, now=None):
+    now = now or datetime.now()
+    _, end = parse_window(sign_start, sign_end)
+    closes = datetime.combine(now.date(), end)
+    return max((closes - now).total_seconds(), 0.0)
 
 def log_action(message):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -39,46 +57,160 @@ def log_action(message):
         log.write(entry + "\n")
     print(entry)
 
-def sign_pending_notes():
-    if not SHARE_ID:
+def signer_config(values=None):
+    """Signer settings (share_id, sign_start, sign_end) from a dotenv mapping or the environment."""
+    values = os.environ if values is None else values
+    return {
+        "share_id": values.get("SHARE_ID"),
+        "sign_start": values.get("SIGN_START"),
+        "sign_end": values.get("SIGN_END"),
+    }
+
+def check_share(share_id):
+    if not share_id:
         log_action("❌ SHARE_ID is not defined in .env")
-        return
+        return False
+
+    share_path = os.path.join(SECRETS_DIR, share_id, "secret_share.txt")
+    if os.path.exists(share_path):
+        return True
+    if os.path.exists(KEYSTORE_PATH) and share_id.isdigit():
+        with Keystore(KEYSTORE_PATH) as keystore:
+            if int(share_id) in keystore:
+                return True
+    log_action("❌ Share file not found at {}".format(share_path))
+    return False
+
+def sign_notes_with_share(store, share_id):
+    """One pass over the pending notes; returns how many this share committed to or signed."""
+    signed = progress = 0
+    with metrics.span("auto_sign", share=share_id):
+        for note_id in store.pending_ids_without_share(share_id):
+            try:
+                outcome = contribute(store, note_id, share_id)
+            except Exception as e:
+                log_action("❌ Share {} failed on note ID {}: {}".format(share_id, note_id, e))
+                continue
+            if outcome == "committed":
+                log_action("🤝 Committed to note ID {} using share {}".format(note_id, share_id))
+                progress += 1
+            elif outcome == "signed":
+                log_action("✅ Signed note ID {} using share {}".format(note_id, share_id))
+                signed += 1
+                progress += 1
+            elif outcome in ("rejected", "missing_nonce", "stale"):
+                log_action("❌ Could not sign note ID {} using share {}: {}".format(note_id, share_id, outcome))
+    metrics.inc("partial_signatures", signed, share=share_id)
+    metrics.set_gauge("queue_depth", store.count("pending"))
+    return progress
 
-    share_path = os.path.join(SECRETS_DIR, SHARE_ID, "secret_share.txt")
-    if not os.path.exists(share_path):
-        log_action("❌ Share file not found at {}".format(share_path))
+def sign_pending_notes(share_id=None, sign_start=None, sign_end=None):
+    share_id = share_id or SHARE_ID
+    if not check_share(share_id):
         return
 
-    if not is_signing_allowed():
+    if not is_signing_allowed(sign_start, sign_end):
         log_action("⏳ Outside signing window. Ignoring request.")
         return
 
-    ensure_note_contents_file()
-    note_contents = load_note_contents()
-    modified = False
+    with NoteStore() as store:
+        modified = sign_notes_with_share(store, share_id)
 
-    for note in note_contents:
-        if note.get("status") != "pending":
-            continue
-        if any(str(sig.get("share")) == str(SHARE_ID) for sig in note.get("note_signatures", [])):
-            log_action("🔁 Already signed note ID {} with share {}".format(note['id'], SHARE_ID))
+    if not modified:
+        log_action("📭 No new notes to sign at this time.")
+
+class QueueWatcher:
+    """Wakes waiting signers as soon as another process commits to the note store."""
+
+    def __init__(self, store, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL):
+        self.store = store
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._changed = asyncio.Event()
+
+    def next_change(self):
+        """Event that is set on the next change after this call."""
+        return self._changed
+
+    def notify(self):
+        """Wake every waiting signer, e.g. after a change made through this same connection."""
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def run(self):
+        interval = self.min_interval
+        last_version = self.store.data_version()
+        while True:
+            await asyncio.sleep(interval)
+            version = self.store.data_version()
+            if version == last_version:
+                interval = min(interval * 2, self.max_interval)
+                continue
+            last_version = version
+            interval = self.min_interval
+            self.notify()
+
+async def run_signer(config, store, watcher):
+    share_id, sign_start, sign_end = config["share_id"], config["sign_start"], config["sign_end"]
+    if not check_share(share_id):
+        return
+    log_action("🚦 Auto signer daemon started for SHARE_ID={} ({}-{})".format(share_id, sign_start, sign_end))
+
+    while True:
+        wait = seconds_until_window_opens(sign_start, sign_end)
+        if wait > 0:
+            log_action("⏳ SHARE_ID={} outside signing window, sleeping {:.0f}s".format(share_id, wait))
+            await asyncio.sleep(wait)
             continue
 
-        note["note_signatures"].append({
-            "share": SHARE_ID,
-            "signed_at": int(time.time())
-        })
-        log_action("✅ Signed note ID {} using share {}".format(note['id'], SHARE_ID))
-        modified = True
+        changed = watcher.next_change()
+        # A set whose last member went offline is only reset here or when a
+        # share polls that note, so the wait below is capped by EXPIRE_INTERVAL.
+        reset = expire_signer_sets(store)
+        if sign_notes_with_share(store, share_id) or reset:
+            # Commits and signatures made through the shared connection do not
+            # change its data_version, so wake the other signers directly.
+            watcher.notify()
+        try:
+            await asyncio.wait_for(changed.wait(),
+                                   min(seconds_until_window_closes(sign_start, sign_end), EXPIRE_INTERVAL))
+        except asyncio.TimeoutError:
+            pass
 
-    if modified:
-        save_note_contents(note_contents)
-    else:
-        log_action("📭 No new notes to sign at this time.")
+async def run_daemon(configs):
+    """Host every configured share in one process until cancelled."""
+    with NoteStore() as store:
+        watcher = QueueWatcher(store)
+        await asyncio.gather(watcher.run(), *(run_signer(config, store, watcher) for config in configs))
+
+def run_once(config):
+    log_action("🚦 Auto signer started for SHARE_ID={}".format(config["share_id"]))
+    sign_pending_notes(**config)
+
+async def run_once_concurrently(configs):
+    """One signing pass per share, all shares at the same time."""
+    await asyncio.gather(*(asyncio.to_thread(run_once, config) for config in configs))
+
+def load_signer_configs(env_files):
+    return [signer_config(dotenv_values(env_file)) for env_file in env_files]
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time-restricted automatic FROST signer")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and sign new notes as they arrive")
+    parser.add_argument("--env", nargs="+", default=[], help=".env files of the shares to host (defaults to .env)")
+    parser.add_argument("--metrics_port", type=int, help="Serve Prometheus metrics on this port")
+    args = parser.parse_args()
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    configs = load_signer_configs(args.env) if args.env else [signer_config()]
     try:
-        log_action("🚦 Auto signer started for SHARE_ID={}".format(SHARE_ID))
-        sign_pending_notes()
+        if args.daemon:
+            asyncio.run(run_daemon(configs))
+        else:
+            for config in configs:
+                run_once(config)
+    except KeyboardInterrupt:
+        sys.exit(0)
     except Exception as e:
         log_action("❌ UNEXPECTED ERROR: {}".format(e))
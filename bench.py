@@ -0,0 +1,212 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import contextlib
+import frostpy
+
+DEFAULT_GROUPS = [(5, 3), (10, 7), (50, 34), (100, 67)]
+DEFAULT_MESSAGE_SIZES = [32, 1024, 64 * 1024]
+DEFAULT_BATCH_SIZE = 256
+MIN_ROUNDS = 5
+MIN_TIME = 0.5
+
+def parse_groups(value):
+    """'5:3,10:7' → [(5, 3), (10, 7)]"""
+    groups = []
+    for item in value.split(","):
+        n, t = item.split(":")
+        groups.append((int(n), int(t)))
+    return groups
+
+def parse_sizes(value):
+    return [int(item) for item in value.split(",")]
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def measure(func, min_rounds=MIN_ROUNDS, min_time=MIN_TIME, setup=None):
+    """Call func repeatedly (at least min_rounds times and min_time seconds); return timings in µs.
+
+    setup, if given, runs untimed before every call.
+    """
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_rounds or time.perf_counter() - started < min_time:
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter_ns()
+        func()
+        timings.append((time.perf_counter_ns() - t0) / 1000)
+    return timings
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "rounds": len(timings),
+        "min_us": round(timings[0], 1),
+        "median_us": round(statistics.median(timings), 1),
+        "p95_us": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1),
+        "mean_us": round(statistics.fmean(timings), 1),
+    }
+
+class BenchRun:
+    """Collects one result per (operation, layer, parameters).
+
+    The layer names what a timing includes on top of the curve math:
+    "native" is FFI only (parsed handles, no JSON), "json" adds per-call JSON
+    and hex decoding of key material, and "files" is the CLI path, which looks
+    up key files on every call. "buffer" passes the message as bytes, which
+    the bindings read in place instead of decoding a str.
+    """
+
+    def __init__(self, min_rounds=MIN_ROUNDS, min_time=MIN_TIME):
+        self.min_rounds = min_rounds
+        self.min_time = min_time
+        self.results = []
+
+    def run(self, operation, layer, func, setup=None, **params):
+        result = {"operation": operation, "layer": layer, **params}
+        result.update(summarize(measure(func, self.min_rounds, self.min_time, setup)))
+        self.results.append(result)
+        label = " ".join(f"{k}={v}" for k, v in params.items())
+        print(f"{operation:<14} {layer:<7} {label:<32} median {result['median_us']:>12.1f} µs  "
+              f"p95 {result['p95_us']:>12.1f} µs", file=sys.stderr)
+        return result
+
+def bench_group(run, n, t, message_sizes):
+    import keygen
+    import required_shares_sign_event as signing
+
+    run.run("keygen", "native", lambda: frostpy.generate_keys_py(n, t), n=n, t=t)
+
+    # generate_and_store_shares writes under ./keys; main() runs us inside a scratch directory.
+    with contextlib.redirect_stdout(io.StringIO()):
+        run.run("keygen", "files", lambda: keygen.generate_and_store_shares(n, t), n=n, t=t)
+
+    share_paths = [os.path.join(keygen.SECRETS_DIR, str(pid), "secret_share.txt") for pid in range(1, t + 1)]
+    share_objects = []
+    for path in share_paths:
+        with open(path) as f:
+            share_objects.append(json.load(f))
+    shares_json = json.dumps(share_objects)
+    bundle = signing.read_group_pubkey_bundle()
+    key_packages = [frostpy.KeyPackage.from_json(json.dumps(share)) for share in share_objects]
+    pubkey_package = frostpy.PublicKeyPackage.from_base64(bundle)
+    signing._signing_sessions.clear()
+    signing._load_key_package.cache_clear()
+    signing._load_public_key_package.cache_clear()
+
+    for size in message_sizes:
+        message = "x" * size
+        params = {"n": n, "t": t, "message_bytes": size}
+        run.run("sign", "native", lambda: frostpy.sign_with_packages_py(message, key_packages, t, pubkey_package), **params)
+        payload = message.encode()
+        run.run("sign", "buffer", lambda: frostpy.sign_with_packages_py(payload, key_packages, t, pubkey_package), **params)
+        run.run("sign", "json", lambda: frostpy.sign_message_py(message, shares_json, t, bundle), **params)
+        run.run("sign", "files", lambda: signing.required_shares_sign_event(message, share_paths, t), **params)
+
+    session = frostpy.SigningSession.from_packages(key_packages, t, pubkey_package, 64)
+    message = "x" * 32
+
+    def refill_if_empty():
+        if session.available == 0:
+            session.refill()
+
+    run.run("sign_pooled", "native", lambda: session.sign(message), setup=refill_if_empty,
+            n=n, t=t, message_bytes=32)
+
+def bench_verify(run, message_sizes, batch_size):
+    import verify_note_signature as verify
+
+    result = json.loads(frostpy.generate_keys_py(5, 3))
+    key_packages = [frostpy.KeyPackage.from_json(json.dumps(share["share"])) for share in result["shares"][:3]]
+    pubkey_package = frostpy.PublicKeyPackage.from_base64(result["group_public_key"])
+    public_key_b64 = result["group_verifying_key"]
+
+    for size in message_sizes:
+        message = "x" * size
+        signature = frostpy.sign_with_packages_py(message, key_packages, 3, pubkey_package)
+        run.run("verify", "native", lambda: frostpy.verify_signature_py(message, signature, public_key_b64),
+                message_bytes=size)
+
+    session = frostpy.SigningSession.from_packages(key_packages, 3, pubkey_package, batch_size)
+    messages = [f"note {i}" for i in range(batch_size)]
+    items = [(message, signature) for message, (signature, _) in zip(messages, session.sign_batch(messages))]
+    records = [{"note_content": message, "signature": signature} for message, signature in items]
+    run.run("verify_batch", "native", lambda: frostpy.verify_batch_py(items, public_key_b64), batch=batch_size)
+    run.run("verify_batch", "parallel", lambda: frostpy.verify_batch_parallel_py(items, public_key_b64), batch=batch_size)
+    run.run("verify_batch", "json", lambda: list(verify.verify_chunk(records, public_key_b64)), batch=batch_size)
+
+def result_key(result):
+    return tuple((k, v) for k, v in result.items()
+                 if k not in ("rounds", "min_us", "median_us", "p95_us", "mean_us"))
+
+def compare(baseline_path, results, threshold=0.10):
+    """Print the median change of every result that also appears in the baseline file."""
+    with open(baseline_path) as f:
+        baseline = {result_key(r): r for r in json.load(f)["results"]}
+    regressions = 0
+    for result in results:
+        old = baseline.get(result_key(result))
+        if old is None:
+            continue
+        change = result["median_us"] / old["median_us"] - 1
+        marker = "🔺" if change > threshold else ("🔻" if change < -threshold else "  ")
+        regressions += change > threshold
+        label = " ".join(f"{k}={v}" for k, v in result_key(result))
+        print(f"{marker} {label:<70} {old['median_us']:>12.1f} → {result['median_us']:>12.1f} µs ({change:+.1%})", file=sys.stderr)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark keygen, signing and verification through frostpy")
+    parser.add_argument("--groups", type=parse_groups, default=DEFAULT_GROUPS, help="n:t pairs, e.g. 5:3,100:67")
+    parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_MESSAGE_SIZES, help="Message sizes in bytes")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH_SIZE, help="Signatures per batch verification")
+    parser.add_argument("--min_time", type=float, default=MIN_TIME, help="Seconds to spend on each measurement")
+    parser.add_argument("--output", help="Write JSON results here")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    run = BenchRun(min_time=args.min_time)
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for n, t in args.groups:
+                bench_group(run, n, t, args.sizes)
+            bench_verify(run, args.sizes, args.batch)
+        finally:
+            os.chdir(workdir)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": int(time.time()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "threads": frostpy.num_threads_py(),
+        "results": run.results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results saved → {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        return 1 if compare(args.compare, run.results) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
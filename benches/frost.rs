@@ -0,0 +1,152 @@
+//! Curve-level costs of the FROST operations used by frostpy, without any
+//! FFI, JSON or file I/O. Run with `cargo bench`; results are written by
+//! Criterion to target/criterion/ and can be compared between commits with
+//! `cargo bench -- --save-baseline <name>` / `--baseline <name>`.
+
+use std::collections::BTreeMap;
+use criterion::{criterion_group, criterion_main, BenchmarkId, Criterion, Throughput};
+use frost_core::keys::{generate_with_dealer, IdentifierList, KeyPackage, PublicKeyPackage};
+use frost_core::{aggregate, batch, round1, round2, Signature, SigningPackage};
+use frost_secp256k1::Secp256K1Sha256;
+use rand::thread_rng;
+
+type C = Secp256K1Sha256;
+
+/// (n, t) pairs, from today's 3-of-5 up to groups of hundreds.
+const GROUPS: &[(u16, u16)] = &[(5, 3), (10, 7), (50, 34), (100, 67), (200, 134)];
+const MESSAGE_SIZES: &[usize] = &[32, 1024, 64 * 1024];
+const BATCH_SIZES: &[usize] = &[1, 16, 256];
+
+fn keygen(n: u16, t: u16) -> (Vec<KeyPackage<C>>, PublicKeyPackage<C>) {
+    let mut rng = thread_rng();
+    let (shares, pubkey_package) = generate_with_dealer::<C, _>(n, t, IdentifierList::Default, &mut rng).unwrap();
+    let key_packages = shares
+        .into_values()
+        .map(|share| KeyPackage::try_from(share).unwrap())
+        .collect();
+    (key_packages, pubkey_package)
+}
+
+fn sign(message: &[u8], signers: &[KeyPackage<C>], pubkey_package: &PublicKeyPackage<C>) -> Signature<C> {
+    let mut rng = thread_rng();
+    let mut nonces = BTreeMap::new();
+    let mut commitments = BTreeMap::new();
+    for key_package in signers {
+        let (nonce, commitment) = round1::commit(key_package.signing_share(), &mut rng);
+        nonces.insert(*key_package.identifier(), nonce);
+        commitments.insert(*key_package.identifier(), commitment);
+    }
+    let signing_package = SigningPackage::new(commitments, message);
+    let signature_shares: BTreeMap<_, _> = signers
+        .iter()
+        .map(|key_package| {
+            let nonce = &nonces[key_package.identifier()];
+            (*key_package.identifier(), round2::sign(&signing_package, nonce, key_package).unwrap())
+        })
+        .collect();
+    aggregate(&signing_package, &signature_shares, pubkey_package).unwrap()
+}
+
+fn bench_keygen(c: &mut Criterion) {
+    let mut group = c.benchmark_group("keygen");
+    group.sample_size(10);
+    for &(n, t) in GROUPS {
+        group.bench_with_input(BenchmarkId::from_parameter(format!("{t}-of-{n}")), &(n, t), |b, &(n, t)| {
+            b.iter(|| keygen(n, t))
+        });
+    }
+    group.finish();
+}
+
+fn bench_signing_phases(c: &mut Criterion) {
+    let message = [0u8; 32];
+    let mut group = c.benchmark_group("signing");
+    group.sample_size(10);
+    for &(n, t) in GROUPS {
+        let (key_packages, pubkey_package) = keygen(n, t);
+        let signers = &key_packages[..t as usize];
+        let label = format!("{t}-of-{n}");
+
+        group.bench_function(BenchmarkId::new("round1_commit_all", &label), |b| {
+            let mut rng = thread_rng();
+            b.iter(|| {
+                signers
+                    .iter()
+                    .map(|key_package| round1::commit(key_package.signing_share(), &mut rng))
+                    .collect::<Vec<_>>()
+            })
+        });
+
+        let mut rng = thread_rng();
+        let mut nonces = BTreeMap::new();
+        let mut commitments = BTreeMap::new();
+        for key_package in signers {
+            let (nonce, commitment) = round1::commit(key_package.signing_share(), &mut rng);
+            nonces.insert(*key_package.identifier(), nonce);
+            commitments.insert(*key_package.identifier(), commitment);
+        }
+        let signing_package = SigningPackage::new(commitments, &message);
+
+        group.bench_function(BenchmarkId::new("round2_sign_one", &label), |b| {
+            let key_package = &signers[0];
+            let nonce = &nonces[key_package.identifier()];
+            b.iter(|| round2::sign(&signing_package, nonce, key_package).unwrap())
+        });
+
+        let signature_shares: BTreeMap<_, _> = signers
+            .iter()
+            .map(|key_package| {
+                let nonce = &nonces[key_package.identifier()];
+                (*key_package.identifier(), round2::sign(&signing_package, nonce, key_package).unwrap())
+            })
+            .collect();
+
+        group.bench_function(BenchmarkId::new("aggregate", &label), |b| {
+            b.iter(|| aggregate(&signing_package, &signature_shares, &pubkey_package).unwrap())
+        });
+
+        group.bench_function(BenchmarkId::new("full_protocol", &label), |b| {
+            b.iter(|| sign(&message, signers, &pubkey_package))
+        });
+    }
+    group.finish();
+}
+
+fn bench_verify(c: &mut Criterion) {
+    let (key_packages, pubkey_package) = keygen(5, 3);
+    let verifying_key = *pubkey_package.verifying_key();
+
+    let mut group = c.benchmark_group("verify");
+    for &size in MESSAGE_SIZES {
+        let message = vec![0x42u8; size];
+        let signature = sign(&message, &key_packages[..3], &pubkey_package);
+        group.throughput(Throughput::Bytes(size as u64));
+        group.bench_with_input(BenchmarkId::new("single", size), &message, |b, message| {
+            b.iter(|| verifying_key.verify(message, &signature).unwrap())
+        });
+    }
+
+    for &count in BATCH_SIZES {
+        let items: Vec<(Vec<u8>, Signature<C>)> = (0..count)
+            .map(|i| {
+                let message = format!("note {i}").into_bytes();
+                let signature = sign(&message, &key_packages[..3], &pubkey_package);
+                (message, signature)
+            })
+            .collect();
+        group.throughput(Throughput::Elements(count as u64));
+        group.bench_with_input(BenchmarkId::new("batch", count), &items, |b, items| {
+            b.iter(|| {
+                let mut verifier = batch::Verifier::<C>::new();
+                for (message, signature) in items {
+                    verifier.queue((verifying_key, *signature, message));
+                }
+                verifier.verify(thread_rng()).unwrap()
+            })
+        });
+    }
+    group.finish();
+}
+
+criterion_group!(benches, bench_keygen, bench_signing_phases, bench_verify);
+criterion_main!(benches);
@@ -4,37 +4,120 @@ def is_signing_allowed():
     now = datetime.now().time()
     return time(00, 0) <= now <= time(15, 30)
 
-import argparse
-import sys
+import io
 import os
+import sys
 import json
-from keygen import generate_and_store_shares
-from required_shares_sign_event import required_shares_sign_event, save_note_signature
-from verify_note_signature import verify_note_signature, read_note_signature, read_public_key
+import signal
+import socket
+import asyncio
+import argparse
+import contextlib
+from note_store import NoteStore
+
+# frostpy, nostr_sdk and the modules built on them are imported inside the
+# commands that need them, so `list` or `submit` do not pay for loading them.
 
 SECRETS_DIR = "keys"
-MESSAGES_FILE = "note_contents.txt"
-ALL_SIGNATURES_LOG = os.path.join(SECRETS_DIR, "note_signatures.txt")
 RECENT_SIGNATURE_RECORD = os.path.join(SECRETS_DIR, "latest_note_signature.txt")
+PUBLIC_KEY_FILE = os.path.join(SECRETS_DIR, "public_key.txt")
+CLI_SOCKET = ".frost-cli.sock"
+NO_SERVER_ENV = "FROST_CLI_NO_SERVER"
+
+# Set while `cli.py serve` runs: state kept warm across forwarded commands.
+_warm = None
+
+class WarmState:
+    """One open note store, and one event loop with a connected relay publisher."""
+
+    def __init__(self):
+        self.store = NoteStore()
+        self.loop = asyncio.new_event_loop()
+        self.publisher = None
+
+    def _connected_publisher(self):
+        from nostr import NostrPublisher
+        if self.publisher is None:
+            self.publisher = NostrPublisher()
+            self.loop.run_until_complete(self.publisher.start())
+        return self.publisher
+
+    def publish(self, notes):
+        from nostr import publish_notes
+        self.loop.run_until_complete(publish_notes(notes, self._connected_publisher()))
+
+    def publish_events(self, events):
+        from nostr import publish_events
+        self.loop.run_until_complete(publish_events(events, self._connected_publisher()))
+
+    def refill_nonce_pools(self):
+        """Top up the nonce pools of the signing sessions this process holds."""
+        from required_shares_sign_event import refill_nonce_pools
+        return refill_nonce_pools()
+
+    def close(self):
+        if self.publisher is not None:
+            self.loop.run_until_complete(self.publisher.stop())
+        self.loop.close()
+        self.store.close()
+
+@contextlib.contextmanager
+def open_note_store():
+    if _warm is not None:
+        yield _warm.store
+    else:
+        with NoteStore() as store:
+            yield store
 
-def ensure_note_contents_file():
-    if not os.path.exists(MESSAGES_FILE):
-        with open(MESSAGES_FILE, "w") as f:
-            f.write("")
+def publish(notes):
+    if _warm is not None:
+        _warm.publish(notes)
+    else:
+        from nostr import publish_notes
+        asyncio.run(publish_notes(notes))
+
+def publish_events(events):
+    if _warm is not None:
+        _warm.publish_events(events)
+    else:
+        from nostr import publish_events
+        asyncio.run(publish_events(events))
+
+def read_group_key():
+    if not os.path.exists(PUBLIC_KEY_FILE):
+        return ""
+    with open(PUBLIC_KEY_FILE, "r") as f:
+        return f.read().strip()
 
 def submit_note_content(note_content):
-    ensure_note_contents_file()
-    with open(MESSAGES_FILE, "r+") as f:
-        note_contents = [json.loads(line) for line in f if line.strip()]
-        new_id = max([m["id"] for m in note_contents], default=0) + 1
-        new_note_content = {"id": new_id, "note_content": note_content, "status": "pending", "note_signatures": []}
-        f.write(json.dumps(new_note_content) + "\n")
-    print(f" Message submitted: ID {new_id} - '{note_content}'")
+    """Queue a note, or attach to the same content already submitted for this group.
+
+    Returns (note_id, signature); the signature is set when the earlier copy
+    has already been signed, so the caller gets it without another round.
+    """
+    from metrics import metrics
+    with open_note_store() as store:
+        note_id, created = store.submit_note(note_content, read_group_key())
+        note = None if created else store.get_note(note_id)
+    metrics.inc("submissions", result="new" if created else "duplicate")
+    if created:
+        print(f" Message submitted: ID {note_id} - '{note_content}'")
+        return note_id, None
+    if note["status"] == "pending":
+        print(f" Duplicate of pending message ID {note_id}; not queued again.")
+        return note_id, None
+    from signature_ledger import default_ledger
+    record = default_ledger().find(note_content)
+    if record is None:
+        print(f" Duplicate of message ID {note_id} ({note['status']}); no stored signature found.")
+        return note_id, None
+    print(f" Already signed as message ID {note_id}: {record['signature']}")
+    return note_id, record["signature"]
 
 def list_note_contents():
-    ensure_note_contents_file()
-    with open(MESSAGES_FILE, "r") as f:
-        note_contents = [json.loads(line) for line in f if line.strip()]
+    with open_note_store() as store:
+        note_contents = store.list_notes()
+        dedup = store.dedup_stats()
     if not note_contents:
         print("No note_contents pending.")
         return
@@ -42,29 +125,47 @@ def list_note_contents():
     for m in note_contents:
         sig_count = len(m["note_signatures"])
         print(f"ID {m['id']}: '{m['note_content']}' (Signatures: {sig_count})")
+    if dedup["duplicates"]:
+        print(f" Duplicate submissions: {dedup['duplicates']} of {dedup['unique'] + dedup['duplicates']} (hit rate {dedup['hit_rate']:.1%}).")
 
 def sign_partial(note_content_id, share_path):
-    ensure_note_contents_file()
-    with open(MESSAGES_FILE, "r") as f:
-        lines = f.readlines()
-    note_contents = [json.loads(line) for line in lines if line.strip()]
-    note_content = next((m for m in note_contents if m["id"] == note_content_id), None)
-    if not note_content or note_content["status"] != "pending":
-        print(f" Message ID {note_content_id} not found or already processed.")
-        return
+    with open_note_store() as store:
+        note_content = store.get_note(note_content_id)
+        if not note_content or note_content["status"] != "pending":
+            print(f" Message ID {note_content_id} not found or already processed.")
+            return
 
-    share_file = share_path.split("/")[-2]
-    if any(sig["share"] == share_file for sig in note_content["note_signatures"]):
+        from partial_signatures import contribute
+        share_file = share_path.split("/")[-2]
+        outcome = contribute(store, note_content_id, share_file, share_path)
+        note_content = store.get_note(note_content_id)
+    sig_count = len(note_content["note_signatures"])
+    if outcome == "signed":
+        print(f" Share {share_file} signed note_content ID {note_content_id}. Total note_signatures: {sig_count}")
+    elif outcome == "committed":
+        print(f" Share {share_file} committed to note_content ID {note_content_id}; run sign-partial again once the signer set is complete.")
+    elif outcome == "done":
         print(f" Share {share_file} already signed this note_content.")
-        return
+    elif outcome == "not_selected":
+        print(f" Share {share_file} is not in the signer set of note_content ID {note_content_id}.")
+    elif outcome == "waiting":
+        print(f" Share {share_file} is waiting for more commitments on note_content ID {note_content_id}.")
+    else:
+        print(f" Share {share_file} could not sign note_content ID {note_content_id}: {outcome}")
 
-    note_content["note_signatures"].append({"share": share_file})
-    with open(MESSAGES_FILE, "w") as f:
-        for m in note_contents:
-            f.write(json.dumps(m) + "\n")
-    print(f" Share {share_file} signed note_content ID {note_content_id}. Total note_signatures: {len(note_content['note_signatures'])}")
+def finalize_partials(store, note_content):
+    """Aggregate the note's verified partial signatures; None when they are incomplete."""
+    if not note_content.get("signer_set"):
+        return None
+    from partial_signatures import finalize
+    try:
+        return finalize(store, note_content)
+    except Exception as e:
+        print(f" Failed to aggregate partial signatures for ID {note_content['id']}: {e}")
+        return None
 
 def sign(note_content, required_shares, share_files):
+    from required_shares_sign_event import required_shares_sign_event, save_note_signature
     note_signature = required_shares_sign_event(note_content, share_files, required_shares)
     if note_signature:
         print(f" Signature generated: {note_signature}")
@@ -73,10 +174,11 @@ def sign(note_content, required_shares, share_files):
         print(" Failed to sign the note_content.")
 
 def verify(note_content):
-    note_signature = read_note_signature(note_content)
+    from verify_note_signature import verify_record, read_note_record, read_public_key
+    record = read_note_record(note_content)
     public_key = read_public_key()
-    if note_signature and public_key:
-        is_valid = verify_note_signature(note_content, note_signature, public_key)
+    if record and public_key:
+        is_valid = verify_record(record, public_key)
         if is_valid is not None:
             print(" The note_signature is valid!" if is_valid else " The note_signature is invalid.")
         else:
@@ -84,41 +186,194 @@ def verify(note_content):
     else:
         print(" Failed to load the note_signature or public key.")
 
-def broadcast(note_content_id, required_shares):
-    ensure_note_contents_file()
-    with open(MESSAGES_FILE, "r") as f:
-        lines = f.readlines()
-    note_contents = [json.loads(line) for line in lines if line.strip()]
-    note_content = next((m for m in note_contents if m["id"] == note_content_id), None)
+def audit(log_path=None):
+    from verify_note_signature import verify_log, verification_cache
+    if log_path and not os.path.exists(log_path):
+        print(f" Signature log not found at {log_path}.")
+        return
+    valid = invalid = errors = 0
+    for record, is_valid in verify_log(log_path):
+        if is_valid is None:
+            errors += 1
+        elif is_valid:
+            valid += 1
+        else:
+            invalid += 1
+            print(f" Invalid signature for note_content: '{record['note_content']}'")
+    print(f" Audit finished: {valid} valid, {invalid} invalid, {errors} errors.")
+    stats = verification_cache.stats()
+    print(f" Verification cache: {stats['hits']} hits, {stats['misses']} misses, {stats['size']}/{stats['capacity']} entries.")
+
+def sign_over_network(note_contents, required_shares, participants, hedge=0):
+    """Sign note contents with remote participants, cheapest signers first; None for each failure."""
+    from network_signing import Coordinator
+    from signer_scheduler import SignerScheduler, PROFILES_FILE
+    from required_shares_sign_event import load_public_key_package
+    scheduler = SignerScheduler(path=PROFILES_FILE)
+
+    async def run():
+        signatures = []
+        async with Coordinator(participants, load_public_key_package(), required_shares,
+                               scheduler=scheduler, hedge=hedge) as coordinator:
+            for note_content in note_contents:
+                try:
+                    signatures.append(await coordinator.sign(note_content))
+                except Exception as e:
+                    print(f" Network signing failed for '{note_content}': {e}")
+                    signatures.append(None)
+        return signatures
+
+    try:
+        if _warm is not None:
+            return _warm.loop.run_until_complete(run())
+        return asyncio.run(run())
+    except Exception as e:
+        print(f" Network signing failed: {e}")
+        return [None] * len(note_contents)
+    finally:
+        scheduler.save()
+
+def broadcast_events(note_contents, required_shares):
+    """Publish notes as Nostr events whose pubkey is the group key.
+
+    Each event id is FROST-signed in BIP-340 form by the note's signers, so
+    the event carries a single signature and no nsec is involved.
+    """
+    from required_shares_sign_event import required_shares_sign_nostr_event, save_note_signature
+    events = []
+    for note_content in note_contents:
+        share_files = [os.path.join(SECRETS_DIR, str(sig["share"]), "secret_share.txt") for sig in note_content["note_signatures"]]
+        event = required_shares_sign_nostr_event(note_content["note_content"], share_files, required_shares)
+        if event is None:
+            print(f" Failed to sign the Nostr event for note_content ID {note_content['id']}.")
+            continue
+        with open_note_store() as store:
+            store.set_status(note_content["id"], "broadcasted")
+        save_note_signature(event["sig"], note_content["note_content"], event=event)
+        print(f" Message ID {note_content['id']} signed as Nostr event {event['id']}.")
+        events.append(event)
+    if events:
+        publish_events(events)
+    print(f" Broadcast finished: {len(events)}/{len(note_contents)} note_contents signed.")
+    return events
+
+def broadcast(note_content_id, required_shares, participants=None, hedge=0, group_event=False):
+    from required_shares_sign_event import required_shares_sign_event, save_note_signature
+    with open_note_store() as store:
+        note_content = store.get_note(note_content_id)
     if not note_content or note_content["status"] != "pending":
         print(f" Message ID {note_content_id} not found or already broadcasted.")
         return
+    if group_event:
+        if len(note_content["note_signatures"]) < required_shares:
+            print(f" Insufficient note_signatures: {len(note_content['note_signatures'])}/{required_shares}.")
+            return
+        broadcast_events([note_content], required_shares)
+        return
 
     sig_count = len(note_content["note_signatures"])
-    if sig_count < required_shares:
+    if participants:
+        note_signature = sign_over_network([note_content["note_content"]], required_shares, participants, hedge)[0]
+    elif sig_count < required_shares:
         print(f" Insufficient note_signatures: {sig_count}/{required_shares}.")
         return
-
-    share_files = [os.path.join(SECRETS_DIR, sig["share"], "secret_share.txt") for sig in note_content["note_signatures"]]
-    note_signature = required_shares_sign_event(note_content["note_content"], share_files, required_shares)
+    else:
+        with open_note_store() as store:
+            note_signature = finalize_partials(store, note_content)
+    if not note_signature and not participants:
+        share_files = [os.path.join(SECRETS_DIR, sig["share"], "secret_share.txt") for sig in note_content["note_signatures"]]
+        note_signature = required_shares_sign_event(note_content["note_content"], share_files, required_shares)
     if note_signature:
-        note_content["status"] = "broadcasted"
-        with open(MESSAGES_FILE, "w") as f:
-            for m in note_contents:
-                f.write(json.dumps(m) + "\n")
+        with open_note_store() as store:
+            store.set_status(note_content_id, "broadcasted")
         save_note_signature(note_signature, note_content["note_content"])
         print(f" Message ID {note_content_id} signed and ready for Nostr broadcast.")
-        os.system("python nostr.py")
+        publish([(note_content["note_content"], note_signature)])
     else:
         print(" Failed to finalize note_signature.")
 
-if __name__ == "__main__":
+def broadcast_all(required_shares, participants=None, hedge=0, group_event=False):
+    from required_shares_sign_event import required_shares_sign_events, save_note_signature
+    with open_note_store() as store:
+        note_contents = store.list_notes(status="pending")
+    if group_event:
+        ready = [m for m in note_contents if len(m["note_signatures"]) >= required_shares]
+        if not ready:
+            print(" No note_contents ready for broadcast.")
+            return []
+        return broadcast_events(ready, required_shares)
+
+    # Notes whose partial signatures are all in only need an aggregate. The
+    # rest are signed from the shares' key files; notes signed by the same
+    # shares share one signing session and one native call. With remote
+    # participants, every pending note is signed over the network instead.
+    results = {}
+    groups = {}
+    if participants and note_contents:
+        signatures = sign_over_network([m["note_content"] for m in note_contents], required_shares, participants, hedge)
+        for note_content, note_signature in zip(note_contents, signatures):
+            results[note_content["id"]] = (note_signature, None if note_signature else "network signing failed")
+    with open_note_store() as store:
+        for note_content in note_contents:
+            if note_content["id"] in results:
+                continue
+            note_signature = finalize_partials(store, note_content)
+            if note_signature:
+                results[note_content["id"]] = (note_signature, None)
+    for note_content in note_contents:
+        if note_content["id"] in results or len(note_content["note_signatures"]) < required_shares:
+            continue
+        signer_set = tuple(sorted(str(sig["share"]) for sig in note_content["note_signatures"]))
+        groups.setdefault(signer_set, []).append(note_content)
+
+    if not groups and not results:
+        print(" No note_contents ready for broadcast.")
+        return {}
+
+    for signer_set, notes in groups.items():
+        share_files = [os.path.join(SECRETS_DIR, share, "secret_share.txt") for share in signer_set]
+        signed = required_shares_sign_events([m["note_content"] for m in notes], share_files, required_shares)
+        for note_content, (note_signature, error) in zip(notes, signed):
+            results[note_content["id"]] = (note_signature, error)
+            if not note_signature:
+                print(f" Failed to finalize note_content ID {note_content['id']}: {error}")
+
+    with open_note_store() as store:
+        for note_content_id, (note_signature, _) in results.items():
+            if note_signature:
+                store.set_status(note_content_id, "broadcasted")
+
+    by_id = {m["id"]: m for m in note_contents}
+    ready = []
+    for note_content_id, (note_signature, _) in results.items():
+        if note_signature:
+            save_note_signature(note_signature, by_id[note_content_id]["note_content"])
+            print(f" Message ID {note_content_id} signed and ready for Nostr broadcast.")
+            ready.append((by_id[note_content_id]["note_content"], note_signature))
+    if ready:
+        publish(ready)
+    signed_count = sum(1 for note_signature, _ in results.values() if note_signature)
+    print(f" Broadcast finished: {signed_count}/{len(results)} note_contents signed.")
+    return results
+
+def build_parser():
     parser = argparse.ArgumentParser(description="")
+    parser.add_argument("--threads", type=int, help="Worker threads for parallel signing and verification")
+    parser.add_argument("--metrics", type=str, help="Write metrics here when done (.prom for Prometheus text, JSON otherwise)")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     generate_parser = subparsers.add_parser("generate", help="Generate keys and shares")
     generate_parser.add_argument("--n", type=int, required=True, help="Number of participants")
     generate_parser.add_argument("--t", type=int, required=True, help="Signing required_shares")
+    generate_parser.add_argument("--format", choices=["files", "keystore"], default="files",
+                                 help="One JSON file per participant, or a single binary keystore")
+
+    provision_parser = subparsers.add_parser("provision", help="Generate many independent groups, one keystore each")
+    provision_parser.add_argument("--groups", type=int, required=True, help="Number of groups")
+    provision_parser.add_argument("--n", type=int, required=True, help="Participants per group")
+    provision_parser.add_argument("--t", type=int, required=True, help="Signing required_shares per group")
+    provision_parser.add_argument("--dir", type=str, help="Output directory (defaults to keys/groups)")
+    provision_parser.add_argument("--batch", type=int, help="Groups generated per native call")
 
     submit_parser = subparsers.add_parser("submit", help="Submit a new note_content")
     submit_parser.add_argument("--note_content", type=str, required=True, help="New note_content")
@@ -137,14 +392,52 @@ if __name__ == "__main__":
     verify_parser = subparsers.add_parser("verify", help="Verify a note_signature")
     verify_parser.add_argument("--note_content", type=str, required=True, help="Message to verify")
 
+    audit_parser = subparsers.add_parser("audit", help="Verify every note_signature in the signature log")
+    audit_parser.add_argument("--log", type=str, help="Path to a signature log, JSON lines or a JSON array (defaults to the signature ledger)")
+
     broadcast_parser = subparsers.add_parser("broadcast", help="Finalize and broadcast a note_content")
-    broadcast_parser.add_argument("--id", type=int, required=True, help="Message ID to broadcast")
+    broadcast_target = broadcast_parser.add_mutually_exclusive_group(required=True)
+    broadcast_target.add_argument("--id", type=int, help="Message ID to broadcast")
+    broadcast_target.add_argument("--all", action="store_true", help="Broadcast every note_content that has enough note_signatures")
     broadcast_parser.add_argument("--required_shares", type=int, required=True, help="Threshold for signing")
+    broadcast_parser.add_argument("--participants", nargs="+", help="Sign with these network_signing.py participants instead of local shares")
+    broadcast_parser.add_argument("--hedge", type=int, default=0, help="With --participants, also send a backup package with this many spare signers")
+    broadcast_parser.add_argument("--group_event", action="store_true",
+                                  help="Publish with the group key as the Nostr pubkey, FROST-signing the event id (BIP-340)")
 
-    args = parser.parse_args()
+    serve_parser = subparsers.add_parser("serve", help="Keep a warm process that other cli.py calls forward to")
+    serve_parser.add_argument("--socket", type=str, default=CLI_SOCKET, help="Unix socket to listen on")
+    return parser
 
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.threads:
+        from frostpy import set_num_threads_py
+        set_num_threads_py(args.threads)
+    if args.metrics:
+        from metrics import enable_native_timing
+        enable_native_timing()
+    try:
+        return run_command(parser, args)
+    finally:
+        if args.metrics:
+            from metrics import metrics
+            metrics.write(args.metrics)
+
+def run_command(parser, args):
     if args.command == "generate":
-        generate_and_store_shares(args.n, args.t)
+        from keygen import generate_and_store_shares, generate_and_store_keystore
+        if args.format == "keystore":
+            generate_and_store_keystore(args.n, args.t)
+        else:
+            generate_and_store_shares(args.n, args.t)
+    elif args.command == "provision":
+        from keygen import provision_groups, GROUPS_DIR, PROVISION_BATCH_SIZE
+        report = provision_groups(args.groups, args.n, args.t, args.dir or GROUPS_DIR,
+                                  args.batch or PROVISION_BATCH_SIZE)
+        if report is None:
+            return 1
     elif args.command == "submit":
         submit_note_content(args.note_content)
     elif args.command == "list":
@@ -155,8 +448,114 @@ if __name__ == "__main__":
         sign(args.note_content, args.required_shares, args.shares)
     elif args.command == "verify":
         verify(args.note_content)
+    elif args.command == "audit":
+        audit(args.log)
     elif args.command == "broadcast":
-        broadcast(args.id, args.required_shares)
+        if args.group_event and args.participants:
+            print(" --group_event signs with local shares and cannot be combined with --participants.")
+            return 1
+        if args.all:
+            broadcast_all(args.required_shares, args.participants, args.hedge, args.group_event)
+        else:
+            broadcast(args.id, args.required_shares, args.participants, args.hedge, args.group_event)
+    elif args.command == "serve":
+        if _warm is not None:
+            print(" Already serving.")
+            return 1
+        serve(args.socket)
     else:
         parser.print_help()
-        sys.exit(1)
+        return 1
+    return 0
+
+def run_forwarded(argv):
+    """Run one forwarded command in the warm process and capture what it prints."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            exit_code = main(argv)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            print(f" Command failed: {e}")
+            exit_code = 1
+    return {"output": output.getvalue(), "exit_code": exit_code}
+
+def serve(socket_path=CLI_SOCKET):
+    global _warm
+    import socketserver
+    # Load everything heavy once; forwarded commands then only pay for their own work.
+    import keygen, required_shares_sign_event, verify_note_signature, nostr  # noqa: F401
+
+    if os.path.exists(socket_path):
+        if forward_request(socket_path, {"ping": True}) is not None:
+            print(f" Another server is already listening on {socket_path}.")
+            return
+        os.unlink(socket_path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = json.loads(self.rfile.readline())
+            if request.get("ping"):
+                reply = {"pong": True}
+            elif request.get("cwd") != os.getcwd():
+                # Key and queue paths are relative; let the client run the command itself.
+                reply = {"error": "cwd"}
+            else:
+                reply = run_forwarded(request["argv"])
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+    class Server(socketserver.UnixStreamServer):
+        def service_actions(self):
+            # Runs between requests: refill the nonce pools used by forwarded
+            # sign/broadcast commands so the next one skips round 1.
+            _warm.refill_nonce_pools()
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    _warm = WarmState()
+    server = Server(socket_path, Handler)
+    os.chmod(socket_path, 0o600)
+    print(f" Serving cli.py commands on {socket_path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        _warm.close()
+        _warm = None
+
+def forward_request(socket_path, request):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            with client.makefile("rb") as reply:
+                line = reply.readline()
+    except OSError:
+        return None
+    return json.loads(line) if line else None
+
+def forward_to_server(argv, socket_path=CLI_SOCKET):
+    """Run argv in a `cli.py serve` process if one is listening; None means run it here."""
+    if os.getenv(NO_SERVER_ENV) or not os.path.exists(socket_path):
+        return None
+    args = build_parser().parse_args(argv)
+    if args.command in (None, "serve"):
+        return None
+    reply = forward_request(socket_path, {"argv": argv, "cwd": os.getcwd()})
+    if reply is None or "error" in reply:
+        return None
+    sys.stdout.write(reply["output"])
+    return reply["exit_code"]
+
+if __name__ == "__main__":
+    exit_code = forward_to_server(sys.argv[1:])
+    if exit_code is None:
+        exit_code = main()
+    sys.exit(exit_code)
@@ -1,12 +1,34 @@
 import os
 import json
-from frostpy import generate_keys_py
+import time
+import base64
+from frostpy import generate_keys_py, generate_groups_py
+from keystore import keystore_from_keygen_output, write_keystore, KEYSTORE_PATH
 
 SECRETS_DIR = "keys"
+GROUPS_DIR = os.path.join(SECRETS_DIR, "groups")
+GROUPS_MANIFEST = "manifest.jsonl"
+PROVISION_BATCH_SIZE = 64
 
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
+def retire_key_files(paths):
+    """Rename key files of a replaced group to <name>.superseded so loaders stop picking them up."""
+    for path in paths:
+        if os.path.exists(path):
+            os.replace(path, path + ".superseded")
+            print(f"🗄️ Superseded {path} → {path}.superseded")
+
+def legacy_key_files():
+    """The per-participant share files and group key bundle written by generate_and_store_shares."""
+    paths = [os.path.join(SECRETS_DIR, "group_key_bundle.txt")]
+    if os.path.isdir(SECRETS_DIR):
+        for entry in sorted(os.listdir(SECRETS_DIR)):
+            if entry.isdigit():
+                paths.append(os.path.join(SECRETS_DIR, entry, "secret_share.txt"))
+    return paths
+
 def store_individual_share(participant_id, encoded_share):
     dir_path = os.path.join(SECRETS_DIR, f"{participant_id}")
     ensure_dir(dir_path)
@@ -52,6 +74,9 @@ def generate_and_store_shares(n: int, t: int):
         print(f"❌ JSON parsing error: {e}")
         return
 
+    # A keystore from an earlier group would still serve participants that
+    # have no share file in this one.
+    retire_key_files([KEYSTORE_PATH])
     store_pubkey_bundle(group_key_bundle)
     store_nostr_pubkey(group_verifying_key)
 
@@ -62,5 +87,122 @@ def generate_and_store_shares(n: int, t: int):
 
     print("✅ All shares and public key data saved successfully.")
 
+def generate_and_store_keystore(n: int, t: int, path=KEYSTORE_PATH):
+    """Like generate_and_store_shares, but writes every share into one binary keystore file."""
+    print(f"🚀 Generating {n} FROST shares with threshold {t} into {path}...")
+    try:
+        result = json.loads(generate_keys_py(n, t))
+        keystore_from_keygen_output(result, path)
+    except Exception as e:
+        print(f"❌ Error during key generation: {e}")
+        return
+
+    if os.path.abspath(path) == os.path.abspath(KEYSTORE_PATH):
+        # The loaders prefer share files and the bundle over the keystore;
+        # left in place, they would keep signing with the previous group key.
+        retire_key_files(legacy_key_files())
+    store_nostr_pubkey(result["group_verifying_key"])
+    print(f"✅ Keystore with {n} shares saved → {path}")
+
+def group_keystore_path(directory, index):
+    return os.path.join(directory, f"{index:06d}.keystore")
+
+def read_provisioned_groups(directory=GROUPS_DIR):
+    """Manifest entries, by group index, of every group whose keystore was fully written."""
+    path = os.path.join(directory, GROUPS_MANIFEST)
+    groups = {}
+    if not os.path.exists(path):
+        return groups
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line from an interrupted run; that batch is redone.
+                continue
+            if os.path.exists(os.path.join(directory, entry["file"])):
+                groups[entry["group"]] = entry
+    return groups
+
+def _append_manifest(directory, entries):
+    path = os.path.join(directory, GROUPS_MANIFEST)
+    with open(path, "ab") as f:
+        if f.tell() and not _ends_with_newline(path):
+            f.write(b"\n")
+        f.write("".join(json.dumps(entry) + "\n" for entry in entries).encode())
+        f.flush()
+        os.fsync(f.fileno())
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+def _write_group_batch(directory, indices, groups, n, t):
+    paths, entries = [], []
+    for index, (pubkey_package, verifying_key, shares) in zip(indices, groups):
+        path = group_keystore_path(directory, index)
+        write_keystore(path, shares, pubkey_package, t, sync=False)
+        paths.append(path)
+        entries.append({"group": index, "file": os.path.basename(path), "n": n, "t": t,
+                        "verifying_key": base64.b64encode(verifying_key).decode()})
+    # Flush the whole batch, then record it: a group only counts as
+    # provisioned once its manifest line is on disk.
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    _append_manifest(directory, entries)
+
+def provision_groups(count: int, n: int, t: int, directory=GROUPS_DIR, batch_size=PROVISION_BATCH_SIZE):
+    """Generate count independent (n, t) groups, one keystore file each, under directory.
+
+    Groups are generated batch_size at a time in parallel native code and
+    written out per batch. Groups already listed in the manifest are skipped,
+    so an interrupted run picks up where it stopped. Returns a throughput
+    report.
+    """
+    os.makedirs(directory, exist_ok=True)
+    provisioned = read_provisioned_groups(directory)
+    pending = [index for index in range(1, count + 1) if index not in provisioned]
+    if provisioned:
+        print(f"↩️ Resuming: {count - len(pending)} of {count} groups already provisioned")
+    print(f"🚀 Provisioning {len(pending)} groups of {n} shares with threshold {t} → {directory}")
+
+    generate_seconds = write_seconds = 0.0
+    for start in range(0, len(pending), batch_size):
+        indices = pending[start:start + batch_size]
+        started = time.perf_counter()
+        try:
+            groups = generate_groups_py(len(indices), n, t)
+        except Exception as e:
+            print(f"❌ Error during key generation: {e}")
+            return None
+        generated = time.perf_counter()
+        _write_group_batch(directory, indices, groups, n, t)
+        generate_seconds += generated - started
+        write_seconds += time.perf_counter() - generated
+        print(f"   {count - len(pending) + start + len(indices)}/{count} groups")
+
+    elapsed = generate_seconds + write_seconds
+    report = {
+        "groups": len(pending),
+        "skipped": count - len(pending),
+        "shares": len(pending) * n,
+        "generate_seconds": round(generate_seconds, 3),
+        "write_seconds": round(write_seconds, 3),
+        "groups_per_second": round(len(pending) / elapsed, 1) if elapsed else None,
+        "shares_per_second": round(len(pending) * n / elapsed, 1) if elapsed else None,
+    }
+    if pending:
+        print(f"✅ {report['groups']} groups in {elapsed:.2f}s "
+              f"({report['groups_per_second']} groups/s, {report['shares_per_second']} shares/s; "
+              f"generate {generate_seconds:.2f}s, write {write_seconds:.2f}s)")
+    else:
+        print("✅ Nothing to do.")
+    return report
+
 if __name__ == "__main__":
     generate_and_store_shares(n=5, t=3)
@@ -0,0 +1,227 @@
+import os
+import mmap
+import json
+import base64
+import struct
+import argparse
+
+SECRETS_DIR = "keys"
+KEYSTORE_PATH = os.path.join(SECRETS_DIR, "group.keystore")
+PUBKEY_BUNDLE_FILE = "group_key_bundle.txt"
+PUBLIC_KEY_FILE = "public_key.txt"
+SHARE_FILE = "secret_share.txt"
+
+MAGIC = b"FROSTKS\0"
+VERSION = 1
+CIPHERSUITES = {1: "FROST-secp256k1-SHA256-v1"}
+CIPHERSUITE_IDS = {name: number for number, name in CIPHERSUITES.items()}
+SCALAR_SIZE = 32
+
+# magic, version, ciphersuite, share count, min_signers, record size,
+# index offset, records offset, public key package offset and length.
+HEADER = struct.Struct("<8sHHHHIQQQI")
+# participant id, record offset
+INDEX_ENTRY = struct.Struct("<IQ")
+RECORD_SIZE = 2 * SCALAR_SIZE
+
+class KeystoreError(ValueError):
+    pass
+
+def write_keystore(path, shares, pubkey_package, min_signers, ciphersuite="FROST-secp256k1-SHA256-v1", sync=True):
+    """Write a group keystore.
+
+    shares is an iterable of (participant_id, identifier bytes, signing share
+    bytes); pubkey_package is the serialized PublicKeyPackage. The file is
+    written next to its destination and renamed into place. With sync=False
+    the caller is responsible for flushing it to disk.
+    """
+    shares = sorted(shares)
+    index_offset = HEADER.size
+    records_offset = index_offset + len(shares) * INDEX_ENTRY.size
+    pubkey_offset = records_offset + len(shares) * RECORD_SIZE
+
+    parts = [HEADER.pack(MAGIC, VERSION, CIPHERSUITE_IDS[ciphersuite], len(shares), min_signers,
+                         RECORD_SIZE, index_offset, records_offset, pubkey_offset, len(pubkey_package))]
+    for position, (participant_id, _, _) in enumerate(shares):
+        parts.append(INDEX_ENTRY.pack(participant_id, records_offset + position * RECORD_SIZE))
+    for participant_id, identifier, signing_share in shares:
+        if len(identifier) != SCALAR_SIZE or len(signing_share) != SCALAR_SIZE:
+            raise KeystoreError(f"Share {participant_id} is not {SCALAR_SIZE}-byte scalars")
+        parts.append(identifier + signing_share)
+    parts.append(pubkey_package)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    # Every secret share is in this file, so only the owner may read it.
+    with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+        f.write(b"".join(parts))
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+class Keystore:
+    """Read-only view of a group keystore file.
+
+    The file is memory-mapped, so opening it costs one header read and loading
+    a share touches only its index entry and its fixed-width record.
+    """
+
+    def __init__(self, path=KEYSTORE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+        except Exception:
+            self._map.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def _read_header(self):
+        if len(self._map) < HEADER.size:
+            raise KeystoreError(f"{self.path} is too short to be a keystore")
+        (magic, version, ciphersuite, self.count, self.min_signers, record_size,
+         self._index_offset, self._records_offset, self._pubkey_offset, self._pubkey_length) = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise KeystoreError(f"{self.path} is not a FROST keystore")
+        if version != VERSION:
+            raise KeystoreError(f"Unsupported keystore version {version} in {self.path}")
+        if ciphersuite not in CIPHERSUITES:
+            raise KeystoreError(f"Unknown ciphersuite {ciphersuite} in {self.path}")
+        if record_size != RECORD_SIZE:
+            raise KeystoreError(f"Unexpected record size {record_size} in {self.path}")
+        self.version = version
+        self.ciphersuite = CIPHERSUITES[ciphersuite]
+
+    def participant_ids(self):
+        return [INDEX_ENTRY.unpack_from(self._map, self._index_offset + i * INDEX_ENTRY.size)[0]
+                for i in range(self.count)]
+
+    def __contains__(self, participant_id):
+        return self._record_offset(int(participant_id)) is not None
+
+    def _record_offset(self, participant_id):
+        # The index is sorted by participant id.
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry_id, offset = INDEX_ENTRY.unpack_from(self._map, self._index_offset + middle * INDEX_ENTRY.size)
+            if entry_id == participant_id:
+                return offset
+            if entry_id < participant_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def share_record(self, participant_id):
+        """(identifier bytes, signing share bytes) of one participant."""
+        offset = self._record_offset(int(participant_id))
+        if offset is None:
+            raise KeyError(f"Participant {participant_id} not in {self.path}")
+        return (self._map[offset:offset + SCALAR_SIZE],
+                self._map[offset + SCALAR_SIZE:offset + RECORD_SIZE])
+
+    def pubkey_package_bytes(self):
+        return self._map[self._pubkey_offset:self._pubkey_offset + self._pubkey_length]
+
+    def public_key_package(self):
+        from frostpy import PublicKeyPackage
+        return PublicKeyPackage.from_bytes(self.pubkey_package_bytes())
+
+    def load_key_package(self, participant_id, pubkey_package=None):
+        from frostpy import KeyPackage
+        pubkey_package = pubkey_package or self.public_key_package()
+        identifier, signing_share = self.share_record(participant_id)
+        verifying_key = base64.b64decode(pubkey_package.verifying_key)
+        return KeyPackage.from_bytes(identifier, signing_share, verifying_key, self.min_signers)
+
+def _read_text(path):
+    with open(path, "r") as f:
+        return f.read().strip()
+
+def keystore_from_keygen_output(result, path=KEYSTORE_PATH):
+    """Write the parsed output of generate_keys_py straight into a keystore."""
+    shares = []
+    min_signers = None
+    ciphersuite = None
+    for share in result["shares"]:
+        fields = share["share"]
+        min_signers = fields["min_signers"]
+        ciphersuite = fields["header"]["ciphersuite"]
+        shares.append((int(share["participant_id"]), bytes.fromhex(fields["identifier"]),
+                       bytes.fromhex(fields["signing_share"])))
+    pubkey_package = base64.b64decode(result["group_public_key"])
+    return write_keystore(path, shares, pubkey_package, min_signers, ciphersuite)
+
+def import_legacy_layout(secrets_dir=SECRETS_DIR, path=KEYSTORE_PATH):
+    """Build a keystore from keys/<id>/secret_share.txt files and the group key bundle."""
+    shares = []
+    for name in os.listdir(secrets_dir):
+        share_path = os.path.join(secrets_dir, name, SHARE_FILE)
+        if name.isdigit() and os.path.exists(share_path):
+            with open(share_path, "r") as f:
+                shares.append({"participant_id": int(name), "share": json.load(f)})
+    if not shares:
+        raise KeystoreError(f"No share files found under {secrets_dir}")
+    result = {"shares": shares, "group_public_key": _read_text(os.path.join(secrets_dir, PUBKEY_BUNDLE_FILE))}
+    keystore_from_keygen_output(result, path)
+    print(f"✅ Imported {len(shares)} shares from {secrets_dir} → {path}")
+    return len(shares)
+
+def export_legacy_layout(path=KEYSTORE_PATH, secrets_dir=SECRETS_DIR):
+    """Write the per-participant JSON files and base64 key files that keygen used to produce."""
+    with Keystore(path) as keystore:
+        pubkey_package = keystore.pubkey_package_bytes()
+        from frostpy import PublicKeyPackage
+        verifying_key_b64 = PublicKeyPackage.from_bytes(pubkey_package).verifying_key
+        verifying_key_hex = base64.b64decode(verifying_key_b64).hex()
+        os.makedirs(secrets_dir, exist_ok=True)
+        with open(os.path.join(secrets_dir, PUBKEY_BUNDLE_FILE), "w") as f:
+            f.write(base64.b64encode(pubkey_package).decode())
+        with open(os.path.join(secrets_dir, PUBLIC_KEY_FILE), "w") as f:
+            f.write(verifying_key_b64)
+        participant_ids = keystore.participant_ids()
+        for participant_id in participant_ids:
+            identifier, signing_share = keystore.share_record(participant_id)
+            share = {
+                "header": {"version": 0, "ciphersuite": keystore.ciphersuite},
+                "identifier": identifier.hex(),
+                "signing_share": signing_share.hex(),
+                "verifying_key": verifying_key_hex,
+                "min_signers": keystore.min_signers,
+            }
+            os.makedirs(os.path.join(secrets_dir, str(participant_id)), exist_ok=True)
+            with open(os.path.join(secrets_dir, str(participant_id), SHARE_FILE), "w") as f:
+                f.write(json.dumps(share))
+    print(f"✅ Exported {len(participant_ids)} shares from {path} → {secrets_dir}")
+    return len(participant_ids)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binary FROST group keystore")
+    parser.add_argument("command", choices=["info", "import", "export"])
+    parser.add_argument("--keystore", default=KEYSTORE_PATH, help="Keystore file")
+    parser.add_argument("--secrets_dir", default=SECRETS_DIR, help="Directory of the per-participant layout")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        import_legacy_layout(args.secrets_dir, args.keystore)
+    elif args.command == "export":
+        export_legacy_layout(args.keystore, args.secrets_dir)
+    else:
+        with Keystore(args.keystore) as keystore:
+            print(f"🔐 {args.keystore}: v{keystore.version} {keystore.ciphersuite}, "
+                  f"{keystore.count} shares, threshold {keystore.min_signers}")
@@ -0,0 +1,319 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import contextlib
+
+DEFAULT_RATE = 5.0
+DEFAULT_SIGNERS = 5
+DEFAULT_THRESHOLD = 3
+DEFAULT_DURATION = 60.0
+DRAIN_TIMEOUT = 30.0
+SAMPLE_INTERVAL = 1.0
+SOAK_SAMPLE_INTERVAL = 60.0
+BROADCAST_POLL_INTERVAL = 0.02
+# Stages whose published rate falls below this share of the offered rate count as saturated.
+SATURATION_RATIO = 0.9
+SIGN_WINDOW = ("00:00", "23:59")
+TRACKED_PATHS = ["note_contents.db", "note_contents.db-wal", "signed_notes.log",
+                 "keys/signature_ledger", "keys/latest_note_signature.txt"]
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def rss_bytes():
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def path_size(path):
+    if os.path.isdir(path):
+        return sum(path_size(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def start_relay(delay=0.0, failure_rate=0.0):
+    """Run a LocalRelay on its own thread and event loop, so signing never stalls it."""
+    from local_relay import LocalRelay
+    relay = LocalRelay(port=0, delay=delay, failure_rate=failure_rate)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(relay.start())
+        started.set()
+        loop.run_forever()
+        loop.run_until_complete(relay.close())
+        loop.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+    return relay, stop
+
+class LoadRun:
+    """One load stage: Poisson submissions, M signers, broadcasts, and a local relay.
+
+    Notes are submitted through their own note store connection, signed by
+    the auto signer daemon loop (one task per share, as run_daemon does),
+    and broadcast by cli.broadcast_all from a separate thread that keeps a
+    warm relay publisher, like `cli.py serve`. Latency runs from submit to
+    the end of the broadcast_all call that published the note.
+    """
+
+    def __init__(self, rate, signers, threshold, duration, sample_interval=SAMPLE_INTERVAL,
+                 soak_interval=None, drain_timeout=DRAIN_TIMEOUT):
+        self.rate = rate
+        self.signers = signers
+        self.threshold = threshold
+        self.duration = duration
+        self.sample_interval = sample_interval
+        self.soak_interval = soak_interval
+        self.drain_timeout = drain_timeout
+        self.submitted = {}
+        self.published = {}
+        self.errors = {"sign": 0, "broadcast": 0, "submit": 0}
+        self.depth_samples = []
+        self.soak_samples = []
+        self._stop = threading.Event()
+        self._started = None
+        self._submit_ended = None
+        self._counters_before = {}
+
+    def _broadcast_loop(self):
+        import cli
+        cli._warm = cli.WarmState()
+        try:
+            while not self._stop.is_set():
+                try:
+                    results = cli.broadcast_all(self.threshold) or {}
+                except Exception:
+                    self.errors["broadcast"] += 1
+                    results = {}
+                published_at = time.perf_counter()
+                for note_id, (signature, _) in results.items():
+                    if signature:
+                        self.published[note_id] = published_at
+                    else:
+                        self.errors["sign"] += 1
+                if not results:
+                    time.sleep(BROADCAST_POLL_INTERVAL)
+        finally:
+            cli._warm.close()
+            cli._warm = None
+
+    async def _submit(self, store):
+        from cli import read_group_key
+        # Submit the way `cli.py submit` does, so dedup is part of the measured path.
+        group_key = read_group_key()
+        loop = asyncio.get_running_loop()
+        end = loop.time() + self.duration
+        next_at = loop.time()
+        while True:
+            next_at += random.expovariate(self.rate)
+            if next_at >= end:
+                break
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+            try:
+                note_id, _ = store.submit_note(f"load note {len(self.submitted)} at {time.time():.6f}", group_key)
+            except Exception:
+                self.errors["submit"] += 1
+                continue
+            self.submitted[note_id] = time.perf_counter()
+
+    async def _drain(self):
+        deadline = time.perf_counter() + self.drain_timeout
+        while time.perf_counter() < deadline and not self.submitted.keys() <= self.published.keys():
+            await asyncio.sleep(self.sample_interval / 10)
+
+    def _soak_sample(self, elapsed):
+        sample = {"t": round(elapsed, 1), "rss_bytes": rss_bytes(),
+                  "files": {path: path_size(path) for path in TRACKED_PATHS}}
+        self.soak_samples.append(sample)
+        print(f"🧪 soak t={elapsed:.0f}s rss={sample['rss_bytes'] / 2**20:.1f} MiB "
+              f"files={sum(sample['files'].values()) / 2**20:.1f} MiB "
+              f"published={len(self.published)}/{len(self.submitted)}", file=sys.stderr)
+
+    async def _sample(self, store):
+        next_soak = 0.0
+        while True:
+            elapsed = time.perf_counter() - self._started
+            self.depth_samples.append((round(elapsed, 2), store.count("pending")))
+            if self.soak_interval and elapsed >= next_soak:
+                self._soak_sample(elapsed)
+                next_soak += self.soak_interval
+            await asyncio.sleep(self.sample_interval)
+
+    async def run(self):
+        from note_store import NoteStore
+        from auto_signer import QueueWatcher, run_signer
+        from metrics import metrics
+
+        configs = [{"share_id": str(share), "sign_start": SIGN_WINDOW[0], "sign_end": SIGN_WINDOW[1]}
+                   for share in range(1, self.signers + 1)]
+        self._counters_before = dict(metrics.counters)
+        self._started = time.perf_counter()
+        with NoteStore() as signer_store, NoteStore() as submit_store:
+            watcher = QueueWatcher(signer_store)
+            tasks = [asyncio.create_task(watcher.run()), asyncio.create_task(self._sample(submit_store))]
+            tasks += [asyncio.create_task(run_signer(config, signer_store, watcher)) for config in configs]
+            broadcaster = threading.Thread(target=self._broadcast_loop, daemon=True)
+            broadcaster.start()
+            try:
+                await self._submit(submit_store)
+                self._submit_ended = time.perf_counter()
+                await self._drain()
+            finally:
+                elapsed = time.perf_counter() - self._started
+                self._stop.set()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await asyncio.to_thread(broadcaster.join)
+            if self.soak_interval:
+                self._soak_sample(elapsed)
+        return self.report(elapsed)
+
+    def _counted(self, name, result):
+        """How much a metrics counter grew during this run, summed over its other labels."""
+        from metrics import metrics
+        return sum(value - self._counters_before.get((counter, labels), 0)
+                   for (counter, labels), value in list(metrics.counters.items())
+                   if counter == name and ("result", result) in labels)
+
+    def report(self, elapsed):
+        latencies = [1000 * (self.published[note_id] - submitted_at)
+                     for note_id, submitted_at in self.submitted.items() if note_id in self.published]
+        errors = dict(self.errors)
+        errors["relay"] = self._counted("relay_publishes", "failed")
+        errors["rejected_shares"] = self._counted("signature_shares", "rejected")
+        errors["unpublished"] = len(self.submitted.keys() - self.published.keys())
+        depths = [depth for _, depth in self.depth_samples]
+        # Sustained throughput: notes published while submissions were still arriving.
+        window_end = self._submit_ended or self._started + elapsed
+        window = window_end - self._started
+        in_window = sum(1 for published_at in self.published.values() if published_at <= window_end)
+        throughput = in_window / window if window else 0.0
+        offered = len(self.submitted) / window if window else 0.0
+        report = {
+            "rate": self.rate,
+            "signers": self.signers,
+            "threshold": self.threshold,
+            "duration": self.duration,
+            "elapsed_seconds": round(elapsed, 2),
+            "submitted": len(self.submitted),
+            "published": len(self.published),
+            "throughput_per_second": round(throughput, 2),
+            "offered_per_second": round(offered, 2),
+            "saturated": throughput < SATURATION_RATIO * offered or bool(errors["unpublished"]),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50), 1) if latencies else None,
+                "p99": round(percentile(latencies, 0.99), 1) if latencies else None,
+                "max": round(max(latencies), 1) if latencies else None,
+            },
+            "queue_depth": {
+                "max": max(depths) if depths else 0,
+                "mean": round(sum(depths) / len(depths), 1) if depths else 0,
+                "samples": self.depth_samples,
+            },
+            "errors": errors,
+        }
+        if self.soak_samples:
+            first, last = self.soak_samples[0], self.soak_samples[-1]
+            report["soak"] = {
+                "rss_growth_bytes": last["rss_bytes"] - first["rss_bytes"],
+                "file_growth_bytes": {path: last["files"][path] - first["files"][path] for path in TRACKED_PATHS},
+                "samples": self.soak_samples,
+            }
+        return report
+
+def run_stage(rate, args, workdir):
+    """Run one stage in a fresh directory with its own keys, note store and relay."""
+    import signature_ledger
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    relay, stop_relay = start_relay(args.relay_delay, args.relay_failure_rate)
+    os.environ["NOSTR_RELAYS"] = relay.url
+    soak_interval = args.soak_interval if args.soak else None
+    duration = args.soak * 3600 if args.soak else args.duration
+    run = LoadRun(rate, args.signers, args.threshold, duration, args.sample_interval, soak_interval)
+    try:
+        # Everything the pipeline prints per note goes to devnull; progress goes to stderr.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            import keygen
+            keygen.generate_and_store_shares(args.signers, args.threshold)
+            report = asyncio.run(run.run())
+    finally:
+        stop_relay()
+        # The process-wide ledger holds files open in this stage's directory.
+        if signature_ledger._default_ledger is not None:
+            signature_ledger._default_ledger.close()
+            signature_ledger._default_ledger = None
+        os.chdir(cwd)
+    report["relay"] = dict(relay.stats)
+    latency = report["latency_ms"]
+    print(f"📈 rate {rate:>7.1f}/s → published {report['throughput_per_second']:>7.2f}/s  "
+          f"p50 {latency['p50']} ms  p99 {latency['p99']} ms  max depth {report['queue_depth']['max']}  "
+          f"errors {sum(report['errors'].values())}{'  ⚠️ saturated' if report['saturated'] else ''}",
+          file=sys.stderr)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load and soak test of submit → auto sign → broadcast → publish")
+    parser.add_argument("--rates", type=lambda value: [float(item) for item in value.split(",")],
+                        default=[DEFAULT_RATE], help="Mean submissions per second; several (e.g. 1,5,20) run as stages")
+    parser.add_argument("--signers", type=int, default=DEFAULT_SIGNERS, help="Simulated signers (shares)")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="Signatures required per note")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Seconds of submissions per stage")
+    parser.add_argument("--soak", type=float, help="Soak mode: run this many hours and track memory and file growth")
+    parser.add_argument("--soak_interval", type=float, default=SOAK_SAMPLE_INTERVAL, help="Seconds between soak samples")
+    parser.add_argument("--sample_interval", type=float, default=SAMPLE_INTERVAL, help="Seconds between queue depth samples")
+    parser.add_argument("--relay_delay", type=float, default=0.0, help="Seconds the local relay waits before acknowledging")
+    parser.add_argument("--relay_failure_rate", type=float, default=0.0, help="Fraction of events the local relay rejects")
+    parser.add_argument("--workdir", help="Keep keys, note store and logs here instead of a temporary directory")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    stages = []
+    for rate in args.rates:
+        if args.workdir:
+            stage_dir = os.path.join(os.path.abspath(args.workdir), f"rate-{rate:g}")
+            os.makedirs(stage_dir, exist_ok=True)
+            stages.append(run_stage(rate, args, stage_dir))
+        else:
+            with tempfile.TemporaryDirectory() as scratch:
+                stages.append(run_stage(rate, args, scratch))
+
+    saturated = [stage["rate"] for stage in stages if stage["saturated"]]
+    report = {"created_at": int(time.time()), "stages": stages,
+              "max_sustained_rate": max((stage["rate"] for stage in stages if not stage["saturated"]), default=None),
+              "first_saturated_rate": min(saturated, default=None)}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report saved → {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import os
+import json
+import base64
+import random
+import asyncio
+import hashlib
+import argparse
+import struct
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7777
+
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+def matches_filter(event, nostr_filter):
+    if "ids" in nostr_filter and event.get("id") not in nostr_filter["ids"]:
+        return False
+    if "authors" in nostr_filter and event.get("pubkey") not in nostr_filter["authors"]:
+        return False
+    if "kinds" in nostr_filter and event.get("kind") not in nostr_filter["kinds"]:
+        return False
+    if "since" in nostr_filter and event.get("created_at", 0) < nostr_filter["since"]:
+        return False
+    if "until" in nostr_filter and event.get("created_at", 0) > nostr_filter["until"]:
+        return False
+    return True
+
+class LocalRelay:
+    """In-process stand-in for a Nostr relay, for tests and load runs.
+
+    Speaks just enough of RFC 6455 and NIP-01 (EVENT, REQ, CLOSE, OK, EOSE)
+    for nostr_sdk clients. Events are accepted without signature checks and
+    kept in memory. A per-event delay and a failure rate can be injected.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, delay=0.0, failure_rate=0.0):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.events = []
+        self.stats = {"connections": 0, "accepted": 0, "rejected": 0, "subscriptions": 0}
+        self._subscriptions = {}
+        self._clients = {}
+        self._server = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await asyncio.gather(*self._clients.values(), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _handle_client(self, reader, writer):
+        self._clients[writer] = asyncio.current_task()
+        try:
+            if not await self._handshake(reader, writer):
+                return
+            self.stats["connections"] += 1
+            while True:
+                opcode, payload = await self._read_frame(reader)
+                if opcode == OP_CLOSE:
+                    self._write_frame(writer, OP_CLOSE, b"")
+                    break
+                if opcode == OP_PING:
+                    self._write_frame(writer, OP_PONG, payload)
+                elif opcode == OP_TEXT:
+                    await self._handle_message(writer, json.loads(payload.decode("utf-8")))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            for key in [key for key in self._subscriptions if key[0] is writer]:
+                del self._subscriptions[key]
+            writer.close()
+
+    async def _handshake(self, reader, writer):
+        request = await reader.readuntil(b"\r\n\r\n")
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if key is None:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            writer.close()
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        await writer.drain()
+        return True
+
+    async def _read_frame(self, reader):
+        first, second = await reader.readexactly(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        # Fragmented messages are not used by Nostr clients; treat each frame as whole.
+        return opcode, payload
+
+    @staticmethod
+    def _write_frame(writer, opcode, payload):
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([length])
+        elif length < 1 << 16:
+            header += bytes([126]) + struct.pack("!H", length)
+        else:
+            header += bytes([127]) + struct.pack("!Q", length)
+        writer.write(header + payload)
+
+    def _send(self, writer, message):
+        self._write_frame(writer, OP_TEXT, json.dumps(message).encode("utf-8"))
+
+    async def _handle_message(self, writer, message):
+        kind = message[0]
+        if kind == "EVENT":
+            event = message[1]
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.failure_rate and random.random() < self.failure_rate:
+                self.stats["rejected"] += 1
+                self._send(writer, ["OK", event.get("id"), False, "error: injected failure"])
+                return
+            self.events.append(event)
+            self.stats["accepted"] += 1
+            self._send(writer, ["OK", event.get("id"), True, ""])
+            for (sub_writer, sub_id), filters in list(self._subscriptions.items()):
+                if any(matches_filter(event, f) for f in filters):
+                    self._send(sub_writer, ["EVENT", sub_id, event])
+                    await sub_writer.drain()
+        elif kind == "REQ":
+            sub_id, filters = message[1], message[2:] or [{}]
+            self._subscriptions[(writer, sub_id)] = filters
+            self.stats["subscriptions"] += 1
+            for nostr_filter in filters:
+                matched = [e for e in self.events if matches_filter(e, nostr_filter)]
+                if "limit" in nostr_filter:
+                    matched = matched[-nostr_filter["limit"]:]
+                for event in matched:
+                    self._send(writer, ["EVENT", sub_id, event])
+            self._send(writer, ["EOSE", sub_id])
+        elif kind == "CLOSE":
+            self._subscriptions.pop((writer, message[1]), None)
+
+async def serve_forever(host, port, delay, failure_rate):
+    relay = await LocalRelay(host, port, delay, failure_rate).start()
+    print(f"🛰️ Local relay listening on {relay.url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await relay.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Nostr relay stand-in")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=int(os.getenv("LOCAL_RELAY_PORT", DEFAULT_PORT)))
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before acknowledging an event")
+    parser.add_argument("--failure_rate", type=float, default=0.0, help="Fraction of events to reject")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve_forever(args.host, args.port, args.delay, args.failure_rate))
+    except KeyboardInterrupt:
+        pass
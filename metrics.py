@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from sub-millisecond native calls to slow relays.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_PREFIX = "frost_"
+TRACE_ENV = "FROST_TRACE"
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def as_dict(self):
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+        return {"count": self.count, "sum": round(self.total, 6), "buckets": cumulative}
+
+class Metrics:
+    """Process-wide counters, gauges and latency histograms.
+
+    Every metric is identified by a name plus optional labels. Updates are
+    plain dictionary operations under one lock, cheap enough to leave on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._trace = None
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def trace_to(self, stream):
+        """Also write every finished span as one JSON line to stream (None turns tracing off)."""
+        self._trace = stream
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time a block; records <name>_seconds and, when tracing, a structured span line."""
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe(f"{name}_seconds", elapsed, **labels)
+            if self._trace is not None:
+                record = {"span": name, "ms": round(1000 * elapsed, 3), "at": round(time.time(), 3), **labels}
+                if error:
+                    record["error"] = error
+                self._trace.write(json.dumps(record) + "\n")
+                self._trace.flush()
+
+    def snapshot(self):
+        def flatten(items, convert=lambda v: v):
+            return [{"name": name, "labels": dict(labels), "value": convert(value)}
+                    for (name, labels), value in sorted(items)]
+        with self._lock:
+            return {
+                "counters": flatten(self.counters.items()),
+                "gauges": flatten(self.gauges.items()),
+                "histograms": flatten(self.histograms.items(), Histogram.as_dict),
+                "native_phases": native_phase_timings(),
+            }
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def render_prometheus(self):
+        lines = []
+
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{METRICS_PREFIX}{name}_total{label_text(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                lines.append(f"{METRICS_PREFIX}{name}{label_text(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                for bound, count in histogram.as_dict()["buckets"].items():
+                    lines.append(f"{METRICS_PREFIX}{name}_bucket{label_text(labels, [('le', bound)])} {count}")
+                lines.append(f"{METRICS_PREFIX}{name}_sum{label_text(labels)} {histogram.total}")
+                lines.append(f"{METRICS_PREFIX}{name}_count{label_text(labels)} {histogram.count}")
+        for phase, timing in native_phase_timings().items():
+            labels = label_text([("phase", phase)])
+            lines.append(f"{METRICS_PREFIX}native_phase_seconds_sum{labels} {timing['total_ns'] / 1e9}")
+            lines.append(f"{METRICS_PREFIX}native_phase_seconds_count{labels} {timing['count']}")
+            lines.append(f"{METRICS_PREFIX}native_phase_seconds_max{labels} {timing['max_ns'] / 1e9}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Dump to path: Prometheus text for *.prom, JSON otherwise."""
+        if path.endswith(".prom"):
+            with open(path, "w") as f:
+                f.write(self.render_prometheus())
+        else:
+            self.dump_json(path)
+
+metrics = Metrics()
+
+def native_phase_timings():
+    try:
+        from frostpy import phase_timings_py
+    except ImportError:
+        return {}
+    return phase_timings_py()
+
+def enable_native_timing(enabled=True):
+    """Turn native phase timing on or off; without a usable frostpy only Python spans are recorded."""
+    try:
+        from frostpy import set_timing_enabled_py
+    except ImportError as e:
+        print(f"⚠️ Native phase timing disabled: {e}", file=sys.stderr)
+        return False
+    set_timing_enabled_py(enabled)
+    return True
+
+def configure_from_env():
+    """FROST_TRACE=1 traces spans to stderr, FROST_TRACE=<path> appends them to a file."""
+    target = os.getenv(TRACE_ENV)
+    if not target:
+        return
+    metrics.trace_to(sys.stderr if target == "1" else open(target, "a"))
+    enable_native_timing()
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Expose /metrics (Prometheus text) and /metrics.json from a background thread."""
+    enable_native_timing()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.render_prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+configure_from_env()
@@ -0,0 +1,482 @@
+import os
+import sys
+import json
+import time
+import base64
+import asyncio
+import argparse
+from collections import deque
+
+from frostpy import round1_commit_py, round2_sign_py, aggregate_py, verify_signature_share_py
+from signer_scheduler import SignerScheduler, PROFILES_FILE
+from prehash import check_raw_message
+
+DEFAULT_TIMEOUT = 2.0
+PREFETCH_COMMITMENTS = 8
+MAX_OUTSTANDING_NONCES = 1024
+MAX_SIGN_ATTEMPTS = 3
+LATENCY_SMOOTHING = 0.2
+
+# Wire format: one JSON object per line. Requests carry an "id" that the reply
+# echoes, so several requests can be in flight on one connection. Binary
+# fields (commitments, signature shares) are base64.
+
+def encode_bytes(data):
+    return base64.b64encode(data).decode("ascii")
+
+def decode_bytes(text):
+    return base64.b64decode(text)
+
+def parse_address(address):
+    """'unix:/path/to.sock' or 'host:port' → ("unix", path) / ("tcp", (host, port))"""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, port = address.rsplit(":", 1)
+    return "tcp", (host, int(port))
+
+async def open_connection(address):
+    kind, target = parse_address(address)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(target)
+    return await asyncio.open_connection(*target)
+
+async def start_server(handler, address):
+    kind, target = parse_address(address)
+    if kind == "unix":
+        if os.path.exists(target):
+            os.unlink(target)
+        return await asyncio.start_unix_server(handler, target)
+    return await asyncio.start_server(handler, *target)
+
+def write_message(writer, message):
+    writer.write((json.dumps(message) + "\n").encode("utf-8"))
+
+class ParticipantServer:
+    """One signer holding only its own key package.
+
+    Serves round 1 ("commit", possibly many nonces ahead of time) and round 2
+    ("sign" with a nonce handed out earlier). Nonces stay in this process and
+    each one is used for at most one signature; the oldest unused nonces are
+    dropped once more than max_outstanding are waiting. An optional
+    (SIGN_START, SIGN_END) window is announced to coordinators.
+
+    Coordinators are not authenticated: anyone who can connect can have this
+    share sign any message. Listen only on a trusted network, e.g. a Unix
+    socket, localhost behind an SSH tunnel, or a VPN between the signers.
+    """
+
+    def __init__(self, key_package, address, max_outstanding=MAX_OUTSTANDING_NONCES, sign_window=(None, None)):
+        self.key_package = key_package
+        self.address = address
+        self.max_outstanding = max_outstanding
+        self.sign_window = sign_window
+        self.stats = {"commitments": 0, "signatures": 0, "errors": 0}
+        self._nonces = {}
+        self._next_nonce_id = 1
+        self._server = None
+
+    async def start(self):
+        self._server = await start_server(self._handle_client, self.address)
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                try:
+                    reply = {"id": request.get("id"), "ok": True, **self._dispatch(request)}
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    reply = {"id": request.get("id"), "ok": False, "error": str(e)}
+                write_message(writer, reply)
+                await writer.drain()
+        except (ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            writer.close()
+
+    def _dispatch(self, request):
+        op = request.get("op")
+        if op == "hello":
+            return {"identifier": self.key_package.identifier, "min_signers": self.key_package.min_signers,
+                    "sign_start": self.sign_window[0], "sign_end": self.sign_window[1]}
+        if op == "commit":
+            return {"commitments": [self._commit() for _ in range(int(request.get("count", 1)))]}
+        if op == "sign":
+            return {"signature_share": self._sign(request)}
+        raise ValueError(f"Unknown op {op!r}")
+
+    def _commit(self):
+        nonces, commitment = round1_commit_py(self.key_package)
+        nonce_id = self._next_nonce_id
+        self._next_nonce_id += 1
+        self._nonces[nonce_id] = nonces
+        while len(self._nonces) > self.max_outstanding:
+            del self._nonces[next(iter(self._nonces))]
+        self.stats["commitments"] += 1
+        return {"nonce_id": nonce_id, "commitment": encode_bytes(commitment)}
+
+    def _sign(self, request):
+        nonces = self._nonces.pop(request["nonce_id"], None)
+        if nonces is None:
+            raise ValueError(f"Unknown or already used nonce {request['nonce_id']}")
+        commitments = {identifier: decode_bytes(c) for identifier, c in request["commitments"].items()}
+        signature_share = round2_sign_py(request["message"], commitments, nonces, self.key_package)
+        self.stats["signatures"] += 1
+        return encode_bytes(signature_share)
+
+class ParticipantConnection:
+    """Coordinator's connection to one participant, with pipelined requests."""
+
+    def __init__(self, address, reader, writer):
+        self.address = address
+        self.reader = reader
+        self.writer = writer
+        self.identifier = None
+        self.sign_window = (None, None)
+        self.commitments = deque()
+        self.latency = None
+        self.failures = 0
+        self._pending = {}
+        self._next_id = 1
+        self._reader_task = asyncio.create_task(self._read_replies())
+        self._refill_task = None
+
+    @classmethod
+    async def connect(cls, address, timeout=DEFAULT_TIMEOUT):
+        reader, writer = await asyncio.wait_for(open_connection(address), timeout)
+        connection = cls(address, reader, writer)
+        hello = await connection.request("hello", timeout)
+        connection.identifier = hello["identifier"]
+        connection.sign_window = (hello.get("sign_start"), hello.get("sign_end"))
+        return connection
+
+    @property
+    def alive(self):
+        return not self._reader_task.done()
+
+    async def request(self, op, timeout=DEFAULT_TIMEOUT, **fields):
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        started = time.monotonic()
+        write_message(self.writer, {"id": request_id, "op": op, **fields})
+        try:
+            await self.writer.drain()
+            reply = await asyncio.wait_for(future, timeout)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+        elapsed = time.monotonic() - started
+        self.latency = elapsed if self.latency is None else \
+            (1 - LATENCY_SMOOTHING) * self.latency + LATENCY_SMOOTHING * elapsed
+        if not reply.get("ok"):
+            self.failures += 1
+            raise ValueError(f"{self.address}: {reply.get('error')}")
+        return reply
+
+    async def fetch_commitments(self, count, timeout=DEFAULT_TIMEOUT):
+        reply = await self.request("commit", timeout, count=count)
+        for entry in reply["commitments"]:
+            self.commitments.append((entry["nonce_id"], decode_bytes(entry["commitment"])))
+        return len(reply["commitments"])
+
+    def schedule_refill(self, target, timeout=DEFAULT_TIMEOUT):
+        """Top the commitment queue up to target in the background."""
+        missing = target - len(self.commitments)
+        if missing <= 0 or not self.alive or (self._refill_task and not self._refill_task.done()):
+            return
+        self._refill_task = asyncio.create_task(self.fetch_commitments(missing, timeout))
+        self._refill_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def close(self):
+        for task in (self._refill_task, self._reader_task):
+            if task is not None:
+                task.cancel()
+        self.writer.close()
+        await asyncio.gather(*(t for t in (self._refill_task, self._reader_task) if t), return_exceptions=True)
+
+    async def _read_replies(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                future = self._pending.get(reply.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"{self.address} disconnected"))
+
+class SigningPackageFailed(Exception):
+    def __init__(self, failed):
+        super().__init__(", ".join(f"{c.address}: {error!r}" for c, error in failed))
+        self.failed = failed
+
+class Coordinator:
+    """Runs FROST signing against remote participants.
+
+    Round 1 is fanned out to every participant and completes as soon as
+    `threshold` of them have answered; stragglers keep filling their queues in
+    the background. Commitments are fetched ahead of time (`prefetch` per
+    participant), so a signature usually takes a single round trip: round 2
+    to the chosen signers, then a local aggregate. Every signature share is
+    checked against its signer's verifying share before aggregation. If a
+    chosen signer fails, times out or returns an invalid share in round 2, it
+    is dropped and signing is retried with the others.
+
+    The scheduler picks the threshold cheapest available signers from their
+    recent round-2 latencies, failures and sign windows. Signers backing off
+    after a failure are still used when there are too few others. With
+    hedge=k, a second signing package is sent at the same time, with the k
+    most expensive chosen signers swapped for the next k. A FROST package needs a
+    share from every signer in it, so the hedge is a whole second package,
+    not a spare share. The first package to complete is aggregated and the
+    other one is cancelled.
+    """
+
+    def __init__(self, addresses, pubkey_package, threshold, timeout=DEFAULT_TIMEOUT, prefetch=PREFETCH_COMMITMENTS,
+                 scheduler=None, hedge=0):
+        self.addresses = list(addresses)
+        self.pubkey_package = pubkey_package
+        self.threshold = threshold
+        self.timeout = timeout
+        self.prefetch = prefetch
+        self.scheduler = scheduler or SignerScheduler()
+        self.hedge = hedge
+        self.connections = []
+        self.stats = {"signatures": 0, "retries": 0, "one_round_trip": 0, "commit_rounds": 0,
+                      "hedged": 0, "hedge_wins": 0, "cancelled_packages": 0, "invalid_shares": 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        results = await asyncio.gather(
+            *(ParticipantConnection.connect(address, self.timeout) for address in self.addresses),
+            return_exceptions=True)
+        for address, result in zip(self.addresses, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ Participant {address} unavailable: {result}")
+            else:
+                self.connections.append(result)
+        if len(self.connections) < self.threshold:
+            await self.close()
+            raise ConnectionError(f"Only {len(self.connections)} of {self.threshold} required participants reachable")
+        for connection in self.connections:
+            self.scheduler.set_window(connection.identifier, *connection.sign_window)
+            connection.schedule_refill(self.prefetch, self.timeout)
+
+    async def close(self):
+        await asyncio.gather(*(connection.close() for connection in self.connections), return_exceptions=True)
+        self.connections = []
+
+    def _choose(self, excluded=()):
+        """(chosen, spares) among the participants with a queued commitment, per the scheduler."""
+        ready = {c.identifier: c for c in self.connections if c.alive and c.commitments and c not in excluded}
+        chosen, spares = self.scheduler.choose(ready, self.threshold, self.hedge)
+        return [ready[identifier] for identifier in chosen], [ready[identifier] for identifier in spares]
+
+    async def _commit_round(self, excluded=()):
+        """Fetch commitments from everyone who has none, until threshold signers are ready."""
+        self.stats["commit_rounds"] += 1
+        pending = {asyncio.create_task(c.fetch_commitments(1, self.timeout))
+                   for c in self.connections if c.alive and not c.commitments and c not in excluded}
+        deadline = time.monotonic() + self.timeout
+        while pending and len(self._choose(excluded)[0]) < self.threshold:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            # Late answers still land in the participant's queue for the next note.
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def sign(self, message):
+        check_raw_message(message)
+        excluded = set()
+        for attempt in range(MAX_SIGN_ATTEMPTS):
+            one_round_trip = len(self._choose(excluded)[0]) >= self.threshold
+            if not one_round_trip:
+                await self._commit_round(excluded)
+            chosen, spares = self._choose(excluded)
+            if len(chosen) < self.threshold:
+                raise TimeoutError(f"Only {len(chosen)} of {self.threshold} participants committed in time")
+
+            packages = [chosen]
+            hedge_package = self._hedge_package(chosen, spares)
+            if hedge_package:
+                packages.append(hedge_package)
+                self.stats["hedged"] += 1
+            tasks = [asyncio.create_task(self._sign_package(package, message)) for package in packages]
+
+            result, failed = None, []
+            pending = set(tasks)
+            while pending and result is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                        self.stats["hedge_wins"] += task is not tasks[0]
+                    except SigningPackageFailed as e:
+                        failed.extend(e.failed)
+            for task in pending:
+                task.cancel()
+            self.stats["cancelled_packages"] += len(pending)
+            await asyncio.gather(*pending, return_exceptions=True)
+            for connection in self.connections:
+                connection.schedule_refill(self.prefetch, self.timeout)
+
+            for connection, error in failed:
+                print(f"⚠️ Participant {connection.address} failed round 2: {error!r}")
+                # Its queued commitments may refer to nonces it no longer has.
+                connection.commitments.clear()
+                excluded.add(connection)
+            if result is None:
+                self.stats["retries"] += 1
+                continue
+
+            commitments, signature_shares = result
+            signature = aggregate_py(message, commitments, signature_shares, self.pubkey_package)
+            self.stats["signatures"] += 1
+            self.stats["one_round_trip"] += one_round_trip and attempt == 0
+            return signature
+        raise TimeoutError(f"Signing failed after {MAX_SIGN_ATTEMPTS} attempts")
+
+    def _hedge_package(self, chosen, spares):
+        """chosen with its most expensive members swapped for the spares, or None."""
+        if not spares:
+            return None
+        kept = chosen[:len(chosen) - len(spares)]
+        # Signers in both packages sign twice, with a separate nonce each time.
+        if any(len(connection.commitments) < 2 for connection in kept):
+            return None
+        return kept + spares
+
+    async def _sign_package(self, package, message):
+        """Round 2 for one signing package; returns (commitments, signature shares)."""
+        nonce_ids = {}
+        commitments = {}
+        for connection in package:
+            nonce_ids[connection], commitments[connection.identifier] = connection.commitments.popleft()
+        wire_commitments = {identifier: encode_bytes(c) for identifier, c in commitments.items()}
+        replies = await asyncio.gather(
+            *(self._sign_share(connection, nonce_ids[connection], message, wire_commitments) for connection in package),
+            return_exceptions=True)
+        failed = [(c, reply) for c, reply in zip(package, replies) if isinstance(reply, Exception)]
+        signature_shares = {}
+        for connection, reply in zip(package, replies):
+            if isinstance(reply, Exception):
+                continue
+            signature_share = decode_bytes(reply["signature_share"])
+            if not verify_signature_share_py(message, commitments, connection.identifier, signature_share,
+                                             self.pubkey_package):
+                self.stats["invalid_shares"] += 1
+                self.scheduler.record_failure(connection.identifier)
+                failed.append((connection, ValueError("invalid signature share")))
+                continue
+            signature_shares[connection.identifier] = signature_share
+        if failed:
+            raise SigningPackageFailed(failed)
+        return commitments, signature_shares
+
+    async def _sign_share(self, connection, nonce_id, message, wire_commitments):
+        started = time.monotonic()
+        try:
+            reply = await connection.request("sign", self.timeout, nonce_id=nonce_id, message=message,
+                                             commitments=wire_commitments)
+        except Exception:
+            self.scheduler.record_failure(connection.identifier)
+            raise
+        self.scheduler.record_success(connection.identifier, time.monotonic() - started)
+        return reply
+
+    def report(self):
+        return {
+            **self.stats,
+            "scheduler": self.scheduler.report(),
+            "participants": {
+                c.address: {"alive": c.alive, "queued_commitments": len(c.commitments), "failures": c.failures,
+                            "latency_ms": round(1000 * c.latency, 2) if c.latency is not None else None}
+                for c in self.connections
+            },
+        }
+
+async def run_participant(share_path, address, sign_window=(None, None)):
+    from required_shares_sign_event import load_key_package
+    server = await ParticipantServer(load_key_package(share_path), address, sign_window=sign_window).start()
+    print(f"🔏 Participant {share_path} listening on {address}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+async def run_coordinator(addresses, threshold, note_contents, timeout, hedge=0):
+    from required_shares_sign_event import load_public_key_package, save_note_signature
+    scheduler = SignerScheduler(path=PROFILES_FILE)
+    try:
+        async with Coordinator(addresses, load_public_key_package(), threshold, timeout,
+                               scheduler=scheduler, hedge=hedge) as coordinator:
+            for note_content in note_contents:
+                started = time.monotonic()
+                signature = await coordinator.sign(note_content)
+                print(f"✅ Signed '{note_content}' in {1000 * (time.monotonic() - started):.1f} ms: {signature}")
+                save_note_signature(signature, note_content)
+            print(f"📊 {json.dumps(coordinator.report())}")
+    finally:
+        scheduler.save()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FROST signing over the network")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    participant_parser = subparsers.add_parser("participant", help="Serve rounds 1 and 2 for one share")
+    participant_parser.add_argument("--share", required=True, help="Path to this participant's share file")
+    participant_parser.add_argument("--listen", required=True, help="host:port or unix:/path/to.sock")
+    participant_parser.add_argument("--sign_start", default=os.getenv("SIGN_START"), help="HH:MM signing window start")
+    participant_parser.add_argument("--sign_end", default=os.getenv("SIGN_END"), help="HH:MM signing window end")
+
+    coordinator_parser = subparsers.add_parser("coordinator", help="Sign notes with remote participants")
+    coordinator_parser.add_argument("--participants", nargs="+", required=True, help="Participant addresses")
+    coordinator_parser.add_argument("--required_shares", type=int, required=True, help="Threshold for signing")
+    coordinator_parser.add_argument("--note_content", nargs="+", required=True, help="Notes to sign")
+    coordinator_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds to wait per round")
+    coordinator_parser.add_argument("--hedge", type=int, default=0, help="Also send a backup package swapping in this many spare signers")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "participant":
+            asyncio.run(run_participant(args.share, args.listen, (args.sign_start, args.sign_end)))
+        else:
+            asyncio.run(run_coordinator(args.participants, args.required_shares, args.note_content, args.timeout,
+                                        args.hedge))
+    except KeyboardInterrupt:
+        sys.exit(0)
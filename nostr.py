@@ -1,17 +1,265 @@
 import asyncio
-from nostr_sdk import Keys, Client, EventBuilder, NostrSigner
+from nostr_sdk import Keys, Client, Event, EventBuilder
 import os
 import json
+import time
 import frostpy
+from metrics import metrics
+from verify_note_signature import verify_items
+from nostr_event import nostr_pubkey, verify_event
 
 SECRETS_DIR = "keys"
 RECENT_SIGNATURE_RECORD = os.path.join(SECRETS_DIR, "latest_note_signature.txt")
+PUBLIC_KEY_FILE = os.path.join(SECRETS_DIR, "public_key.txt")
+NOSTR_KEY_FILE = os.path.join(SECRETS_DIR, "nostr_private_key.txt")
+# Well-known development key, used only when no key is configured.
+DEV_NOSTR_PRIVATE_KEY = "nsec1j25teydgjpg32wke38zjl8ar3kvskjye63924h9rpt2mzekgep0smrx2kv"
+DEFAULT_RELAYS = ["wss://nos.lol/", "wss://relay.damus.io/"]
+
+PUBLISH_QUEUE_SIZE = 256
+PUBLISH_CONCURRENCY = 4
+CONNECT_TIMEOUT = 5.0
+RECONNECT_BACKOFF_MIN = 0.5
+RECONNECT_BACKOFF_MAX = 60.0
+
+def configured_relays():
+    """Relays from NOSTR_RELAYS (comma separated), e.g. ws://127.0.0.1:7777 for a local stand-in."""
+    relays = os.getenv("NOSTR_RELAYS")
+    if relays:
+        return [url.strip() for url in relays.split(",") if url.strip()]
+    return list(DEFAULT_RELAYS)
+
+def configured_private_key():
+    """The publishing nsec from NOSTR_PRIVATE_KEY or keys/nostr_private_key.txt, else the development key."""
+    private_key = os.getenv("NOSTR_PRIVATE_KEY")
+    if private_key:
+        return private_key.strip()
+    if os.path.exists(NOSTR_KEY_FILE):
+        with open(NOSTR_KEY_FILE, "r") as f:
+            return f.read().strip()
+    print(f"⚠️ No Nostr key configured (NOSTR_PRIVATE_KEY or {NOSTR_KEY_FILE}); publishing with the public development key.")
+    return DEV_NOSTR_PRIVATE_KEY
+
+def read_public_key():
+    if not os.path.exists(PUBLIC_KEY_FILE):
+        raise FileNotFoundError(f"Public key file not found at {PUBLIC_KEY_FILE}. Run 'python cli.py generate' first.")
+    with open(PUBLIC_KEY_FILE, "r") as f:
+        return f.read().strip()
+
+class RelayStats:
+    def __init__(self, url):
+        self.url = url
+        self.sent = 0
+        self.failed = 0
+        self.reconnects = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_error = None
+        self.backoff = 0.0
+        self.retry_at = 0.0
+
+    def record(self, ok, latency, error=None):
+        if ok:
+            self.sent += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self.backoff = 0.0
+        else:
+            self.failed += 1
+            self.last_error = error
+            self.backoff = min(max(self.backoff * 2, RECONNECT_BACKOFF_MIN), RECONNECT_BACKOFF_MAX)
+            self.retry_at = time.monotonic() + self.backoff
+
+    def as_dict(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "reconnects": self.reconnects,
+            "avg_latency_ms": round(1000 * self.total_latency / self.sent, 2) if self.sent else None,
+            "max_latency_ms": round(1000 * self.max_latency, 2),
+            "last_error": self.last_error,
+        }
+
+class NostrPublisher:
+    """Long-lived publisher that keeps relay connections open between notes.
+
+    Notes go through a bounded queue (publish() waits when it is full) and are
+    sent by a fixed number of workers. Each event is sent to every relay
+    separately so latency and failures are tracked per relay; a failing relay
+    is reconnected with exponential backoff.
+    """
+
+    def __init__(self, relays=None, private_key=None, queue_size=PUBLISH_QUEUE_SIZE,
+                 concurrency=PUBLISH_CONCURRENCY, connect_timeout=CONNECT_TIMEOUT):
+        self.relays = relays or configured_relays()
+        self._private_key = private_key
+        self._keys = None
+        # Events are signed before they are sent, so the client needs no signer.
+        self.client = Client()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.concurrency = concurrency
+        self.connect_timeout = connect_timeout
+        self.stats = {url: RelayStats(url) for url in self.relays}
+        self._workers = []
+
+    @property
+    def keys(self):
+        """The publishing key, read on first use: group-signed events never need it."""
+        if self._keys is None:
+            self._keys = Keys.parse(self._private_key or configured_private_key())
+        return self._keys
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self):
+        for url in self.relays:
+            await self.client.add_relay(url)
+        await self.client.connect()
+        await self._wait_connected()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Finish everything already queued, then close the relay connections."""
+        await self.queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.client.disconnect()
+
+    async def publish(self, note_content, signature_b64):
+        """Queue a FROST-signed note; the returned future resolves to the per-relay outcome."""
+        content = f"{note_content}\nFROST Signature: {signature_b64}"
+        return await self._enqueue(EventBuilder.text_note(content).sign_with_keys(self.keys))
+
+    async def publish_event(self, event):
+        """Queue an event that is already signed, e.g. one FROST-signed with the group key."""
+        return await self._enqueue(Event.from_json(json.dumps(event)))
+
+    async def _enqueue(self, event):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((event, future))
+        metrics.set_gauge("publish_queue_depth", self.queue.qsize())
+        return future
+
+    def report(self):
+        return {url: stats.as_dict() for url, stats in self.stats.items()}
+
+    async def _wait_connected(self):
+        # Wait until every relay is up (or the timeout passes) instead of sleeping a fixed second.
+        deadline = time.monotonic() + self.connect_timeout
+        while time.monotonic() < deadline:
+            relays = await self.client.relays()
+            if all(relay.is_connected() for relay in relays.values()):
+                return
+            await asyncio.sleep(0.05)
+
+    async def _worker(self):
+        while True:
+            event, future = await self.queue.get()
+            try:
+                outcomes = await asyncio.gather(*(self._send(url, event) for url in self.relays))
+                if not future.done():
+                    future.set_result({"event_id": event.id().to_bech32(), "relays": dict(zip(self.relays, outcomes))})
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def _send(self, url, event):
+        stats = self.stats[url]
+        if stats.retry_at > time.monotonic():
+            await asyncio.sleep(stats.retry_at - time.monotonic())
+        if stats.failed and stats.backoff:
+            stats.reconnects += 1
+            await self.client.connect()
+        started = time.monotonic()
+        with metrics.span("relay_publish", relay=url):
+            try:
+                output = await self.client.send_event_to([url], event)
+                ok = bool(output.success)
+                error = None if ok else str(output.failed)
+            except Exception as e:
+                ok, error = False, str(e)
+        stats.record(ok, time.monotonic() - started, error)
+        metrics.inc("relay_publishes", relay=url, result="ok" if ok else "failed")
+        return ok
+
+async def publish_notes(notes, publisher=None):
+    """Verify and publish (note_content, signature_b64) pairs, reusing one set of relay connections."""
+    notes = list(notes)
+    public_key_b64 = read_public_key()
+    verified = verify_items(notes, public_key_b64, frostpy.verify_batch_py)
+    own_publisher = publisher is None
+    if own_publisher:
+        publisher = NostrPublisher()
+        await publisher.start()
+    try:
+        futures = []
+        for (note_content, signature_b64), is_valid in zip(notes, verified):
+            if not is_valid:
+                print(f"❌ FROST note_signature verification failed for '{note_content}'. Not publishing.")
+                continue
+            print("✅ FROST note_signature verified successfully")
+            futures.append((note_content, signature_b64, await publisher.publish(note_content, signature_b64)))
+        for note_content, signature_b64, future in futures:
+            result = await future
+            sent = [url for url, ok in result["relays"].items() if ok]
+            failed = [url for url, ok in result["relays"].items() if not ok]
+            print(f"FROST Message: {note_content}")
+            print(f"FROST Signature: {signature_b64}")
+            print(f"Nostr Event ID: {result['event_id']}")
+            print(f"Sent to: {sent}")
+            print(f"Not sent to: {failed}")
+    finally:
+        if own_publisher:
+            await publisher.stop()
+            print(f"📡 Relay stats: {json.dumps(publisher.report())}")
+
+async def publish_events(events, publisher=None):
+    """Verify and publish events signed with the group key as their Nostr pubkey.
+
+    Each event gets the standard Nostr check (event id and BIP-340 signature),
+    the same one relays and clients run, and is published as is.
+    """
+    pubkey = nostr_pubkey(read_public_key())
+    own_publisher = publisher is None
+    if own_publisher:
+        publisher = NostrPublisher()
+        await publisher.start()
+    try:
+        futures = []
+        for event in events:
+            with metrics.span("verify_event"):
+                is_valid = verify_event(event, pubkey)
+            if not is_valid:
+                print(f"❌ Event signature verification failed for '{event.get('content')}'. Not publishing.")
+                continue
+            print("✅ Event signature verified successfully")
+            futures.append((event, await publisher.publish_event(event)))
+        for event, future in futures:
+            result = await future
+            sent = [url for url, ok in result["relays"].items() if ok]
+            failed = [url for url, ok in result["relays"].items() if not ok]
+            print(f"FROST Message: {event['content']}")
+            print(f"Group Pubkey: {event['pubkey']}")
+            print(f"Nostr Event ID: {result['event_id']}")
+            print(f"Sent to: {sent}")
+            print(f"Not sent to: {failed}")
+    finally:
+        if own_publisher:
+            await publisher.stop()
+            print(f"📡 Relay stats: {json.dumps(publisher.report())}")
 
 async def publish_frost_event():
     try:
-        private_key_hex = "nsec1j25teydgjpg32wke38zjl8ar3kvskjye63924h9rpt2mzekgep0smrx2kv"
         note_signature_file = RECENT_SIGNATURE_RECORD
-        public_key_file = os.path.join(SECRETS_DIR, "public_key.txt")
         if not os.path.exists(note_signature_file):
             raise FileNotFoundError(f"Signature file not found at {note_signature_file}. Run 'python cli.py broadcast' first.")
         with open(note_signature_file, "r") as f:
@@ -19,34 +267,10 @@ async def publish_frost_event():
             frost_note_signature_b64 = data["signature"]
             frost_note_content = data["note_content"]
 
-        if not os.path.exists(public_key_file):
-            raise FileNotFoundError(f"Public key file not found at {public_key_file}. Run 'python cli.py generate' first.")
-        with open(public_key_file, "r") as f:
-            public_key_b64 = f.read().strip()
-
-        if not frostpy.verify_signature_py(frost_note_content, frost_note_signature_b64, public_key_b64):
-            raise ValueError("FROST note_signature verification failed.")
-        print("✅ FROST note_signature verified successfully")
-
-        keys = Keys.parse(private_key_hex)
-        signer = NostrSigner.keys(keys)
-        client = Client(signer)
-
-        await client.add_relay("wss://nos.lol/")
-        await client.add_relay("wss://relay.damus.io/")
-        await client.connect()
-        await asyncio.sleep(1)
-
-        note_content = f"{frost_note_content}\nFROST Signature: {frost_note_signature_b64}"
-        event_builder = EventBuilder.text_note(note_content)
-
-        res = await client.send_event_builder(event_builder)
-        event_id = res.id.to_bech32() if res.id else "Failed to get ID"
-        print(f"FROST Message: {frost_note_content}")
-        print(f"FROST Signature: {frost_note_signature_b64}")
-        print(f"Nostr Event ID: {event_id}")
-        print(f"Sent to: {res.success}")
-        print(f"Not sent to: {res.failed}")
+        if "event" in data:
+            await publish_events([data["event"]])
+        else:
+            await publish_notes([(frost_note_content, frost_note_signature_b64)])
 
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,41 @@
+import json
+import time
+import base64
+import hashlib
+from frostpy import verify_event_signature_py
+
+TEXT_NOTE_KIND = 1
+
+def nostr_pubkey(public_key_b64):
+    """The Nostr pubkey (x-only hex) of a group key stored as base64 compressed point."""
+    return base64.b64decode(public_key_b64)[-32:].hex()
+
+def event_id(pubkey, created_at, kind, tags, content):
+    """NIP-01 event id: SHA-256 of [0, pubkey, created_at, kind, tags, content] as compact JSON."""
+    serialized = json.dumps([0, pubkey, created_at, kind, tags, content], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+def unsigned_text_note(content, pubkey, created_at=None, tags=None):
+    """A text note event for pubkey with its id filled in and no signature yet."""
+    created_at = int(time.time()) if created_at is None else created_at
+    tags = tags or []
+    return {
+        "id": event_id(pubkey, created_at, TEXT_NOTE_KIND, tags, content),
+        "pubkey": pubkey,
+        "created_at": created_at,
+        "kind": TEXT_NOTE_KIND,
+        "tags": tags,
+        "content": content,
+    }
+
+def verify_event(event, pubkey=None):
+    """Standard Nostr check: the id matches the event and sig is a BIP-340 signature over it."""
+    try:
+        if pubkey is not None and event["pubkey"] != pubkey:
+            return False
+        expected_id = event_id(event["pubkey"], event["created_at"], event["kind"], event["tags"], event["content"])
+        if event["id"] != expected_id:
+            return False
+        return verify_event_signature_py(bytes.fromhex(event["id"]), event["sig"], event["pubkey"])
+    except (KeyError, TypeError, ValueError):
+        return False
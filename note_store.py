@@ -0,0 +1,318 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from collections import OrderedDict
+
+MESSAGES_FILE = "note_contents.txt"
+NOTE_STORE_FILE = "note_contents.db"
+DIGEST_CACHE_SIZE = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_content TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    signer_set TEXT,
+    signer_set_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS notes_status ON notes (status);
+CREATE TABLE IF NOT EXISTS note_signatures (
+    note_id INTEGER NOT NULL REFERENCES notes (id),
+    share TEXT NOT NULL,
+    signed_at INTEGER,
+    data TEXT,
+    PRIMARY KEY (note_id, share)
+);
+CREATE TABLE IF NOT EXISTS note_commitments (
+    note_id INTEGER NOT NULL REFERENCES notes (id),
+    share TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    commitment BLOB NOT NULL,
+    PRIMARY KEY (note_id, share)
+);
+CREATE TABLE IF NOT EXISTS note_digests (
+    digest TEXT PRIMARY KEY,
+    note_id INTEGER NOT NULL REFERENCES notes (id),
+    hits INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def note_digest(note_content, group_key=""):
+    """SHA-256 over the group key and the note content, so each group deduplicates separately."""
+    h = hashlib.sha256()
+    group_key = group_key.encode("utf-8")
+    h.update(len(group_key).to_bytes(8, "big"))
+    h.update(group_key)
+    h.update(note_content.encode("utf-8"))
+    return h.hexdigest()
+
+class NoteStore:
+    """Note queue backed by SQLite in WAL mode.
+
+    Every lookup or update touches only the rows involved, and concurrent
+    processes (cli, auto signers) are serialized by SQLite's own locking
+    instead of racing on full-file rewrites.
+
+    submit_note() deduplicates on a digest of content and group key. The
+    digests live in the note_digests table, with a bounded LRU of recent
+    ones in memory in front of it.
+    """
+
+    def __init__(self, path=NOTE_STORE_FILE, legacy_path=MESSAGES_FILE, digest_cache_size=DIGEST_CACHE_SIZE):
+        self.path = path
+        self.digest_cache_size = digest_cache_size
+        self.dedup = {"submitted": 0, "duplicates": 0, "cache_hits": 0}
+        self._digests = OrderedDict()
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._add_missing_columns()
+        if legacy_path and os.path.exists(legacy_path):
+            self.migrate_from_jsonl(legacy_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add_note(self, note_content):
+        """Queue a note as is, without deduplication; submissions go through submit_note()."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO notes (note_content, status) VALUES (?, 'pending')", (note_content,))
+        return cursor.lastrowid
+
+    def submit_note(self, note_content, group_key=""):
+        """Queue a note unless the same content was already submitted for this group key.
+
+        Returns (note_id, created); for a duplicate, note_id is the note it
+        attaches to. The lookup and insert share one write transaction, so
+        concurrent submitters cannot both queue the same content.
+        """
+        digest = note_digest(note_content, group_key)
+        note_id = self._digests.get(digest)
+        self.dedup["submitted"] += 1
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if note_id is None:
+                row = self.conn.execute("SELECT note_id FROM note_digests WHERE digest = ?", (digest,)).fetchone()
+                note_id = row["note_id"] if row else None
+            else:
+                self.dedup["cache_hits"] += 1
+            created = note_id is None
+            if created:
+                note_id = self.conn.execute(
+                    "INSERT INTO notes (note_content, status) VALUES (?, 'pending')", (note_content,)).lastrowid
+                self.conn.execute("INSERT INTO note_digests (digest, note_id) VALUES (?, ?)", (digest, note_id))
+            else:
+                self.conn.execute("UPDATE note_digests SET hits = hits + 1 WHERE digest = ?", (digest,))
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        if not created:
+            self.dedup["duplicates"] += 1
+        self._digests[digest] = note_id
+        self._digests.move_to_end(digest)
+        if len(self._digests) > self.digest_cache_size:
+            self._digests.popitem(last=False)
+        return note_id, created
+
+    def dedup_stats(self):
+        """Duplicate submissions so far (from the table, across processes) and this process's cache use."""
+        unique, duplicates = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM note_digests").fetchone()
+        submitted = unique + duplicates
+        return {
+            "unique": unique,
+            "duplicates": duplicates,
+            "hit_rate": round(duplicates / submitted, 4) if submitted else None,
+            "session": dict(self.dedup),
+            "cache_size": len(self._digests),
+            "cache_capacity": self.digest_cache_size,
+        }
+
+    def get_note(self, note_id):
+        row = self.conn.execute("SELECT * FROM notes WHERE id = ?", (note_id,)).fetchone()
+        if row is None:
+            return None
+        signatures = self.conn.execute(
+            "SELECT * FROM note_signatures WHERE note_id = ? ORDER BY rowid", (note_id,)).fetchall()
+        return self._to_note(row, signatures)
+
+    def list_notes(self, status=None):
+        if status is None:
+            rows = self.conn.execute("SELECT * FROM notes ORDER BY id").fetchall()
+            signatures = self.conn.execute("SELECT * FROM note_signatures ORDER BY rowid").fetchall()
+        else:
+            rows = self.conn.execute("SELECT * FROM notes WHERE status = ? ORDER BY id", (status,)).fetchall()
+            signatures = self.conn.execute(
+                "SELECT s.* FROM note_signatures s JOIN notes n ON n.id = s.note_id "
+                "WHERE n.status = ? ORDER BY s.rowid", (status,)).fetchall()
+        by_note = {}
+        for signature in signatures:
+            by_note.setdefault(signature["note_id"], []).append(signature)
+        return [self._to_note(row, by_note.get(row["id"], [])) for row in rows]
+
+    def count(self, status=None):
+        if status is None:
+            return self.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM notes WHERE status = ?", (status,)).fetchone()[0]
+
+    def pending_ids_without_share(self, share):
+        """IDs of pending notes that the given share has not signed for their current signer set."""
+        share = str(share)
+        rows = self.conn.execute(
+            "SELECT id FROM notes n WHERE status = 'pending' AND NOT (instr(COALESCE(n.signer_set, ''), ?) > 0 "
+            "AND EXISTS (SELECT 1 FROM note_signatures s WHERE s.note_id = n.id AND s.share = ?)) ORDER BY id",
+            (json.dumps(share), share)).fetchall()
+        return [row["id"] for row in rows]
+
+    def data_version(self):
+        """Changes whenever another connection commits to the store; cheap enough to poll."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def add_signature(self, note_id, share, signed_at=None, **data):
+        """Record that a share signed a note. Returns False if it already had."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO note_signatures (note_id, share, signed_at, data) VALUES (?, ?, ?, ?)",
+                (note_id, str(share), signed_at, json.dumps(data) if data else None))
+        return cursor.rowcount == 1
+
+    def add_signature_share(self, note_id, share, signer_set, commitment, signed_at=None, **data):
+        """Record a share's partial signature for the signer set and commitment it signed with.
+
+        The check and the insert are one statement, so a share signed for a
+        set that was reset in the meantime is refused instead of stored: a
+        reset deletes every commitment, and a recommitted share has a new one.
+        Returns False if the note's set or the share's commitment changed.
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR REPLACE INTO note_signatures (note_id, share, signed_at, data) "
+                "SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM notes WHERE id = ? AND status = 'pending' "
+                "AND signer_set = ?) AND EXISTS (SELECT 1 FROM note_commitments WHERE note_id = ? "
+                "AND share = ? AND commitment = ?)",
+                (note_id, str(share), signed_at, json.dumps(data) if data else None,
+                 note_id, json.dumps([str(s) for s in signer_set]), note_id, str(share), commitment))
+        return cursor.rowcount == 1
+
+    def add_commitment(self, note_id, share, identifier, commitment):
+        """Record a share's round-1 commitment for a note. Returns False if it already had one."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO note_commitments (note_id, share, identifier, commitment) VALUES (?, ?, ?, ?)",
+                (note_id, str(share), identifier, commitment))
+        return cursor.rowcount == 1
+
+    def commitments(self, note_id):
+        """(share, identifier, commitment bytes) for a note, in arrival order."""
+        rows = self.conn.execute(
+            "SELECT share, identifier, commitment FROM note_commitments WHERE note_id = ? ORDER BY rowid",
+            (note_id,)).fetchall()
+        return [(row["share"], row["identifier"], bytes(row["commitment"])) for row in rows]
+
+    def freeze_signer_set(self, note_id, shares):
+        """Fix which shares sign a note; the first caller wins. Returns the stored set."""
+        with self.conn:
+            self.conn.execute("UPDATE notes SET signer_set = ?, signer_set_at = ? WHERE id = ? AND signer_set IS NULL",
+                              (json.dumps([str(share) for share in shares]), int(time.time()), note_id))
+        row = self.conn.execute("SELECT signer_set FROM notes WHERE id = ?", (note_id,)).fetchone()
+        return json.loads(row["signer_set"]) if row and row["signer_set"] else None
+
+    def notes_frozen_before(self, frozen_before):
+        """Pending notes whose signer set was fixed before that Unix time."""
+        rows = self.conn.execute(
+            "SELECT id FROM notes WHERE status = 'pending' AND signer_set IS NOT NULL "
+            "AND (signer_set_at IS NULL OR signer_set_at < ?) ORDER BY id", (int(frozen_before),)).fetchall()
+        return [self.get_note(row["id"]) for row in rows]
+
+    def reset_signer_set(self, note_id, frozen_before=None):
+        """Forget a pending note's signer set, commitments and partial signatures.
+
+        With frozen_before, only a set fixed before that Unix time is reset.
+        Returns True if this call reset it, so the note can be signed again
+        by whichever shares commit next.
+        """
+        query = "UPDATE notes SET signer_set = NULL, signer_set_at = NULL WHERE id = ? AND status = 'pending' AND signer_set IS NOT NULL"
+        params = [note_id]
+        if frozen_before is not None:
+            query += " AND (signer_set_at IS NULL OR signer_set_at < ?)"
+            params.append(int(frozen_before))
+        with self.conn:
+            if self.conn.execute(query, params).rowcount != 1:
+                return False
+            self.conn.execute("DELETE FROM note_commitments WHERE note_id = ?", (note_id,))
+            self.conn.execute("DELETE FROM note_signatures WHERE note_id = ?", (note_id,))
+        return True
+
+    def set_status(self, note_id, status):
+        with self.conn:
+            self.conn.execute("UPDATE notes SET status = ? WHERE id = ?", (status, note_id))
+
+    def migrate_from_jsonl(self, path=MESSAGES_FILE):
+        """Import a legacy note_contents.txt file, keeping note IDs, then set it aside."""
+        with open(path, "r") as f:
+            notes = [json.loads(line) for line in f if line.strip()]
+        with self.conn:
+            for note in notes:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO notes (id, note_content, status) VALUES (?, ?, ?)",
+                    (note["id"], note["note_content"], note.get("status", "pending")))
+                for sig in note.get("note_signatures", []):
+                    extra = {k: v for k, v in sig.items() if k not in ("share", "signed_at")}
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO note_signatures (note_id, share, signed_at, data) VALUES (?, ?, ?, ?)",
+                        (note["id"], str(sig["share"]), sig.get("signed_at"), json.dumps(extra) if extra else None))
+        try:
+            os.replace(path, path + ".migrated")
+        except FileNotFoundError:
+            # Another process migrated the same file first.
+            pass
+        print(f"✅ Migrated {len(notes)} notes from {path} → {self.path}")
+        return len(notes)
+
+    def _add_missing_columns(self):
+        # Stores created before signer sets existed.
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(notes)")}
+        for column, column_type in (("signer_set", "TEXT"), ("signer_set_at", "INTEGER")):
+            if column in columns:
+                continue
+            try:
+                with self.conn:
+                    self.conn.execute(f"ALTER TABLE notes ADD COLUMN {column} {column_type}")
+            except sqlite3.OperationalError:
+                pass  # another process added it first
+
+    @staticmethod
+    def _to_note(row, signatures):
+        note_signatures = []
+        for sig in signatures:
+            entry = {"share": sig["share"]}
+            if sig["signed_at"] is not None:
+                entry["signed_at"] = sig["signed_at"]
+            if sig["data"]:
+                entry.update(json.loads(sig["data"]))
+            note_signatures.append(entry)
+        return {
+            "id": row["id"],
+            "note_content": row["note_content"],
+            "status": row["status"],
+            "signer_set": json.loads(row["signer_set"]) if row["signer_set"] else None,
+            "signer_set_at": row["signer_set_at"],
+            "note_signatures": note_signatures,
+        }
+
+if __name__ == "__main__":
+    with NoteStore() as store:
+        print(f"📝 {store.count()} notes in {store.path} ({store.count('pending')} pending)")
+        print(f"🔁 Submit dedup: {json.dumps(store.dedup_stats())}")
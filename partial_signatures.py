@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import base64
+import contextlib
+from frostpy import round1_commit_py, round2_sign_py, verify_signature_share_py, aggregate_py, SigningNonces
+from required_shares_sign_event import load_key_package, load_public_key_package
+from metrics import metrics
+from verify_note_signature import verification_cache
+from prehash import check_raw_message
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent updates from one share's processes are not serialized
+    fcntl = None
+
+SECRETS_DIR = "keys"
+NONCE_FILE = "pending_nonces.json"
+NONCE_LOCK_FILE = "pending_nonces.lock"
+# A signer set that has not produced every partial signature within this many
+# seconds is dropped, so other shares can sign the note instead.
+SIGNER_SET_TIMEOUT = 300
+
+def share_path_for(share_id):
+    return os.path.join(SECRETS_DIR, str(share_id), "secret_share.txt")
+
+class NonceVault:
+    """Round-1 nonces a signer has committed to but not used yet, kept next to its share.
+
+    Signers contribute to a note in two separate passes (commit, then sign
+    once the signer set is fixed), possibly from different processes, so the
+    nonces have to survive in between. Each one is deleted before it is used.
+    Every read-modify-write of the file holds an exclusive flock, so processes
+    sharing a share cannot drop each other's nonces.
+    """
+
+    def __init__(self, share_id, directory=None):
+        directory = directory or os.path.join(SECRETS_DIR, str(share_id))
+        self.path = os.path.join(directory, NONCE_FILE)
+        self.lock_path = os.path.join(directory, NONCE_LOCK_FILE)
+        self._lock_depth = 0
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Exclusive lock on this share's vault; nested uses in one vault object are free."""
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            self._lock_depth = 1
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def _write(self, entries):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+    def put(self, note_id, nonces):
+        with self.locked():
+            entries = self._read()
+            entries[str(note_id)] = nonces.to_bytes().hex()
+            self._write(entries)
+
+    def take(self, note_id):
+        with self.locked():
+            entries = self._read()
+            encoded = entries.pop(str(note_id), None)
+            if encoded is None:
+                return None
+            self._write(entries)
+        return SigningNonces.from_bytes(bytes.fromhex(encoded))
+
+def package_commitments(store, note_id, signer_set):
+    return {identifier: commitment for share, identifier, commitment in store.commitments(note_id)
+            if share in signer_set}
+
+def submit_signature_share(store, note, share_id, identifier, signature_share, commitments, signer_set):
+    """Store a partial signature if it verifies against the signer's VerifyingShare.
+
+    Returns "signed", "rejected" for a share that does not verify, or "stale"
+    when the note's signer set was reset while this share was signing.
+    """
+    with metrics.span("verify_share"):
+        is_valid = verify_signature_share_py(note["note_content"], commitments, identifier,
+                                             signature_share, load_public_key_package())
+    if not is_valid:
+        metrics.inc("signature_shares", result="rejected")
+        return "rejected"
+    if not store.add_signature_share(note["id"], share_id, signer_set, commitments[identifier],
+                                     signed_at=int(time.time()), identifier=identifier,
+                                     signature_share=base64.b64encode(signature_share).decode("ascii")):
+        metrics.inc("signature_shares", result="stale")
+        return "stale"
+    metrics.inc("signature_shares", result="accepted")
+    return "signed"
+
+def signed_shares(note):
+    """Shares with a partial signature for the note's current signer set."""
+    signer_set = set(note["signer_set"] or ())
+    return {str(sig["share"]) for sig in note["note_signatures"]
+            if sig.get("signature_share") and str(sig["share"]) in signer_set}
+
+def signer_set_complete(note):
+    return set(note["signer_set"] or ()) <= signed_shares(note)
+
+def reset_timed_out_signer_set(store, note, signer_set_timeout=SIGNER_SET_TIMEOUT):
+    """Reset the note's signer set if it is still incomplete after the timeout; True if this call reset it."""
+    if note["signer_set"] is None or signer_set_complete(note):
+        return False
+    if not store.reset_signer_set(note["id"], frozen_before=time.time() - signer_set_timeout):
+        return False
+    print(f"⚠️ Signer set {note['signer_set']} of note {note['id']} timed out; signing it again.")
+    metrics.inc("signer_set_resets", reason="timeout")
+    return True
+
+def expire_signer_sets(store, signer_set_timeout=SIGNER_SET_TIMEOUT):
+    """Reset every incomplete signer set older than the timeout; returns the IDs of the notes reset.
+
+    contribute() only notices a stuck set when a share polls that note, so
+    signer daemons also call this on a timer.
+    """
+    return [note["id"] for note in store.notes_frozen_before(time.time() - signer_set_timeout)
+            if reset_timed_out_signer_set(store, note, signer_set_timeout)]
+
+def contribute(store, note_id, share_id, share_path=None, signer_set_timeout=SIGNER_SET_TIMEOUT):
+    """Advance one signer on one note.
+
+    The first min_signers shares to commit become the note's signer set. Each
+    of them then signs with the nonces it committed to. A set that is still
+    incomplete after signer_set_timeout seconds, or whose member lost its
+    nonces, is reset and the note starts over with whoever commits next.
+    Returns "committed", "signed", "waiting", "not_selected", "missing_nonce",
+    "rejected", "stale" (the set was reset while signing) or "done".
+    """
+    share_id = str(share_id)
+    vault = NonceVault(share_id)
+    note = store.get_note(note_id)
+    if note is None or note["status"] != "pending":
+        vault.take(note_id)
+        return "done"
+    check_raw_message(note["note_content"])
+    if reset_timed_out_signer_set(store, note, signer_set_timeout):
+        note = store.get_note(note_id)
+    if share_id in signed_shares(note):
+        return "done"
+
+    key_package = load_key_package(share_path or share_path_for(share_id))
+    outcome = "waiting"
+    signer_set = note["signer_set"]
+    commitments = store.commitments(note_id)
+    if signer_set is None and share_id not in {share for share, _, _ in commitments}:
+        nonces, commitment = round1_commit_py(key_package)
+        # Only keep the nonces if this commitment is the one stored; if
+        # another process committed for this share first, its nonces stay.
+        # The vault lock keeps the commitment and its nonces together as seen
+        # by other processes of this share.
+        with vault.locked():
+            if store.add_commitment(note_id, share_id, key_package.identifier, commitment):
+                vault.put(note_id, nonces)
+                outcome = "committed"
+        commitments = store.commitments(note_id)
+
+    if signer_set is None:
+        if len(commitments) < key_package.min_signers:
+            return outcome
+        signer_set = store.freeze_signer_set(
+            note_id, [share for share, _, _ in commitments[:key_package.min_signers]])
+    if share_id not in signer_set:
+        vault.take(note_id)
+        return "not_selected"
+
+    nonces = vault.take(note_id)
+    if nonces is None:
+        # This member can never sign for the stored commitment, so the set is stuck.
+        if store.reset_signer_set(note_id):
+            metrics.inc("signer_set_resets", reason="missing_nonce")
+        return "missing_nonce"
+    commitments = package_commitments(store, note_id, signer_set)
+    with metrics.span("sign_share"):
+        signature_share = round2_sign_py(note["note_content"], commitments, nonces, key_package)
+    return submit_signature_share(store, note, share_id, key_package.identifier, signature_share, commitments,
+                                  signer_set)
+
+def finalize(store, note):
+    """Aggregate a note's verified partial signatures, or None if its signer set is incomplete."""
+    signer_set = note.get("signer_set")
+    if not signer_set:
+        return None
+    signature_shares = {sig["identifier"]: base64.b64decode(sig["signature_share"])
+                        for sig in note["note_signatures"]
+                        if sig.get("signature_share") and str(sig["share"]) in signer_set}
+    if len(signature_shares) < len(signer_set):
+        return None
+    pubkey_package = load_public_key_package()
+    with metrics.span("aggregate"):
+        signature = aggregate_py(note["note_content"], package_commitments(store, note["id"], signer_set),
+                                 signature_shares, pubkey_package)
+    verification_cache.add(note["note_content"], signature, pubkey_package.verifying_key)
+    return signature
@@ -0,0 +1,50 @@
+import os
+import hashlib
+
+# Signatures over a pre-hashed payload cover this tag plus the SHA-256 of the
+# content. Raw messages that start with the tag are refused by the signing and
+# verification paths (check_raw_message), so a raw message can never collide
+# with a pre-hashed one.
+PREHASH_DOMAIN = b"frost-prehash-sha256-v1\0"
+CHUNK_SIZE = 1 << 20
+
+def is_prehash_message(message):
+    """True if a str or bytes-like message starts with PREHASH_DOMAIN."""
+    if isinstance(message, str):
+        return message.startswith(PREHASH_DOMAIN.decode("ascii"))
+    return bytes(memoryview(message)[:len(PREHASH_DOMAIN)]) == PREHASH_DOMAIN
+
+def check_raw_message(message):
+    if is_prehash_message(message):
+        raise ValueError("Raw messages may not start with the pre-hash domain tag; sign the payload as a stream")
+
+def _hash_file(f, chunk_size):
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        read = f.readinto(buffer)
+        if not read:
+            break
+        digest.update(view[:read])
+    return digest.digest()
+
+def content_digest(source, chunk_size=CHUNK_SIZE):
+    """SHA-256 of a payload, read chunk_size bytes at a time.
+
+    source is a path, a binary file object, or an iterable of bytes-like
+    chunks. Only one chunk is held in memory at once.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return _hash_file(f, chunk_size)
+    if hasattr(source, "readinto"):
+        return _hash_file(source, chunk_size)
+    digest = hashlib.sha256()
+    for chunk in source:
+        digest.update(chunk)
+    return digest.digest()
+
+def prehash_message(source, chunk_size=CHUNK_SIZE):
+    """The bytes that get signed in place of a large payload: domain tag + content digest."""
+    return PREHASH_DOMAIN + content_digest(source, chunk_size)
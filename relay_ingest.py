@@ -0,0 +1,356 @@
+import os
+import sys
+import json
+import time
+import struct
+import asyncio
+import hashlib
+import argparse
+import base64
+from metrics import metrics
+from verify_note_signature import verify_items, PUBKEY_FILE
+from nostr_event import nostr_pubkey, verify_event
+
+SECRETS_DIR = "keys"
+INDEX_PATH = os.path.join(SECRETS_DIR, "relay_index.bin")
+SIGNATURE_MARKER = "\nFROST Signature: "
+TEXT_NOTE_KIND = 1
+
+QUEUE_SIZE = 1024
+BATCH_SIZE = 256
+BATCH_TIMEOUT = 0.05
+
+# event id, first 8 bytes of SHA-256 of the matching group key (zeros when no
+# known key verifies the note), created_at, status.
+INDEX_RECORD = struct.Struct("<32s8sIB")
+STATUS_INVALID = 0
+STATUS_VALID = 1
+NO_KEY = bytes(8)
+
+def key_id(public_key_b64):
+    return hashlib.sha256(base64.b64decode(public_key_b64)).digest()[:8]
+
+def known_group_keys(public_key_path=PUBKEY_FILE):
+    """Verifying keys of every group we hold: keys/public_key.txt plus provisioned groups."""
+    from keygen import read_provisioned_groups
+    keys = []
+    if os.path.exists(public_key_path):
+        with open(public_key_path, "r") as f:
+            keys.append(f.read().strip())
+    for _, entry in sorted(read_provisioned_groups().items()):
+        keys.append(entry["verifying_key"])
+    return list(dict.fromkeys(keys))
+
+def parse_frost_note(event, group_pubkeys=()):
+    """(note_content, signature_b64) from a note published by NostrPublisher, or None.
+
+    A note whose pubkey is one of group_pubkeys was signed by the group key
+    itself (`broadcast --group_event`) and comes back as (content, None):
+    the whole event is its signature.
+    """
+    if event.get("kind", TEXT_NOTE_KIND) != TEXT_NOTE_KIND:
+        return None
+    if event.get("pubkey") in group_pubkeys:
+        return event.get("content", ""), None
+    note_content, marker, signature_b64 = event.get("content", "").rpartition(SIGNATURE_MARKER)
+    if not marker or not signature_b64.strip():
+        return None
+    return note_content, signature_b64.strip()
+
+class IngestIndex:
+    """Append-only file of fixed-width records, one per ingested FROST note.
+
+    Every record holds the event id, so reopening the index also tells the
+    pipeline which events it has already seen.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._seen = set()
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_RECORD.size
+            for offset in range(0, usable, INDEX_RECORD.size):
+                self._seen.add(INDEX_RECORD.unpack_from(data, offset)[0])
+            if usable != len(data):
+                # Drop a record torn by an interrupted write.
+                with open(path, "r+b") as f:
+                    f.truncate(usable)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+
+    def __len__(self):
+        return len(self._seen)
+
+    def seen(self, event_id):
+        return event_id in self._seen
+
+    def mark(self, event_id):
+        self._seen.add(event_id)
+
+    def append(self, records):
+        self._file.write(b"".join(INDEX_RECORD.pack(*record) for record in records))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def records(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for offset in range(0, len(data) - len(data) % INDEX_RECORD.size, INDEX_RECORD.size):
+            yield INDEX_RECORD.unpack_from(data, offset)
+
+async def dump_source(path):
+    """Replay a JSONL dump of events (bare events or relay ["EVENT", sub_id, event] messages)."""
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"❌ Skipping malformed dump line: {e}")
+                continue
+            if isinstance(message, list):
+                if len(message) < 3 or message[0] != "EVENT":
+                    continue
+                message = message[2]
+            yield message
+
+async def relay_source(relays, since=None, queue_size=QUEUE_SIZE):
+    """Stream text notes from live relays through a nostr_sdk subscription.
+
+    The notification handler waits while the local queue is full, so a slow
+    pipeline stops draining the client instead of buffering without bound.
+    """
+    from nostr_sdk import Client, Filter, Kind, Timestamp, HandleNotification
+
+    queue = asyncio.Queue(maxsize=queue_size)
+
+    class Handler(HandleNotification):
+        async def handle(self, relay_url, subscription_id, event):
+            await queue.put(json.loads(event.as_json()))
+
+        async def handle_msg(self, relay_url, msg):
+            pass
+
+    client = Client()
+    for url in relays:
+        await client.add_relay(url)
+    await client.connect()
+    nostr_filter = Filter().kind(Kind(TEXT_NOTE_KIND))
+    if since:
+        nostr_filter = nostr_filter.since(Timestamp.from_secs(since))
+    await client.subscribe([nostr_filter], None)
+    notifications = asyncio.create_task(client.handle_notifications(Handler()))
+    try:
+        while True:
+            yield await queue.get()
+    finally:
+        notifications.cancel()
+        await asyncio.gather(notifications, return_exceptions=True)
+        await client.disconnect()
+
+class IngestPipeline:
+    """source → parse → batch verify → sink, connected by bounded queues.
+
+    Each stage waits when the next queue is full, so memory stays bounded
+    whatever the arrival rate. Notes are verified batch_size at a time (or
+    whatever arrived within batch_timeout) off the event loop; each batch is
+    tried against the known group keys, most frequently matched key first.
+    Events published under a group key's Nostr pubkey are checked as Nostr
+    events (id and BIP-340 signature) against that key.
+    """
+
+    def __init__(self, group_keys, index, batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE,
+                 batch_timeout=BATCH_TIMEOUT):
+        self.group_keys = list(group_keys)
+        self.index = index
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.batch_timeout = batch_timeout
+        self.key_matches = {key: 0 for key in self.group_keys}
+        self.group_pubkeys = {nostr_pubkey(key): key for key in self.group_keys}
+        self.stats = {"events": 0, "duplicates": 0, "not_frost": 0, "notes": 0, "valid": 0, "invalid": 0, "batches": 0}
+        self._elapsed = 0.0
+
+    async def run(self, source, duration=None):
+        raw_queue = asyncio.Queue(maxsize=self.queue_size)
+        note_queue = asyncio.Queue(maxsize=self.queue_size)
+        result_queue = asyncio.Queue(maxsize=self.queue_size)
+        started = time.perf_counter()
+        feed = asyncio.create_task(self._feed(source, raw_queue))
+        stages = [
+            asyncio.create_task(self._parse(raw_queue, note_queue)),
+            asyncio.create_task(self._verify(note_queue, result_queue)),
+            asyncio.create_task(self._sink(result_queue)),
+        ]
+        try:
+            if duration is None:
+                await feed
+            else:
+                done, _ = await asyncio.wait([feed], timeout=duration)
+                if not done:
+                    feed.cancel()
+                await asyncio.gather(feed, return_exceptions=True)
+            await asyncio.gather(*stages)
+        finally:
+            for task in [feed, *stages]:
+                task.cancel()
+            self._elapsed = time.perf_counter() - started
+        return self.report()
+
+    async def _feed(self, source, raw_queue):
+        try:
+            async for event in source:
+                await raw_queue.put(event)
+        finally:
+            if hasattr(source, "aclose"):
+                await source.aclose()
+            await raw_queue.put(None)
+
+    async def _parse(self, raw_queue, note_queue):
+        while True:
+            event = await raw_queue.get()
+            if event is None:
+                await note_queue.put(None)
+                return
+            self.stats["events"] += 1
+            try:
+                event_id = bytes.fromhex(event["id"])
+            except (KeyError, TypeError, ValueError):
+                self.stats["not_frost"] += 1
+                continue
+            if self.index.seen(event_id):
+                self.stats["duplicates"] += 1
+                metrics.inc("ingest_events", result="duplicate")
+                continue
+            parsed = parse_frost_note(event, self.group_pubkeys)
+            if parsed is None:
+                self.stats["not_frost"] += 1
+                metrics.inc("ingest_events", result="not_frost")
+                continue
+            self.index.mark(event_id)
+            self.stats["notes"] += 1
+            await note_queue.put((event_id, int(event.get("created_at", 0)), *parsed, event))
+
+    async def _verify(self, note_queue, result_queue):
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            note = await note_queue.get()
+            if note is None:
+                break
+            batch = [note]
+            deadline = loop.time() + self.batch_timeout
+            while len(batch) < self.batch_size:
+                try:
+                    note = await asyncio.wait_for(note_queue.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if note is None:
+                    finished = True
+                    break
+                batch.append(note)
+            metrics.set_gauge("ingest_queue_depth", note_queue.qsize(), stage="verify")
+            with metrics.span("ingest_batch"):
+                matched = await asyncio.to_thread(self._verify_batch, batch)
+            self.stats["batches"] += 1
+            await result_queue.put(list(zip(batch, matched)))
+        await result_queue.put(None)
+
+    def _verify_batch(self, batch):
+        matched = [None] * len(batch)
+        pending = []
+        for i, (_, _, _, signature_b64, event) in enumerate(batch):
+            if signature_b64 is not None:
+                pending.append(i)
+            elif verify_event(event):
+                matched[i] = self.group_pubkeys[event["pubkey"]]
+        for public_key_b64 in sorted(self.group_keys, key=lambda key: -self.key_matches[key]):
+            if not pending:
+                break
+            items = [(batch[i][2], batch[i][3]) for i in pending]
+            try:
+                results = verify_items(items, public_key_b64, record_metrics=False)
+            except Exception as e:
+                print(f"❌ Batch verification failed: {e}")
+                continue
+            for i, is_valid in zip(pending, results):
+                if is_valid:
+                    matched[i] = public_key_b64
+            self.key_matches[public_key_b64] += sum(results)
+            pending = [i for i in pending if matched[i] is None]
+        return matched
+
+    async def _sink(self, result_queue):
+        key_ids = {key: key_id(key) for key in self.group_keys}
+        while True:
+            results = await result_queue.get()
+            if results is None:
+                return
+            records = []
+            for (event_id, created_at, note_content, _, _), public_key_b64 in results:
+                if public_key_b64 is None:
+                    self.stats["invalid"] += 1
+                    print(f"❌ No known group key verifies note {event_id.hex()}: '{note_content[:60]}'")
+                    records.append((event_id, NO_KEY, created_at, STATUS_INVALID))
+                else:
+                    self.stats["valid"] += 1
+                    records.append((event_id, key_ids[public_key_b64], created_at, STATUS_VALID))
+            self.index.append(records)
+            valid = sum(1 for record in records if record[3] == STATUS_VALID)
+            # One verification per note, however many group keys it was tried against.
+            metrics.inc("verifications", valid, result="valid")
+            metrics.inc("verifications", len(records) - valid, result="invalid")
+            metrics.inc("ingest_events", valid, result="valid")
+            # Whatever key signed them, notes none of our group keys verifies
+            # share one label, so relay input cannot add metric series.
+            metrics.inc("ingest_events", len(records) - valid, result="foreign_key")
+
+    def report(self):
+        elapsed = self._elapsed
+        return {
+            **self.stats,
+            "seconds": round(elapsed, 3),
+            "events_per_second": round(self.stats["events"] / elapsed, 1) if elapsed else None,
+            "notes_per_second": round(self.stats["notes"] / elapsed, 1) if elapsed else None,
+            "indexed": len(self.index),
+        }
+
+async def ingest(source, group_keys=None, index_path=INDEX_PATH, duration=None, **options):
+    group_keys = group_keys or known_group_keys()
+    if not group_keys:
+        raise FileNotFoundError(f"No group keys found at {PUBKEY_FILE} or in keys/groups. Run 'python cli.py generate' first.")
+    index = IngestIndex(index_path)
+    try:
+        return await IngestPipeline(group_keys, index, **options).run(source, duration)
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    from nostr import configured_relays
+
+    parser = argparse.ArgumentParser(description="Stream FROST-signed notes from relays or a dump and verify them")
+    parser.add_argument("--relays", type=str, help="Comma-separated relay URLs (defaults to NOSTR_RELAYS or the public relays)")
+    parser.add_argument("--dump", type=str, help="Replay a JSONL event dump instead of subscribing")
+    parser.add_argument("--since", type=int, help="Only notes created after this Unix time")
+    parser.add_argument("--duration", type=float, help="Stop subscribing after this many seconds")
+    parser.add_argument("--index", type=str, default=INDEX_PATH, help="Index file to append to")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Notes per batch verification")
+    args = parser.parse_args()
+
+    if args.dump:
+        source = dump_source(args.dump)
+    else:
+        relays = [url.strip() for url in args.relays.split(",")] if args.relays else configured_relays()
+        source = relay_source(relays, args.since)
+    try:
+        report = asyncio.run(ingest(source, index_path=args.index, duration=args.duration, batch_size=args.batch))
+    except KeyboardInterrupt:
+        sys.exit(130)
+    print(f"📥 Ingest finished: {json.dumps(report)}")
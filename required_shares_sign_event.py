@@ -1,44 +1,181 @@
 import os
 import json
-from frostpy import sign_message_py
+from collections import OrderedDict
+from functools import lru_cache
+from frostpy import KeyPackage, PublicKeyPackage, SigningSession, sign_event_id_py
+from signature_ledger import default_ledger
+from keystore import Keystore, KEYSTORE_PATH
+from metrics import metrics
+from prehash import prehash_message, check_raw_message, is_prehash_message
+from verify_note_signature import verification_cache
+from nostr_event import unsigned_text_note
 
 SECRETS_DIR = "keys"
-SIGNATURES_LOG = os.path.join(SECRETS_DIR, "note_signatures.txt")
 LATEST_SIGNATURE_FILE = os.path.join(SECRETS_DIR, "latest_note_signature.txt")
 PUBKEY_BUNDLE_PATH = os.path.join(SECRETS_DIR, "group_key_bundle.txt")
+NONCE_POOL_CAPACITY = 64
+KEY_CACHE_SIZE = 256
+SIGNING_SESSION_CACHE_SIZE = 16
+
+# Signing sessions keep precomputed nonces in memory. They are keyed by signer
+# set, rebuilt whenever the loader hands out a different key package, and the
+# least recently used ones are dropped beyond SIGNING_SESSION_CACHE_SIZE.
+_signing_sessions = OrderedDict()
 
 def read_group_pubkey_bundle():
     with open(PUBKEY_BUNDLE_PATH, "r") as f:
         return f.read().strip()
 
-def required_shares_sign_event(note_content, share_paths, required_shares):
-    shares_data = []
-    for path in share_paths:
-        with open(path, "r") as f:
-            share = json.loads(f.read())
-            shares_data.append(share)
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _load_key_package(path, mtime_ns):
+    with open(path, "r") as f:
+        return KeyPackage.from_json(f.read())
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _load_public_key_package(path, mtime_ns):
+    with open(path, "r") as f:
+        return PublicKeyPackage.from_base64(f.read().strip())
+
+@lru_cache(maxsize=4)
+def _open_keystore(path, mtime_ns):
+    return Keystore(path)
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _load_keystore_share(path, mtime_ns, participant_id):
+    keystore = _open_keystore(path, mtime_ns)
+    return keystore.load_key_package(participant_id, _load_keystore_public_key_package(path, mtime_ns))
+
+@lru_cache(maxsize=4)
+def _load_keystore_public_key_package(path, mtime_ns):
+    return _open_keystore(path, mtime_ns).public_key_package()
+
+def load_key_package(path):
+    """Return the parsed KeyPackage for a share file, reparsing only when the file changes.
 
-    shares_json = json.dumps(shares_data)
-    group_key_bundle = read_group_pubkey_bundle()
+    When keys/<id>/secret_share.txt does not exist, participant <id> is read
+    from the group keystore instead.
+    """
+    if not os.path.exists(path) and os.path.exists(KEYSTORE_PATH):
+        participant_id = int(os.path.basename(os.path.dirname(path)))
+        return _load_keystore_share(KEYSTORE_PATH, os.stat(KEYSTORE_PATH).st_mtime_ns, participant_id)
+    return _load_key_package(path, os.stat(path).st_mtime_ns)
 
+def load_public_key_package(path=PUBKEY_BUNDLE_PATH):
+    if not os.path.exists(path) and os.path.exists(KEYSTORE_PATH):
+        return _load_keystore_public_key_package(KEYSTORE_PATH, os.stat(KEYSTORE_PATH).st_mtime_ns)
+    return _load_public_key_package(path, os.stat(path).st_mtime_ns)
+
+def get_signing_session(share_paths, required_shares):
+    key = (tuple(share_paths), required_shares)
+    with metrics.span("load_keys"):
+        key_packages = [load_key_package(path) for path in share_paths]
+        pubkey_package = load_public_key_package()
+    handles = (*key_packages, pubkey_package)
+    cached = _signing_sessions.get(key)
+    if cached is not None and all(old is new for old, new in zip(cached[0], handles)):
+        _signing_sessions.move_to_end(key)
+        return cached[1]
+
+    session = SigningSession.from_packages(key_packages, required_shares, pubkey_package, NONCE_POOL_CAPACITY)
+    _signing_sessions[key] = (handles, session)
+    _signing_sessions.move_to_end(key)
+    while len(_signing_sessions) > SIGNING_SESSION_CACHE_SIZE:
+        _signing_sessions.popitem(last=False)
+    return session
+
+def refill_nonce_pools(count=None):
+    """Top up the nonce pools of every cached signing session and return their metrics.
+
+    Sessions live in the process that signs with them, so this only helps
+    when called there, e.g. by `cli.py serve` between requests.
+    """
+    metrics = []
+    for _, session in list(_signing_sessions.values()):
+        session.refill(count)
+        metrics.append(session.metrics())
+    return metrics
+
+def required_shares_sign_event(note_content, share_paths, required_shares, prehashed=False):
     try:
-        signature_b64, _ = sign_message_py(note_content, shares_json, required_shares, group_key_bundle)
-        return signature_b64
+        if not prehashed:
+            check_raw_message(note_content)
+        session = get_signing_session(share_paths, required_shares)
+        with metrics.span("sign"):
+            signature = session.sign(note_content)
     except Exception as e:
         print(f"❌ Signing error: {e}")
+        metrics.inc("signatures", result="error")
+        return None
+    metrics.inc("signatures", result="ok")
+    # Native signing already verified the aggregate; later checks can skip it.
+    verification_cache.add(note_content, signature, load_public_key_package().verifying_key)
+    return signature
+
+def required_shares_sign_stream(source, share_paths, required_shares):
+    """Sign a large payload (path, binary file or iterable of chunks) through its pre-hash.
+
+    The payload is streamed through SHA-256 and never held in memory; verify
+    the result with verify_note_signature.verify_stream.
+    """
+    with metrics.span("prehash"):
+        message = prehash_message(source)
+    return required_shares_sign_event(message, share_paths, required_shares, prehashed=True)
+
+def required_shares_sign_events(note_contents, share_paths, required_shares):
+    """Sign several note contents with the same signer set in one native call.
+
+    Returns a (signature_b64, error) pair per note content, in order. Note
+    contents that start with the pre-hash domain tag are refused.
+    """
+    try:
+        session = get_signing_session(share_paths, required_shares)
+    except Exception as e:
+        print(f"❌ Signing error: {e}")
+        metrics.inc("signatures", len(note_contents), result="error")
+        return [(None, str(e))] * len(note_contents)
+    note_contents = list(note_contents)
+    refused = [is_prehash_message(note_content) for note_content in note_contents]
+    with metrics.span("sign_batch"):
+        signed_results = iter(session.sign_batch(
+            [note_content for note_content, tagged in zip(note_contents, refused) if not tagged], parallel=True))
+    results = [(None, "message starts with the pre-hash domain tag") if tagged else next(signed_results)
+               for tagged in refused]
+    signed = sum(1 for signature, _ in results if signature)
+    public_key_b64 = load_public_key_package().verifying_key
+    for note_content, (signature, _) in zip(note_contents, results):
+        if signature:
+            verification_cache.add(note_content, signature, public_key_b64)
+    metrics.inc("signatures", signed, result="ok")
+    metrics.inc("signatures", len(results) - signed, result="error")
+    return results
+
+def required_shares_sign_nostr_event(note_content, share_paths, required_shares, created_at=None):
+    """Build a text note with the group key as its pubkey and FROST-sign its event id (BIP-340).
+
+    Returns the complete Nostr event, or None on error. The event carries the
+    only signature; nothing else needs to sign or wrap it before publishing.
+    """
+    try:
+        with metrics.span("load_keys"):
+            key_packages = [load_key_package(path) for path in share_paths]
+            pubkey_package = load_public_key_package()
+        event = unsigned_text_note(note_content, pubkey_package.nostr_pubkey, created_at)
+        with metrics.span("sign_event"):
+            event["sig"] = sign_event_id_py(bytes.fromhex(event["id"]), key_packages, required_shares, pubkey_package)
+    except Exception as e:
+        print(f"❌ Event signing error: {e}")
+        metrics.inc("signatures", result="error")
         return None
+    metrics.inc("signatures", result="ok")
+    return event
 
-def save_note_signature(signature_b64, note_content):
-    record = {
-        "note_content": note_content,
-        "signature": signature_b64
-    }
+def save_note_signature(signature_b64, note_content, **extra):
     try:
-        os.makedirs(SECRETS_DIR, exist_ok=True)
-        with open(SIGNATURES_LOG, "a") as f:
-            f.write(json.dumps(record) + "\n")
-        with open(LATEST_SIGNATURE_FILE, "w") as f:
-            json.dump(record, f, indent=2)
-        print(f"✅ Signature saved to {SIGNATURES_LOG} and {LATEST_SIGNATURE_FILE}")
+        ledger = default_ledger()
+        with metrics.span("save_signature"):
+            record = ledger.append(note_content, signature_b64, **extra)
+            with open(LATEST_SIGNATURE_FILE, "w") as f:
+                json.dump(record, f, indent=2)
+        print(f"✅ Signature saved to {ledger.directory} and {LATEST_SIGNATURE_FILE}")
     except Exception as e:
-        print(f"❌ Failed to save signature: {e}")
\ No newline at end of file
+        print(f"❌ Failed to save signature: {e}")
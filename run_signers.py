@@ -1,21 +1,19 @@
-import os
-import subprocess
-import time
-from dotenv import dotenv_values
+import sys
+import asyncio
+from auto_signer import load_signer_configs, run_once_concurrently, run_daemon
 
-SIGNER_SCRIPT = "auto_signer.py"
 env_files = [".env.1", ".env.2", ".env.3"]
 
-print("🚀 Starting multi-device auto signer simulation...\n")
+if __name__ == "__main__":
+    configs = load_signer_configs(env_files)
+    share_ids = ", ".join(str(config["share_id"]) for config in configs)
 
-for env_file in env_files:
-    env_values = dotenv_values(env_file)
-    share_id = env_values.get("SHARE_ID", "unknown")
-    print("🔁 Running signer for SHARE_ID={}".format(share_id))
-
-    env = os.environ.copy()
-    env.update(env_values)  #
-    subprocess.call(["python", SIGNER_SCRIPT], env=env)
-
-    print("-" * 40)
-    time.sleep(1)
+    if "--daemon" in sys.argv:
+        print("🚀 Starting multi-device auto signer daemon for SHARE_IDs {}...\n".format(share_ids))
+        try:
+            asyncio.run(run_daemon(configs))
+        except KeyboardInterrupt:
+            pass
+    else:
+        print("🚀 Starting multi-device auto signer simulation for SHARE_IDs {}...\n".format(share_ids))
+        asyncio.run(run_once_concurrently(configs))
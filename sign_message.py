@@ -2,9 +2,9 @@ import os
 import json
 from typing import List
 from frostpy import required_shares_sign_event_py
+from signature_ledger import default_ledger
 
 SECRETS_DIR = "keys"
-ALL_SIGNATURES_LOG = os.path.join(SECRETS_DIR, "note_signatures.txt")
 RECENT_SIGNATURE_RECORD = os.path.join(SECRETS_DIR, "latest_note_signature.txt")
 
 def ensure_dir(path):
@@ -42,18 +42,10 @@ def read_group_key_bundle():
 
 def save_note_signature(note_signature: str, note_content: str):
     ensure_dir(SECRETS_DIR)
-    # Append to note_signatures.txt as a list
-    entry = {"note_content": note_content, "note_signature": note_signature}
-    if os.path.exists(ALL_SIGNATURES_LOG):
-        with open(ALL_SIGNATURES_LOG, "r") as f:
-            note_signatures = json.load(f)
-    else:
-        note_signatures = []
-    note_signatures.append(entry)
-    with open(ALL_SIGNATURES_LOG, "w") as f:
-        json.dump(note_signatures, f)
-    print(f"Signature appended to → {ALL_SIGNATURES_LOG}")
-    
+    ledger = default_ledger()
+    entry = ledger.append(note_content, note_signature)
+    print(f"Signature appended to → {ledger.directory}")
+
     # Write only the latest to latest_note_signature.txt
     with open(RECENT_SIGNATURE_RECORD, "w") as f:
         json.dump(entry, f)
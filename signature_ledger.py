@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import atexit
+import hashlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends from concurrent processes are not serialized
+    fcntl = None
+
+SECRETS_DIR = "keys"
+LEDGER_DIR = os.path.join(SECRETS_DIR, "signature_ledger")
+LEGACY_SIGNATURES_LOG = os.path.join(SECRETS_DIR, "note_signatures.txt")
+SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+FSYNC_EVERY = 32
+
+SEGMENT_TEMPLATE = "segment-{:06d}.jsonl"
+INDEX_FILE = "index.tsv"
+LOCK_FILE = "ledger.lock"
+
+_default_ledger = None
+
+def content_hash(note_content):
+    return hashlib.sha256(note_content.encode("utf-8")).hexdigest()
+
+def default_ledger():
+    """Process-wide ledger; pending appends are fsynced when the process exits."""
+    global _default_ledger
+    if _default_ledger is None:
+        _default_ledger = SignatureLedger()
+        atexit.register(_default_ledger.close)
+    return _default_ledger
+
+class SignatureLedger:
+    """Append-only log of final note signatures.
+
+    Records are JSON lines spread over size-rotated segment files. A separate
+    index file maps the hash of each note content to the segment and byte
+    offset of its latest signature, so appends never read old records and
+    lookups read exactly one line. The index is loaded lazily on first lookup.
+    """
+
+    def __init__(self, directory=LEDGER_DIR, segment_max_bytes=SEGMENT_MAX_BYTES,
+                 fsync_every=FSYNC_EVERY, legacy_path=LEGACY_SIGNATURES_LOG):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        os.makedirs(directory, exist_ok=True)
+        self._index = None
+        self._index_pos = 0
+        self._segment_number = None
+        self._segment = None
+        self._index_file = None
+        self._unsynced = 0
+        if legacy_path and os.path.exists(legacy_path):
+            self.import_legacy_log(legacy_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.flush()
+        for f in (self._segment, self._index_file):
+            if f is not None:
+                f.close()
+        self._segment = self._index_file = None
+
+    def flush(self):
+        for f in (self._segment, self._index_file):
+            if f is not None:
+                f.flush()
+                os.fsync(f.fileno())
+        self._unsynced = 0
+
+    def append(self, note_content, signature_b64, **extra):
+        record = {"note_content": note_content, "signature": signature_b64, "signed_at": int(time.time())}
+        record.update(extra)
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        digest = content_hash(note_content)
+
+        with self._locked():
+            segment_number = self._active_segment(len(line))
+            offset = os.fstat(self._segment.fileno()).st_size
+            self._segment.write(line)
+            self._segment.flush()
+            self._write_index_entry(digest, segment_number, offset)
+
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.flush()
+        return record
+
+    def find(self, note_content):
+        """Return the latest signature record for a note content, or None."""
+        digest = content_hash(note_content)
+        self._refresh_index()
+        location = self._index.get(digest)
+        if location is None:
+            return None
+        segment_number, offset = location
+        with open(self._segment_path(segment_number), "rb") as f:
+            f.seek(offset)
+            line = f.readline()
+        if not line.strip():
+            return None
+        return json.loads(line)
+
+    def iter_records(self):
+        """Yield every record, oldest first, reading one line at a time."""
+        for segment_number in self._segment_numbers():
+            with open(self._segment_path(segment_number), "r") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def import_legacy_log(self, path=LEGACY_SIGNATURES_LOG):
+        """Import a note_signatures.txt file (JSON array or JSON lines), then set it aside.
+
+        Records are streamed one at a time, so the old log never has to fit in memory.
+        """
+        # verify_note_signature imports this module, so it is imported here.
+        from verify_note_signature import iter_log_records
+        imported = 0
+        for record in iter_log_records(path):
+            signature = record.pop("signature", None) or record.pop("note_signature", None)
+            note_content = record.pop("note_content")
+            self.append(note_content, signature, **record)
+            imported += 1
+        self.flush()
+        try:
+            os.replace(path, path + ".migrated")
+        except FileNotFoundError:
+            pass
+        print(f"✅ Imported {imported} signatures from {path} → {self.directory}")
+        return imported
+
+    def _segment_path(self, segment_number):
+        return os.path.join(self.directory, SEGMENT_TEMPLATE.format(segment_number))
+
+    def _segment_numbers(self):
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith("segment-") and name.endswith(".jsonl"):
+                numbers.append(int(name[len("segment-"):-len(".jsonl")]))
+        return sorted(numbers)
+
+    def _active_segment(self, incoming_bytes):
+        if self._segment_number is None:
+            numbers = self._segment_numbers()
+            self._open_segment(numbers[-1] if numbers else 1)
+        # Another process may have rotated since we last wrote.
+        while os.path.exists(self._segment_path(self._segment_number + 1)):
+            self._open_segment(self._segment_number + 1)
+        size = os.fstat(self._segment.fileno()).st_size
+        if size > 0 and size + incoming_bytes > self.segment_max_bytes:
+            self._open_segment(self._segment_number + 1)
+        return self._segment_number
+
+    def _open_segment(self, segment_number):
+        if self._segment is not None:
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._segment.close()
+        self._segment_number = segment_number
+        self._segment = open(self._segment_path(segment_number), "ab")
+
+    def _write_index_entry(self, digest, segment_number, offset):
+        if self._index_file is None:
+            self._index_file = open(os.path.join(self.directory, INDEX_FILE), "ab")
+        self._index_file.write(f"{digest}\t{segment_number}\t{offset}\n".encode("ascii"))
+        self._index_file.flush()
+
+    def _refresh_index(self):
+        """Read index entries appended since the last lookup, by any process."""
+        if self._index is None:
+            self._index = {}
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, "rb") as f:
+            f.seek(self._index_pos)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written entry; pick it up next time
+                digest, segment_number, offset = line.decode("ascii").split("\t")
+                self._index[digest] = (int(segment_number), int(offset))
+                self._index_pos += len(line)
+
+    def _locked(self):
+        return _LedgerLock(os.path.join(self.directory, LOCK_FILE))
+
+class _LedgerLock:
+    def __init__(self, path):
+        self.path = path
+        self.f = None
+
+    def __enter__(self):
+        self.f = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if fcntl is not None:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+        self.f.close()
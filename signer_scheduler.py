@@ -0,0 +1,186 @@
+import os
+import json
+import time
+from collections import deque
+from datetime import datetime, time as dtime
+
+SECRETS_DIR = "keys"
+PROFILES_FILE = os.path.join(SECRETS_DIR, "signer_profiles.json")
+LATENCY_WINDOW = 64
+LATENCY_QUANTILE = 0.9
+AVAILABILITY_SMOOTHING = 0.1
+MIN_AVAILABILITY = 0.05
+FAILURE_BACKOFF_MIN = 1.0
+FAILURE_BACKOFF_MAX = 60.0
+
+def in_sign_window(sign_start, sign_end, now=None):
+    """Same rule as auto_signer.is_signing_allowed: HH:MM bounds, inclusive, same day."""
+    if not sign_start or not sign_end:
+        return True
+    start = dtime(*map(int, sign_start.split(":")))
+    end = dtime(*map(int, sign_end.split(":")))
+    now = (now or datetime.now()).time()
+    return start <= now <= end
+
+class SignerProfile:
+    """Rolling view of one signer: recent round-2 latencies, availability and sign window."""
+
+    def __init__(self, name, window=LATENCY_WINDOW):
+        self.name = name
+        self.latencies = deque(maxlen=window)
+        self.availability = 1.0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.retry_at = 0.0
+        self.sign_start = None
+        self.sign_end = None
+
+    def record(self, ok, latency=None, now=None):
+        now = time.time() if now is None else now
+        self.availability += AVAILABILITY_SMOOTHING * ((1.0 if ok else 0.0) - self.availability)
+        if ok:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.retry_at = 0.0
+            if latency is not None:
+                self.latencies.append(latency)
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            backoff = min(FAILURE_BACKOFF_MIN * 2 ** (self.consecutive_failures - 1), FAILURE_BACKOFF_MAX)
+            self.retry_at = now + backoff
+
+    def latency_quantile(self, quantile=LATENCY_QUANTILE):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * quantile))]
+
+    def in_window(self, now=None):
+        now = time.time() if now is None else now
+        return in_sign_window(self.sign_start, self.sign_end, datetime.fromtimestamp(now))
+
+    def backing_off(self, now=None):
+        return self.retry_at > (time.time() if now is None else now)
+
+    def available(self, now=None):
+        """Inside its sign window and not backing off after a failure."""
+        return self.in_window(now) and not self.backing_off(now)
+
+    def cost(self, quantile=LATENCY_QUANTILE):
+        """Expected tail latency, inflated for signers that fail often; None until measured."""
+        latency = self.latency_quantile(quantile)
+        if latency is None:
+            return None
+        return latency / max(self.availability, MIN_AVAILABILITY)
+
+    def as_dict(self):
+        return {
+            "latencies": list(self.latencies),
+            "availability": self.availability,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_at": self.retry_at,
+            "sign_start": self.sign_start,
+            "sign_end": self.sign_end,
+        }
+
+    @classmethod
+    def from_dict(cls, name, data, window=LATENCY_WINDOW):
+        profile = cls(name, window)
+        profile.latencies.extend(data.get("latencies", []))
+        for field in ("availability", "successes", "failures", "consecutive_failures", "retry_at",
+                      "sign_start", "sign_end"):
+            if field in data:
+                setattr(profile, field, data[field])
+        return profile
+
+class SignerScheduler:
+    """Picks which signers to ask, cheapest first.
+
+    Signers are ranked by their recent tail latency (quantile of the last
+    LATENCY_WINDOW samples) divided by their availability, and signers
+    never measured come after measured ones. Signers outside their sign
+    window are skipped. Signers backing off after failures are ranked last,
+    so they are only asked when there are not enough others. Profiles can be saved and reloaded so that one
+    run starts with what the previous one learned.
+    """
+
+    def __init__(self, quantile=LATENCY_QUANTILE, path=None):
+        self.quantile = quantile
+        self.path = path
+        self.profiles = {}
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def profile(self, name):
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = SignerProfile(name)
+        return profile
+
+    def set_window(self, name, sign_start, sign_end):
+        profile = self.profile(name)
+        profile.sign_start, profile.sign_end = sign_start, sign_end
+
+    def record_success(self, name, latency):
+        self.profile(name).record(True, latency)
+
+    def record_failure(self, name):
+        self.profile(name).record(False)
+
+    def rank(self, names, now=None):
+        """The names inside their sign window, cheapest first, those backing off last."""
+        now = time.time() if now is None else now
+        in_window = [name for name in names if self.profile(name).in_window(now)]
+
+        def sort_key(name):
+            profile = self.profile(name)
+            cost = profile.cost(self.quantile)
+            if profile.backing_off(now):
+                return (True, profile.retry_at, 0.0)
+            return (False, cost is None, cost or 0.0)
+        return sorted(in_window, key=sort_key)
+
+    def choose(self, names, threshold, hedge=0, now=None):
+        """(primary, backups): the threshold cheapest signers and up to hedge available spares.
+
+        Signers backing off only make it into primary when there are too few
+        others; they are never used as spares. primary is shorter than
+        threshold if not enough signers are inside their sign window.
+        """
+        now = time.time() if now is None else now
+        ranked = self.rank(names, now)
+        spares = [name for name in ranked[threshold:] if not self.profile(name).backing_off(now)]
+        return ranked[:threshold], spares[:hedge]
+
+    def report(self):
+        return {
+            name: {
+                "available": profile.available(),
+                "availability": round(profile.availability, 3),
+                "p50_ms": round(1000 * profile.latency_quantile(0.5), 2) if profile.latencies else None,
+                "tail_ms": round(1000 * profile.latency_quantile(self.quantile), 2) if profile.latencies else None,
+                "failures": profile.failures,
+            }
+            for name, profile in sorted(self.profiles.items())
+        }
+
+    def load(self, path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        self.profiles = {name: SignerProfile.from_dict(name, entry) for name, entry in data.items()}
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({name: profile.as_dict() for name, profile in self.profiles.items()}, f)
+        os.replace(tmp_path, path)
@@ -1,4 +1,6 @@
 use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyString};
+use pyo3::buffer::PyBuffer;
 use frost_core::{SigningPackage, Identifier};
 use frost_core::keys::{
     generate_with_dealer, KeyPackage, PublicKeyPackage, IdentifierList,
@@ -7,16 +9,135 @@ use frost_core::keys::{
 use frost_core::round1;
 use frost_core::round2;
 use frost_secp256k1::Secp256K1Sha256;
+use frost_secp256k1_tr::Secp256K1Sha256TR;
 use frost_core::{aggregate, VerifyingKey, Signature};
+use frost_core::batch;
 use rand::thread_rng;
 use serde_json::{self, json};
 use base64::{engine::general_purpose, Engine};
-use std::collections::BTreeMap;
+use std::collections::{BTreeMap, VecDeque};
 use hex;
 use std::num::NonZeroU16;
+use std::sync::{Arc, Mutex};
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::time::Instant;
+use rayon::prelude::*;
+use rayon::{ThreadPool, ThreadPoolBuilder};
+
+static THREAD_POOL: Mutex<Option<Arc<ThreadPool>>> = Mutex::new(None);
+
+/// Pool used by the parallel variants. Built lazily with one thread per core
+/// unless set_num_threads_py picked a size first.
+fn thread_pool() -> Arc<ThreadPool> {
+    let mut pool = THREAD_POOL.lock().unwrap();
+    pool.get_or_insert_with(|| Arc::new(ThreadPoolBuilder::new().build().expect("Failed to build thread pool")))
+        .clone()
+}
+
+/// A message passed from Python as `str` or as any contiguous buffer (bytes,
+/// bytearray, memoryview, mmap). Buffers are read in place, without copying.
+struct Message<'py> {
+    object: &'py PyAny,
+    buffer: Option<PyBuffer<u8>>,
+}
+
+impl<'py> FromPyObject<'py> for Message<'py> {
+    fn extract(object: &'py PyAny) -> PyResult<Self> {
+        if object.is_instance_of::<PyString>() {
+            return Ok(Message { object, buffer: None });
+        }
+        let buffer = PyBuffer::<u8>::get(object)?;
+        if !buffer.is_c_contiguous() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>("Message buffer must be contiguous"));
+        }
+        Ok(Message { object, buffer: Some(buffer) })
+    }
+}
+
+impl<'py> Message<'py> {
+    fn as_bytes(&self) -> PyResult<&[u8]> {
+        match &self.buffer {
+            // The buffer export keeps the memory alive and in place until `self` is dropped.
+            Some(buffer) => Ok(unsafe { std::slice::from_raw_parts(buffer.buf_ptr() as *const u8, buffer.len_bytes()) }),
+            None => Ok(self.object.downcast::<PyString>()?.to_str()?.as_bytes()),
+        }
+    }
+}
+
+static TIMING_ENABLED: AtomicBool = AtomicBool::new(false);
+static PHASE_TIMINGS: Mutex<BTreeMap<&'static str, PhaseTiming>> = Mutex::new(BTreeMap::new());
+
+#[derive(Default, Clone, Copy)]
+struct PhaseTiming {
+    count: u64,
+    total_ns: u64,
+    max_ns: u64,
+}
+
+/// Runs `f` and, when timing is enabled, adds its duration to the totals of
+/// `phase`. Disabled timing costs one relaxed atomic load.
+fn timed<T>(phase: &'static str, f: impl FnOnce() -> T) -> T {
+    if !TIMING_ENABLED.load(Ordering::Relaxed) {
+        return f();
+    }
+    let started = Instant::now();
+    let result = f();
+    let elapsed_ns = started.elapsed().as_nanos() as u64;
+    let mut timings = PHASE_TIMINGS.lock().unwrap();
+    let timing = timings.entry(phase).or_default();
+    timing.count += 1;
+    timing.total_ns += elapsed_ns;
+    timing.max_ns = timing.max_ns.max(elapsed_ns);
+    result
+}
+
+#[pyfunction]
+fn set_timing_enabled_py(enabled: bool) {
+    TIMING_ENABLED.store(enabled, Ordering::Relaxed);
+}
+
+/// Per-phase totals since the last reset: {phase: {count, total_ns, max_ns}}.
+#[pyfunction]
+#[pyo3(signature = (reset=false))]
+fn phase_timings_py(reset: bool) -> BTreeMap<&'static str, BTreeMap<&'static str, u64>> {
+    let mut timings = PHASE_TIMINGS.lock().unwrap();
+    let snapshot = timings
+        .iter()
+        .map(|(phase, timing)| {
+            (*phase, BTreeMap::from([
+                ("count", timing.count),
+                ("total_ns", timing.total_ns),
+                ("max_ns", timing.max_ns),
+            ]))
+        })
+        .collect();
+    if reset {
+        timings.clear();
+    }
+    snapshot
+}
+
+#[pyfunction]
+fn set_num_threads_py(num_threads: usize) -> PyResult<()> {
+    let pool = ThreadPoolBuilder::new()
+        .num_threads(num_threads)
+        .build()
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Thread pool error: {e}")))?;
+    *THREAD_POOL.lock().unwrap() = Some(Arc::new(pool));
+    Ok(())
+}
 
 #[pyfunction]
-fn generate_keys_py(n: u16, t: u16) -> PyResult<String> {
+fn num_threads_py() -> usize {
+    thread_pool().current_num_threads()
+}
+
+#[pyfunction]
+fn generate_keys_py(py: Python<'_>, n: u16, t: u16) -> PyResult<String> {
+    py.allow_threads(|| timed("keygen", || generate_keys(n, t)))
+}
+
+fn generate_keys(n: u16, t: u16) -> PyResult<String> {
     let mut rng = thread_rng();
     let identifiers: Vec<Identifier<Secp256K1Sha256>> = (1..=n)
         .map(|i| Identifier::<Secp256K1Sha256>::try_from(i).unwrap())
@@ -70,111 +191,891 @@ fn generate_keys_py(n: u16, t: u16) -> PyResult<String> {
         .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("JSON formatting error: {e}")))
 }
 
+/// One dealer-generated group in keystore-ready form: the serialized public
+/// key package, the group verifying key, and (participant id, identifier,
+/// signing share) per participant.
+type GroupBytes = (Vec<u8>, Vec<u8>, Vec<(u16, Vec<u8>, Vec<u8>)>);
+
+fn generate_group_bytes(n: u16, t: u16) -> PyResult<GroupBytes> {
+    let mut rng = thread_rng();
+    let (shares_map, pubkey_package) = generate_with_dealer(n, t, IdentifierList::<Secp256K1Sha256>::Default, &mut rng)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Key generation failed: {e}")))?;
+    let pubkey_package_bytes = pubkey_package.serialize()
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Serialization error: {e}")))?;
+    let verifying_key_bytes = pubkey_package.verifying_key().serialize()
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Serialization error: {e}")))?;
+    // Default identifiers are 1..=n, and the map iterates in identifier order.
+    let shares = shares_map
+        .into_iter()
+        .enumerate()
+        .map(|(index, (id, secret_share))| ((index + 1) as u16, id.serialize(), secret_share.signing_share().serialize()))
+        .collect();
+    Ok((pubkey_package_bytes, verifying_key_bytes, shares))
+}
+
+/// Generates `count` independent (n, t) groups across the shared thread pool
+/// with the GIL released. Results come back as raw bytes, ready for
+/// keystore.write_keystore, rather than as JSON.
 #[pyfunction]
-fn sign_message_py(message: String, shares_json: String, threshold: u16, pubkey_package_json: String) -> PyResult<(String, String)> {
-    let shares_data: Vec<serde_json::Value> = serde_json::from_str(&shares_json)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Share deserialization error: {e}")))?;
+fn generate_groups_py(py: Python<'_>, count: usize, n: u16, t: u16) -> PyResult<Vec<(Py<PyBytes>, Py<PyBytes>, Vec<(u16, Py<PyBytes>, Py<PyBytes>)>)>> {
+    let groups = py.allow_threads(|| {
+        timed("keygen_bulk", || thread_pool().install(|| {
+            (0..count).into_par_iter().map(|_| generate_group_bytes(n, t)).collect::<PyResult<Vec<_>>>()
+        }))
+    })?;
+    Ok(groups
+        .into_iter()
+        .map(|(pubkey_package, verifying_key, shares)| (
+            PyBytes::new(py, &pubkey_package).into(),
+            PyBytes::new(py, &verifying_key).into(),
+            shares
+                .into_iter()
+                .map(|(participant_id, identifier, signing_share)| {
+                    (participant_id, PyBytes::new(py, &identifier).into(), PyBytes::new(py, &signing_share).into())
+                })
+                .collect(),
+        ))
+        .collect())
+}
 
-    let pubkey_package: PublicKeyPackage<Secp256K1Sha256> = {
-        let bytes = general_purpose::STANDARD
-            .decode(&pubkey_package_json)
-            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Pubkey decode error: {e}")))?;
-        PublicKeyPackage::deserialize(&bytes)
-            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Pubkey deserialization error: {e}")))
-    }?;
+fn parse_pubkey_package(pubkey_package_b64: &str) -> PyResult<PublicKeyPackage<Secp256K1Sha256>> {
+    let bytes = general_purpose::STANDARD
+        .decode(pubkey_package_b64)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Pubkey decode error: {e}")))?;
+    PublicKeyPackage::deserialize(&bytes)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Pubkey deserialization error: {e}")))
+}
 
-    let shares: Vec<KeyPackage<Secp256K1Sha256>> = shares_data
-        .iter()
-        .map(|share_data| {
-            let share = share_data.as_object()
-                .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyValueError, _>("Invalid share format"))?;
+fn parse_key_package(share_data: &serde_json::Value) -> PyResult<KeyPackage<Secp256K1Sha256>> {
+    let share = share_data.as_object()
+        .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyValueError, _>("Invalid share format"))?;
 
-            let identifier = Identifier::<Secp256K1Sha256>::deserialize(
-                &hex::decode(share["identifier"].as_str().unwrap())
-                    .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Hex decode error: {e}")))?,
-            ).map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Identifier deserialize error: {e}")))?;
+    let identifier = Identifier::<Secp256K1Sha256>::deserialize(
+        &hex::decode(share["identifier"].as_str().unwrap())
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Hex decode error: {e}")))?,
+    ).map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Identifier deserialize error: {e}")))?;
 
-            let signing_share = SigningShare::<Secp256K1Sha256>::deserialize(
-                &hex::decode(share["signing_share"].as_str().unwrap())
-                    .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Hex decode error: {e}")))?,
-            ).map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signing share deserialize error: {e}")))?;
+    let signing_share = SigningShare::<Secp256K1Sha256>::deserialize(
+        &hex::decode(share["signing_share"].as_str().unwrap())
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Hex decode error: {e}")))?,
+    ).map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signing share deserialize error: {e}")))?;
 
-            let verifying_key = VerifyingKey::<Secp256K1Sha256>::deserialize(
-                &hex::decode(share["verifying_key"].as_str().unwrap())
-                    .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Hex decode error: {e}")))?,
-            ).map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Verifying key deserialize error: {e}")))?;
+    let verifying_key = VerifyingKey::<Secp256K1Sha256>::deserialize(
+        &hex::decode(share["verifying_key"].as_str().unwrap())
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Hex decode error: {e}")))?,
+    ).map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Verifying key deserialize error: {e}")))?;
 
-            let min_signers = NonZeroU16::new(
-                share["min_signers"].as_u64().unwrap() as u16
-            ).ok_or_else(|| PyErr::new::<pyo3::exceptions::PyValueError, _>("Invalid min_signers"))?;
+    let min_signers = NonZeroU16::new(
+        share["min_signers"].as_u64().unwrap() as u16
+    ).ok_or_else(|| PyErr::new::<pyo3::exceptions::PyValueError, _>("Invalid min_signers"))?;
 
-            let verifying_share = VerifyingShare::from(signing_share);
+    let verifying_share = VerifyingShare::from(signing_share);
 
-            Ok(KeyPackage::new(identifier, signing_share, verifying_share, verifying_key, min_signers.get()))
-        })
+    Ok(KeyPackage::new(identifier, signing_share, verifying_share, verifying_key, min_signers.get()))
+}
+
+fn parse_shares(shares_json: &str, threshold: u16) -> PyResult<Vec<KeyPackage<Secp256K1Sha256>>> {
+    let shares_data: Vec<serde_json::Value> = serde_json::from_str(shares_json)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Share deserialization error: {e}")))?;
+
+    let shares = shares_data
+        .iter()
+        .map(parse_key_package)
         .collect::<Result<Vec<_>, PyErr>>()?;
 
+    check_threshold(&shares, threshold)?;
+    Ok(shares)
+}
+
+fn check_threshold(shares: &[KeyPackage<Secp256K1Sha256>], threshold: u16) -> PyResult<()> {
     if shares.len() < threshold as usize {
         return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
             format!("Insufficient shares: got {}, need {}", shares.len(), threshold)
         ));
     }
+    Ok(())
+}
 
-    let mut rng = thread_rng();
-    let mut commitments_map = BTreeMap::new();
-    let mut nonces_map = BTreeMap::new();
+/// A participant's parsed key package, kept on the Rust side so that it can be
+/// reused across signing calls without any JSON or hex decoding.
+#[pyclass(name = "KeyPackage")]
+#[derive(Clone)]
+struct PyKeyPackage {
+    inner: KeyPackage<Secp256K1Sha256>,
+}
+
+#[pymethods]
+impl PyKeyPackage {
+    #[staticmethod]
+    fn from_json(share_json: &str) -> PyResult<Self> {
+        let share_data: serde_json::Value = serde_json::from_str(share_json)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Share deserialization error: {e}")))?;
+        Ok(PyKeyPackage { inner: parse_key_package(&share_data)? })
+    }
+
+    /// Build a key package from raw serialized fields, as stored in a binary keystore.
+    #[staticmethod]
+    fn from_bytes(identifier: &[u8], signing_share: &[u8], verifying_key: &[u8], min_signers: u16) -> PyResult<Self> {
+        let identifier = Identifier::<Secp256K1Sha256>::deserialize(identifier)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Identifier deserialize error: {e}")))?;
+        let signing_share = SigningShare::<Secp256K1Sha256>::deserialize(signing_share)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signing share deserialize error: {e}")))?;
+        let verifying_key = VerifyingKey::<Secp256K1Sha256>::deserialize(verifying_key)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Verifying key deserialize error: {e}")))?;
+        let verifying_share = VerifyingShare::from(signing_share);
+        Ok(PyKeyPackage { inner: KeyPackage::new(identifier, signing_share, verifying_share, verifying_key, min_signers) })
+    }
+
+    #[getter]
+    fn identifier(&self) -> String {
+        hex::encode(self.inner.identifier().serialize())
+    }
+
+    #[getter]
+    fn min_signers(&self) -> u16 {
+        *self.inner.min_signers()
+    }
+
+    fn __repr__(&self) -> String {
+        format!("KeyPackage(identifier={})", self.identifier())
+    }
+}
+
+/// The group's parsed public key package.
+#[pyclass(name = "PublicKeyPackage")]
+#[derive(Clone)]
+struct PyPublicKeyPackage {
+    inner: PublicKeyPackage<Secp256K1Sha256>,
+}
+
+#[pymethods]
+impl PyPublicKeyPackage {
+    #[staticmethod]
+    fn from_base64(pubkey_package_b64: &str) -> PyResult<Self> {
+        Ok(PyPublicKeyPackage { inner: parse_pubkey_package(pubkey_package_b64)? })
+    }
+
+    #[staticmethod]
+    fn from_bytes(pubkey_package: &[u8]) -> PyResult<Self> {
+        let inner = PublicKeyPackage::deserialize(pubkey_package)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Pubkey deserialization error: {e}")))?;
+        Ok(PyPublicKeyPackage { inner })
+    }
 
-    for share in &shares {
-        let (nonces, commitments) = round1::commit(share.signing_share(), &mut rng);
-        commitments_map.insert(*share.identifier(), commitments);
-        nonces_map.insert(*share.identifier(), nonces);
+    #[getter]
+    fn verifying_key(&self) -> PyResult<String> {
+        let bytes = self.inner.verifying_key().serialize()
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Serialization error: {e}")))?;
+        Ok(general_purpose::STANDARD.encode(bytes))
     }
 
-    let signing_package = SigningPackage::new(commitments_map, message.as_bytes());
+    /// The group key as a Nostr pubkey: hex of its 32-byte x coordinate (BIP-340).
+    #[getter]
+    fn nostr_pubkey(&self) -> PyResult<String> {
+        Ok(hex::encode(x_only(self.inner.verifying_key())?))
+    }
 
-    let mut partial_signatures = BTreeMap::new();
-    for share in &shares {
-        let nonce = nonces_map.get(share.identifier()).unwrap();
-        let signature = round2::sign(&signing_package, nonce, share)
-            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signing error: {e}")))?;
-        partial_signatures.insert(*share.identifier(), signature);
+    fn __repr__(&self) -> PyResult<String> {
+        Ok(format!("PublicKeyPackage(verifying_key={})", self.verifying_key()?))
     }
+}
+
+fn unwrap_key_packages(key_packages: &[PyRef<PyKeyPackage>]) -> Vec<KeyPackage<Secp256K1Sha256>> {
+    key_packages.iter().map(|package| package.inner.clone()).collect()
+}
 
-    let signature = aggregate(&signing_package, &partial_signatures, &pubkey_package)
+type Round1Pair = (round1::SigningNonces<Secp256K1Sha256>, round1::SigningCommitments<Secp256K1Sha256>);
+
+/// Runs round 2, aggregation and the self-check for round-1 material that was
+/// produced earlier. The nonces are taken by value so they cannot be used twice.
+/// With `parallel` set, the per-participant round-2 shares are computed on the
+/// shared thread pool.
+fn finish_signing(
+    message: &[u8],
+    shares: &[KeyPackage<Secp256K1Sha256>],
+    round1_pairs: BTreeMap<Identifier<Secp256K1Sha256>, Round1Pair>,
+    pubkey_package: &PublicKeyPackage<Secp256K1Sha256>,
+    parallel: bool,
+) -> PyResult<String> {
+    let commitments_map: BTreeMap<_, _> = round1_pairs
+        .iter()
+        .map(|(id, (_, commitments))| (*id, commitments.clone()))
+        .collect();
+
+    let signing_package = SigningPackage::new(commitments_map, message);
+
+    let sign_share = |share: &KeyPackage<Secp256K1Sha256>| {
+        let (nonce, _) = round1_pairs.get(share.identifier()).unwrap();
+        round2::sign(&signing_package, nonce, share)
+            .map(|signature| (*share.identifier(), signature))
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signing error: {e}")))
+    };
+    let partial_signatures: BTreeMap<_, _> = timed("round2", || if parallel {
+        thread_pool().install(|| shares.par_iter().map(sign_share).collect::<PyResult<BTreeMap<_, _>>>())
+    } else {
+        shares.iter().map(sign_share).collect::<PyResult<BTreeMap<_, _>>>()
+    })?;
+    drop(round1_pairs);
+
+    let signature = timed("aggregate", || aggregate(&signing_package, &partial_signatures, pubkey_package))
         .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Aggregation error: {e}")))?;
 
-    if pubkey_package.verifying_key().verify(message.as_bytes(), &signature).is_err() {
+    if timed("self_verify", || pubkey_package.verifying_key().verify(message, &signature)).is_err() {
         return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>("Generated signature is invalid"));
     }
 
     let signature_bytes = signature.serialize()
         .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Serialization error: {e}")))?;
-    let signature_b64 = general_purpose::STANDARD.encode(signature_bytes);
-    Ok((signature_b64, message))
+    Ok(general_purpose::STANDARD.encode(signature_bytes))
+}
+
+fn commit_all(shares: &[KeyPackage<Secp256K1Sha256>]) -> BTreeMap<Identifier<Secp256K1Sha256>, Round1Pair> {
+    let mut rng = thread_rng();
+    shares
+        .iter()
+        .map(|share| (*share.identifier(), round1::commit(share.signing_share(), &mut rng)))
+        .collect()
+}
+
+fn sign_message(message: &[u8], shares_json: &str, threshold: u16, pubkey_package_json: &str, parallel: bool) -> PyResult<String> {
+    let (pubkey_package, shares) = timed("parse", || -> PyResult<_> {
+        Ok((parse_pubkey_package(pubkey_package_json)?, parse_shares(shares_json, threshold)?))
+    })?;
+    let round1_pairs = timed("round1", || commit_all(&shares));
+    finish_signing(message, &shares, round1_pairs, &pubkey_package, parallel)
+}
+
+#[pyfunction]
+fn sign_message_py(py: Python<'_>, message: Message<'_>, shares_json: String, threshold: u16, pubkey_package_json: String) -> PyResult<(String, PyObject)> {
+    let bytes = message.as_bytes()?;
+    let signature_b64 = py.allow_threads(|| sign_message(bytes, &shares_json, threshold, &pubkey_package_json, false))?;
+    Ok((signature_b64, message.object.into_py(py)))
+}
+
+/// Like sign_message_py, but round 2 runs for all participants in parallel.
+#[pyfunction]
+fn sign_message_parallel_py(py: Python<'_>, message: Message<'_>, shares_json: String, threshold: u16, pubkey_package_json: String) -> PyResult<(String, PyObject)> {
+    let bytes = message.as_bytes()?;
+    let signature_b64 = py.allow_threads(|| sign_message(bytes, &shares_json, threshold, &pubkey_package_json, true))?;
+    Ok((signature_b64, message.object.into_py(py)))
+}
+
+#[pyfunction]
+#[pyo3(signature = (message, key_packages, threshold, pubkey_package, parallel=false))]
+fn sign_with_packages_py(
+    py: Python<'_>,
+    message: Message<'_>,
+    key_packages: Vec<PyRef<PyKeyPackage>>,
+    threshold: u16,
+    pubkey_package: PyRef<PyPublicKeyPackage>,
+    parallel: bool,
+) -> PyResult<String> {
+    let shares = unwrap_key_packages(&key_packages);
+    check_threshold(&shares, threshold)?;
+    let pubkey_package = &pubkey_package.inner;
+    let message = message.as_bytes()?;
+
+    py.allow_threads(|| {
+        let round1_pairs = commit_all(&shares);
+        finish_signing(message, &shares, round1_pairs, pubkey_package, parallel)
+    })
+}
+
+fn taproot_error(context: &str, e: impl std::fmt::Display) -> PyErr {
+    PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("{context}: {e}"))
+}
+
+/// The x coordinate of the group key, which is what BIP-340 and Nostr use as the public key.
+fn x_only(verifying_key: &VerifyingKey<Secp256K1Sha256>) -> PyResult<[u8; 32]> {
+    let bytes = verifying_key.serialize().map_err(|e| taproot_error("Serialization error", e))?;
+    let mut x = [0u8; 32];
+    x.copy_from_slice(&bytes[bytes.len() - 32..]);
+    Ok(x)
+}
+
+/// The same key share under the BIP-340 ciphersuite. Both ciphersuites use
+/// secp256k1 scalars and points with the same encoding, so existing shares
+/// carry over unchanged; the BIP-340 suite negates them itself when the
+/// group key has an odd y coordinate.
+fn taproot_key_package(key_package: &KeyPackage<Secp256K1Sha256>) -> PyResult<KeyPackage<Secp256K1Sha256TR>> {
+    let identifier = Identifier::<Secp256K1Sha256TR>::deserialize(&key_package.identifier().serialize())
+        .map_err(|e| taproot_error("Identifier conversion error", e))?;
+    let signing_share = SigningShare::<Secp256K1Sha256TR>::deserialize(&key_package.signing_share().serialize())
+        .map_err(|e| taproot_error("Signing share conversion error", e))?;
+    let verifying_share = VerifyingShare::from(signing_share);
+    let verifying_key = taproot_verifying_key(key_package.verifying_key())?;
+    Ok(KeyPackage::new(identifier, signing_share, verifying_share, verifying_key, *key_package.min_signers()))
+}
+
+fn taproot_verifying_key(verifying_key: &VerifyingKey<Secp256K1Sha256>) -> PyResult<VerifyingKey<Secp256K1Sha256TR>> {
+    let bytes = verifying_key.serialize().map_err(|e| taproot_error("Serialization error", e))?;
+    VerifyingKey::<Secp256K1Sha256TR>::deserialize(&bytes).map_err(|e| taproot_error("Verifying key conversion error", e))
+}
+
+fn taproot_pubkey_package(pubkey_package: &PublicKeyPackage<Secp256K1Sha256>) -> PyResult<PublicKeyPackage<Secp256K1Sha256TR>> {
+    let verifying_shares = pubkey_package
+        .verifying_shares()
+        .iter()
+        .map(|(identifier, verifying_share)| {
+            let identifier = Identifier::<Secp256K1Sha256TR>::deserialize(&identifier.serialize())
+                .map_err(|e| taproot_error("Identifier conversion error", e))?;
+            let bytes = verifying_share.serialize().map_err(|e| taproot_error("Serialization error", e))?;
+            let verifying_share = VerifyingShare::<Secp256K1Sha256TR>::deserialize(&bytes)
+                .map_err(|e| taproot_error("Verifying share conversion error", e))?;
+            Ok((identifier, verifying_share))
+        })
+        .collect::<PyResult<BTreeMap<_, _>>>()?;
+    Ok(PublicKeyPackage::new(verifying_shares, taproot_verifying_key(pubkey_package.verifying_key())?))
+}
+
+/// Standard BIP-340 check of a 64-byte signature against a 32-byte x-only key.
+fn verify_bip340(message: &[u8], signature: &[u8], x_only_key: &[u8]) -> bool {
+    let Ok(key) = k256::schnorr::VerifyingKey::from_bytes(x_only_key) else { return false };
+    let Ok(signature) = k256::schnorr::Signature::try_from(signature) else { return false };
+    key.verify_raw(message, &signature).is_ok()
+}
+
+/// FROST-signs a Nostr event id in BIP-340 form, so the group key itself can
+/// be the event's pubkey. Returns the 64-byte signature as hex, ready for the
+/// event's `sig` field. Rounds 1 and 2 run here with fresh nonces: the nonce
+/// pools of SigningSession belong to the other ciphersuite.
+#[pyfunction]
+fn sign_event_id_py(
+    py: Python<'_>,
+    event_id: Message<'_>,
+    key_packages: Vec<PyRef<PyKeyPackage>>,
+    threshold: u16,
+    pubkey_package: PyRef<PyPublicKeyPackage>,
+) -> PyResult<String> {
+    let shares = unwrap_key_packages(&key_packages);
+    check_threshold(&shares, threshold)?;
+    let event_id = event_id.as_bytes()?;
+    if event_id.len() != 32 {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>("Event id must be 32 bytes"));
+    }
+    let x_only_key = x_only(pubkey_package.inner.verifying_key())?;
+    let shares = shares.iter().map(taproot_key_package).collect::<PyResult<Vec<_>>>()?;
+    let pubkey_package = taproot_pubkey_package(&pubkey_package.inner)?;
+
+    py.allow_threads(|| {
+        let mut rng = thread_rng();
+        let round1_pairs: BTreeMap<_, _> = timed("round1", || shares
+            .iter()
+            .map(|share| (*share.identifier(), round1::commit(share.signing_share(), &mut rng)))
+            .collect());
+        let commitments: BTreeMap<_, _> = round1_pairs
+            .iter()
+            .map(|(identifier, (_, commitments))| (*identifier, *commitments))
+            .collect();
+        let signing_package = SigningPackage::new(commitments, event_id);
+        let signature_shares = timed("round2", || shares
+            .iter()
+            .map(|share| {
+                let (nonces, _) = &round1_pairs[share.identifier()];
+                round2::sign(&signing_package, nonces, share).map(|signature_share| (*share.identifier(), signature_share))
+            })
+            .collect::<Result<BTreeMap<_, _>, _>>())
+            .map_err(|e| taproot_error("Signing error", e))?;
+        drop(round1_pairs);
+
+        let signature = timed("aggregate", || aggregate(&signing_package, &signature_shares, &pubkey_package))
+            .map_err(|e| taproot_error("Aggregation error", e))?;
+        // The serialized R may carry a parity byte; BIP-340 wants x(R) || z.
+        let bytes = signature.serialize().map_err(|e| taproot_error("Serialization error", e))?;
+        let bip340 = &bytes[bytes.len() - 64..];
+        if !timed("self_verify", || verify_bip340(event_id, bip340, &x_only_key)) {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>("Generated signature is invalid"));
+        }
+        Ok(hex::encode(bip340))
+    })
+}
+
+/// BIP-340 check of a Nostr event signature: 32-byte event id, hex signature and hex x-only pubkey.
+#[pyfunction]
+fn verify_event_signature_py(py: Python<'_>, event_id: Message<'_>, signature_hex: String, pubkey_hex: String) -> PyResult<bool> {
+    let event_id = event_id.as_bytes()?;
+    let (Ok(signature), Ok(pubkey)) = (hex::decode(&signature_hex), hex::decode(&pubkey_hex)) else {
+        return Ok(false);
+    };
+    Ok(py.allow_threads(|| timed("verify", || verify_bip340(event_id, &signature, &pubkey))))
+}
+
+/// Bounded queue of precomputed round-1 nonce/commitment pairs for one participant.
+struct NoncePool {
+    entries: VecDeque<Round1Pair>,
+    capacity: usize,
+}
+
+impl NoncePool {
+    fn new(capacity: usize) -> Self {
+        NoncePool { entries: VecDeque::with_capacity(capacity), capacity }
+    }
+
+    fn refill(&mut self, signing_share: &SigningShare<Secp256K1Sha256>, limit: usize) -> usize {
+        let mut rng = thread_rng();
+        let count = self.capacity.saturating_sub(self.entries.len()).min(limit);
+        for _ in 0..count {
+            self.entries.push_back(round1::commit(signing_share, &mut rng));
+        }
+        count
+    }
+
+    fn take(&mut self) -> Option<Round1Pair> {
+        self.entries.pop_front()
+    }
+}
+
+/// A signer set whose key material is parsed once and whose round-1 nonces are
+/// precomputed into per-participant pools, so signing only has to run round 2.
+#[pyclass]
+struct SigningSession {
+    shares: Vec<KeyPackage<Secp256K1Sha256>>,
+    pubkey_package: PublicKeyPackage<Secp256K1Sha256>,
+    pools: BTreeMap<Identifier<Secp256K1Sha256>, NoncePool>,
+    pool_capacity: usize,
+    nonces_generated: u64,
+    nonces_consumed: u64,
+    pool_misses: u64,
+    refills: u64,
+    signatures: u64,
+}
+
+impl SigningSession {
+    fn from_parts(
+        shares: Vec<KeyPackage<Secp256K1Sha256>>,
+        pubkey_package: PublicKeyPackage<Secp256K1Sha256>,
+        pool_capacity: usize,
+    ) -> Self {
+        let pools = shares
+            .iter()
+            .map(|share| (*share.identifier(), NoncePool::new(pool_capacity)))
+            .collect();
+        SigningSession {
+            shares,
+            pubkey_package,
+            pools,
+            pool_capacity,
+            nonces_generated: 0,
+            nonces_consumed: 0,
+            pool_misses: 0,
+            refills: 0,
+            signatures: 0,
+        }
+    }
+
+    fn take_round1(&mut self) -> BTreeMap<Identifier<Secp256K1Sha256>, Round1Pair> {
+        timed("round1", || self.take_round1_untimed())
+    }
+
+    fn take_round1_untimed(&mut self) -> BTreeMap<Identifier<Secp256K1Sha256>, Round1Pair> {
+        let mut rng = thread_rng();
+        let mut round1_pairs = BTreeMap::new();
+        for share in &self.shares {
+            let pool = self.pools.get_mut(share.identifier()).unwrap();
+            let pair = match pool.take() {
+                Some(pair) => pair,
+                None => {
+                    self.pool_misses += 1;
+                    self.nonces_generated += 1;
+                    round1::commit(share.signing_share(), &mut rng)
+                }
+            };
+            self.nonces_consumed += 1;
+            round1_pairs.insert(*share.identifier(), pair);
+        }
+        round1_pairs
+    }
+}
+
+#[pymethods]
+impl SigningSession {
+    #[new]
+    #[pyo3(signature = (shares_json, threshold, pubkey_package_b64, pool_capacity=64))]
+    fn new(shares_json: String, threshold: u16, pubkey_package_b64: String, pool_capacity: usize) -> PyResult<Self> {
+        let pubkey_package = parse_pubkey_package(&pubkey_package_b64)?;
+        let shares = parse_shares(&shares_json, threshold)?;
+        Ok(SigningSession::from_parts(shares, pubkey_package, pool_capacity))
+    }
+
+    #[staticmethod]
+    #[pyo3(signature = (key_packages, threshold, pubkey_package, pool_capacity=64))]
+    fn from_packages(
+        key_packages: Vec<PyRef<PyKeyPackage>>,
+        threshold: u16,
+        pubkey_package: PyRef<PyPublicKeyPackage>,
+        pool_capacity: usize,
+    ) -> PyResult<Self> {
+        let shares = unwrap_key_packages(&key_packages);
+        check_threshold(&shares, threshold)?;
+        Ok(SigningSession::from_parts(shares, pubkey_package.inner.clone(), pool_capacity))
+    }
+
+    /// Tops every participant pool up towards its capacity, generating at most
+    /// `count` new pairs per participant. Returns the number of pairs generated.
+    #[pyo3(signature = (count=None))]
+    fn refill(&mut self, py: Python<'_>, count: Option<usize>) -> usize {
+        let limit = count.unwrap_or(self.pool_capacity);
+        let shares = &self.shares;
+        let pools = &mut self.pools;
+        let generated = py.allow_threads(|| {
+            let mut generated = 0;
+            for share in shares {
+                let pool = pools.get_mut(share.identifier()).unwrap();
+                generated += pool.refill(share.signing_share(), limit);
+            }
+            generated
+        });
+        if generated > 0 {
+            self.refills += 1;
+            self.nonces_generated += generated as u64;
+        }
+        generated
+    }
+
+    #[pyo3(signature = (message, parallel=false))]
+    fn sign(&mut self, py: Python<'_>, message: Message<'_>, parallel: bool) -> PyResult<String> {
+        let message = message.as_bytes()?;
+        let round1_pairs = self.take_round1();
+        let shares = &self.shares;
+        let pubkey_package = &self.pubkey_package;
+        let signature_b64 = py.allow_threads(|| {
+            finish_signing(message, shares, round1_pairs, pubkey_package, parallel)
+        })?;
+        self.signatures += 1;
+        Ok(signature_b64)
+    }
+
+    /// Signs every message with one set of pooled nonces each. The GIL is released
+    /// while signing, and each message gets either a signature or an error. With
+    /// `parallel` set, messages are spread over the shared thread pool.
+    #[pyo3(signature = (messages, parallel=false))]
+    fn sign_batch(&mut self, py: Python<'_>, messages: Vec<Message<'_>>, parallel: bool) -> PyResult<Vec<(Option<String>, Option<String>)>> {
+        let messages = messages.iter().map(Message::as_bytes).collect::<PyResult<Vec<&[u8]>>>()?;
+        let round1_batch: Vec<_> = messages.iter().map(|_| self.take_round1()).collect();
+        let shares = &self.shares;
+        let pubkey_package = &self.pubkey_package;
+        let results: Vec<PyResult<String>> = py.allow_threads(|| {
+            let sign_one = |(message, round1_pairs): (&&[u8], _)| {
+                finish_signing(message, shares, round1_pairs, pubkey_package, false)
+            };
+            if parallel {
+                thread_pool().install(|| messages.par_iter().zip(round1_batch).map(sign_one).collect())
+            } else {
+                messages.iter().zip(round1_batch).map(sign_one).collect()
+            }
+        });
+
+        Ok(results
+            .into_iter()
+            .map(|result| match result {
+                Ok(signature_b64) => {
+                    self.signatures += 1;
+                    (Some(signature_b64), None)
+                }
+                Err(e) => (None, Some(e.to_string())),
+            })
+            .collect())
+    }
+
+    /// Number of signatures that can be produced without generating fresh nonces.
+    #[getter]
+    fn available(&self) -> usize {
+        self.pools.values().map(|pool| pool.entries.len()).min().unwrap_or(0)
+    }
+
+    #[getter]
+    fn pool_capacity(&self) -> usize {
+        self.pool_capacity
+    }
+
+    fn pool_sizes(&self) -> BTreeMap<String, usize> {
+        self.pools
+            .iter()
+            .map(|(id, pool)| (hex::encode(id.serialize()), pool.entries.len()))
+            .collect()
+    }
+
+    fn metrics(&self) -> BTreeMap<&'static str, u64> {
+        BTreeMap::from([
+            ("pool_capacity", self.pool_capacity as u64),
+            ("available", self.available() as u64),
+            ("nonces_generated", self.nonces_generated),
+            ("nonces_consumed", self.nonces_consumed),
+            ("pool_misses", self.pool_misses),
+            ("refills", self.refills),
+            ("signatures", self.signatures),
+        ])
+    }
+}
+
+/// Secret round-1 nonces of one participant. They never leave the Rust side
+/// and are consumed by the first round-2 signature made with them.
+#[pyclass(name = "SigningNonces")]
+struct PySigningNonces {
+    inner: Option<round1::SigningNonces<Secp256K1Sha256>>,
+}
+
+#[pymethods]
+impl PySigningNonces {
+    #[getter]
+    fn used(&self) -> bool {
+        self.inner.is_none()
+    }
+
+    /// Serialized nonces, for a signer that must keep them across processes.
+    /// Whoever holds these bytes can sign once with them; store them like a share.
+    fn to_bytes(&self, py: Python<'_>) -> PyResult<Py<PyBytes>> {
+        let nonces = self.inner.as_ref()
+            .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyValueError, _>("Nonces were already used"))?;
+        let bytes = nonces.serialize()
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Serialization error: {e}")))?;
+        Ok(PyBytes::new(py, &bytes).into())
+    }
+
+    #[staticmethod]
+    fn from_bytes(nonces: &[u8]) -> PyResult<Self> {
+        let inner = round1::SigningNonces::<Secp256K1Sha256>::deserialize(nonces)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Nonces deserialize error: {e}")))?;
+        Ok(PySigningNonces { inner: Some(inner) })
+    }
+
+    fn __repr__(&self) -> String {
+        format!("SigningNonces(used={})", self.used())
+    }
+}
+
+fn parse_identifier(identifier_hex: &str) -> PyResult<Identifier<Secp256K1Sha256>> {
+    let bytes = hex::decode(identifier_hex)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Hex decode error: {e}")))?;
+    Identifier::<Secp256K1Sha256>::deserialize(&bytes)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Identifier deserialize error: {e}")))
+}
+
+fn parse_commitments(
+    commitments: &BTreeMap<String, Vec<u8>>,
+) -> PyResult<BTreeMap<Identifier<Secp256K1Sha256>, round1::SigningCommitments<Secp256K1Sha256>>> {
+    commitments
+        .iter()
+        .map(|(identifier_hex, bytes)| {
+            let commitment = round1::SigningCommitments::<Secp256K1Sha256>::deserialize(bytes)
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Commitment deserialize error: {e}")))?;
+            Ok((parse_identifier(identifier_hex)?, commitment))
+        })
+        .collect()
+}
+
+/// Round 1 for a single participant: fresh nonces plus the serialized
+/// commitments to send to the coordinator.
+#[pyfunction]
+fn round1_commit_py(py: Python<'_>, key_package: PyRef<PyKeyPackage>) -> PyResult<(PySigningNonces, Py<PyBytes>)> {
+    let (nonces, commitments) = round1::commit(key_package.inner.signing_share(), &mut thread_rng());
+    let bytes = commitments.serialize()
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Serialization error: {e}")))?;
+    Ok((PySigningNonces { inner: Some(nonces) }, PyBytes::new(py, &bytes).into()))
 }
 
+/// Round 2 for a single participant. `commitments` maps identifier (hex) to
+/// serialized commitments of every signer chosen by the coordinator. The
+/// nonces are consumed even if signing fails, so they can never be reused.
 #[pyfunction]
-fn verify_signature_py(message: String, signature_b64: String, public_key_b64: String) -> PyResult<bool> {
-    let signature_bytes = general_purpose::STANDARD
-        .decode(signature_b64)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signature decode error: {e}")))?;
+fn round2_sign_py(
+    py: Python<'_>,
+    message: Message<'_>,
+    commitments: BTreeMap<String, Vec<u8>>,
+    mut nonces: PyRefMut<PySigningNonces>,
+    key_package: PyRef<PyKeyPackage>,
+) -> PyResult<Py<PyBytes>> {
+    let message = message.as_bytes()?;
+    let commitments = parse_commitments(&commitments)?;
+    let nonces = nonces.inner.take()
+        .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyValueError, _>("Nonces were already used"))?;
+    let key_package = key_package.inner.clone();
+    let signature_share = py.allow_threads(|| {
+        let signing_package = SigningPackage::new(commitments, message);
+        round2::sign(&signing_package, &nonces, &key_package)
+    }).map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signing error: {e}")))?;
+    Ok(PyBytes::new(py, &signature_share.serialize()).into())
+}
 
+/// Checks one participant's signature share against its VerifyingShare from
+/// the group's public key package, so a bad share is caught when it arrives
+/// rather than when the signature is aggregated.
+#[pyfunction]
+fn verify_signature_share_py(
+    py: Python<'_>,
+    message: Message<'_>,
+    commitments: BTreeMap<String, Vec<u8>>,
+    identifier: String,
+    signature_share: Vec<u8>,
+    pubkey_package: PyRef<PyPublicKeyPackage>,
+) -> PyResult<bool> {
+    let message = message.as_bytes()?;
+    let commitments = parse_commitments(&commitments)?;
+    let identifier = parse_identifier(&identifier)?;
+    let signature_share = round2::SignatureShare::<Secp256K1Sha256>::deserialize(&signature_share)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signature share deserialize error: {e}")))?;
+    let pubkey_package = pubkey_package.inner.clone();
+    let verifying_share = pubkey_package.verifying_shares().get(&identifier).cloned()
+        .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyValueError, _>("Unknown participant identifier"))?;
+    Ok(py.allow_threads(|| {
+        let signing_package = SigningPackage::new(commitments, message);
+        timed("verify_share", || frost_core::verify_signature_share(
+            identifier,
+            &verifying_share,
+            &signature_share,
+            &signing_package,
+            pubkey_package.verifying_key(),
+        )).is_ok()
+    }))
+}
+
+/// Coordinator side: aggregate the signature shares returned by round 2 and
+/// check the result against the group key.
+#[pyfunction]
+fn aggregate_py(
+    py: Python<'_>,
+    message: Message<'_>,
+    commitments: BTreeMap<String, Vec<u8>>,
+    signature_shares: BTreeMap<String, Vec<u8>>,
+    pubkey_package: PyRef<PyPublicKeyPackage>,
+) -> PyResult<String> {
+    let message = message.as_bytes()?;
+    let commitments = parse_commitments(&commitments)?;
+    let signature_shares = signature_shares
+        .iter()
+        .map(|(identifier_hex, bytes)| {
+            let share = round2::SignatureShare::<Secp256K1Sha256>::deserialize(bytes)
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signature share deserialize error: {e}")))?;
+            Ok((parse_identifier(identifier_hex)?, share))
+        })
+        .collect::<PyResult<BTreeMap<_, _>>>()?;
+    let pubkey_package = pubkey_package.inner.clone();
+    py.allow_threads(|| {
+        let signing_package = SigningPackage::new(commitments, message);
+        let signature = aggregate(&signing_package, &signature_shares, &pubkey_package)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Aggregation error: {e}")))?;
+        if pubkey_package.verifying_key().verify(message, &signature).is_err() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>("Generated signature is invalid"));
+        }
+        let signature_bytes = signature.serialize()
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Serialization error: {e}")))?;
+        Ok(general_purpose::STANDARD.encode(signature_bytes))
+    })
+}
+
+fn parse_verifying_key(public_key_b64: &str) -> PyResult<VerifyingKey<Secp256K1Sha256>> {
     let public_key_bytes = general_purpose::STANDARD
         .decode(public_key_b64)
         .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Public key decode error: {e}")))?;
+    VerifyingKey::<Secp256K1Sha256>::deserialize(&public_key_bytes)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Public key parse error: {e}")))
+}
+
+#[pyfunction]
+fn verify_signature_py(py: Python<'_>, message: Message<'_>, signature_b64: String, public_key_b64: String) -> PyResult<bool> {
+    let message = message.as_bytes()?;
+    py.allow_threads(|| {
+        let signature_bytes = general_purpose::STANDARD
+            .decode(signature_b64)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signature decode error: {e}")))?;
 
-    let signature = Signature::<Secp256K1Sha256>::deserialize(&signature_bytes)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signature parse error: {e}")))?;
-    let public_key = VerifyingKey::<Secp256K1Sha256>::deserialize(&public_key_bytes)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Public key parse error: {e}")))?;
+        let signature = Signature::<Secp256K1Sha256>::deserialize(&signature_bytes)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Signature parse error: {e}")))?;
+        let public_key = parse_verifying_key(&public_key_b64)?;
 
-    Ok(public_key.verify(message.as_bytes(), &signature).is_ok())
+        Ok(timed("verify", || public_key.verify(message, &signature)).is_ok())
+    })
+}
+
+/// Batch-verifies one slice of (message, signature) items against a single key.
+fn verify_items(public_key: &VerifyingKey<Secp256K1Sha256>, items: &[(&[u8], &str)]) -> Vec<bool> {
+    timed("verify_batch", || verify_items_untimed(public_key, items))
+}
+
+fn verify_items_untimed(public_key: &VerifyingKey<Secp256K1Sha256>, items: &[(&[u8], &str)]) -> Vec<bool> {
+    // Signatures that fail to decode are reported as invalid instead of failing the whole batch.
+    let batch_items: Vec<(usize, batch::Item<Secp256K1Sha256>)> = items
+        .iter()
+        .enumerate()
+        .filter_map(|(index, (message, signature_b64))| {
+            let signature_bytes = general_purpose::STANDARD.decode(signature_b64).ok()?;
+            let signature = Signature::<Secp256K1Sha256>::deserialize(&signature_bytes).ok()?;
+            Some((index, batch::Item::from((public_key.clone(), signature, *message))))
+        })
+        .collect();
+
+    let mut verifier = batch::Verifier::<Secp256K1Sha256>::new();
+    for (_, item) in &batch_items {
+        verifier.queue(item.clone());
+    }
+
+    let mut results = vec![false; items.len()];
+    if verifier.verify(thread_rng()).is_ok() {
+        for (index, _) in &batch_items {
+            results[*index] = true;
+        }
+    } else {
+        // The batch equation only says that something is wrong; find out which items are.
+        for (index, item) in batch_items {
+            results[index] = item.verify_single().is_ok();
+        }
+    }
+    results
+}
+
+/// Borrows the bytes of each (message, signature) item; buffers are not copied.
+fn item_bytes<'a>(items: &'a [(Message<'_>, String)]) -> PyResult<Vec<(&'a [u8], &'a str)>> {
+    items.iter().map(|(message, signature_b64)| Ok((message.as_bytes()?, signature_b64.as_str()))).collect()
+}
+
+#[pyfunction]
+fn verify_batch_py(py: Python<'_>, items: Vec<(Message<'_>, String)>, public_key_b64: String) -> PyResult<Vec<bool>> {
+    let items = item_bytes(&items)?;
+    py.allow_threads(|| {
+        let public_key = parse_verifying_key(&public_key_b64)?;
+        Ok(verify_items(&public_key, &items))
+    })
+}
+
+/// Like verify_batch_py, but the items are split into chunks that are
+/// batch-verified concurrently on the shared thread pool.
+#[pyfunction]
+fn verify_batch_parallel_py(py: Python<'_>, items: Vec<(Message<'_>, String)>, public_key_b64: String) -> PyResult<Vec<bool>> {
+    let items = item_bytes(&items)?;
+    py.allow_threads(|| {
+        let public_key = parse_verifying_key(&public_key_b64)?;
+        let pool = thread_pool();
+        let chunk_size = (items.len() / pool.current_num_threads()).max(1);
+        let chunks: Vec<Vec<bool>> = pool.install(|| {
+            items.par_chunks(chunk_size).map(|chunk| verify_items(&public_key, chunk)).collect()
+        });
+        Ok(chunks.concat())
+    })
 }
 
 #[pymodule]
 fn frostpy(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(generate_keys_py, m)?)?;
+    m.add_function(wrap_pyfunction!(generate_groups_py, m)?)?;
     m.add_function(wrap_pyfunction!(sign_message_py, m)?)?;
     m.add_function(wrap_pyfunction!(verify_signature_py, m)?)?;
+    m.add_function(wrap_pyfunction!(verify_batch_py, m)?)?;
+    m.add_function(wrap_pyfunction!(sign_message_parallel_py, m)?)?;
+    m.add_function(wrap_pyfunction!(verify_batch_parallel_py, m)?)?;
+    m.add_function(wrap_pyfunction!(set_num_threads_py, m)?)?;
+    m.add_function(wrap_pyfunction!(num_threads_py, m)?)?;
+    m.add_function(wrap_pyfunction!(sign_with_packages_py, m)?)?;
+    m.add_class::<PyKeyPackage>()?;
+    m.add_class::<PyPublicKeyPackage>()?;
+    m.add_function(wrap_pyfunction!(round1_commit_py, m)?)?;
+    m.add_function(wrap_pyfunction!(set_timing_enabled_py, m)?)?;
+    m.add_function(wrap_pyfunction!(phase_timings_py, m)?)?;
+    m.add_function(wrap_pyfunction!(round2_sign_py, m)?)?;
+    m.add_function(wrap_pyfunction!(aggregate_py, m)?)?;
+    m.add_function(wrap_pyfunction!(verify_signature_share_py, m)?)?;
+    m.add_function(wrap_pyfunction!(sign_event_id_py, m)?)?;
+    m.add_function(wrap_pyfunction!(verify_event_signature_py, m)?)?;
+    m.add_class::<SigningSession>()?;
+    m.add_class::<PySigningNonces>()?;
     Ok(())
 }
\ No newline at end of file
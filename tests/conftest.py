@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The modules live at the repository root and use paths relative to the
+# working directory (keys/, note_contents.db), so tests chdir into tmp_path.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,90 @@
+import os
+import json
+import stat
+import pytest
+
+import keystore
+from keystore import Keystore, KeystoreError, write_keystore
+
+def scalar(value):
+    return value.to_bytes(keystore.SCALAR_SIZE, "big")
+
+SHARES = [(participant_id, scalar(participant_id), scalar(1000 + participant_id)) for participant_id in (7, 1, 42, 3, 19)]
+PUBKEY_PACKAGE = b"serialized public key package"
+
+@pytest.fixture
+def path(tmp_path):
+    return write_keystore(str(tmp_path / "keys" / "group.keystore"), SHARES, PUBKEY_PACKAGE, 3)
+
+def test_write_then_mmap_read_round_trip(path):
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert not os.path.exists(path + ".tmp")
+    with Keystore(path) as store:
+        assert (store.count, store.min_signers, store.version) == (5, 3, keystore.VERSION)
+        assert store.ciphersuite == "FROST-secp256k1-SHA256-v1"
+        assert store.pubkey_package_bytes() == PUBKEY_PACKAGE
+        for participant_id, identifier, signing_share in SHARES:
+            assert store.share_record(participant_id) == (identifier, signing_share)
+
+def test_index_is_sorted_and_searched(path):
+    with Keystore(path) as store:
+        assert store.participant_ids() == [1, 3, 7, 19, 42]
+        assert 19 in store and "42" in store
+        for missing in (0, 2, 20, 43, 10 ** 6):
+            assert missing not in store
+        with pytest.raises(KeyError):
+            store.share_record(2)
+
+def test_rejects_shares_that_are_not_scalars(tmp_path):
+    with pytest.raises(KeystoreError):
+        write_keystore(str(tmp_path / "bad.keystore"), [(1, b"short", scalar(1))], PUBKEY_PACKAGE, 1)
+
+def patch_header(path, **fields):
+    names = ["magic", "version", "ciphersuite", "count", "min_signers", "record_size",
+             "index_offset", "records_offset", "pubkey_offset", "pubkey_length"]
+    with open(path, "r+b") as f:
+        header = dict(zip(names, keystore.HEADER.unpack(f.read(keystore.HEADER.size))))
+        header.update(fields)
+        f.seek(0)
+        f.write(keystore.HEADER.pack(*(header[name] for name in names)))
+
+@pytest.mark.parametrize("fields, message", [
+    ({"magic": b"NOTAKEYS"}, "not a FROST keystore"),
+    ({"version": keystore.VERSION + 1}, "Unsupported keystore version"),
+    ({"ciphersuite": 99}, "Unknown ciphersuite"),
+    ({"record_size": keystore.RECORD_SIZE + 1}, "Unexpected record size"),
+])
+def test_rejects_bad_headers(path, fields, message):
+    patch_header(path, **fields)
+    with pytest.raises(KeystoreError, match=message):
+        Keystore(path)
+
+def test_rejects_truncated_file(tmp_path):
+    path = tmp_path / "short.keystore"
+    path.write_bytes(keystore.MAGIC)
+    with pytest.raises(KeystoreError, match="too short"):
+        Keystore(str(path))
+
+def test_converters_match_share_files(tmp_path, monkeypatch):
+    frostpy = pytest.importorskip("frostpy")
+    from keygen import generate_and_store_shares
+    monkeypatch.chdir(tmp_path)
+    generate_and_store_shares(3, 2)
+    share_files = {pid: json.loads((tmp_path / "keys" / str(pid) / "secret_share.txt").read_text())
+                   for pid in (1, 2, 3)}
+    bundle = (tmp_path / "keys" / "group_key_bundle.txt").read_text().strip()
+
+    assert keystore.import_legacy_layout("keys", "group.keystore") == 3
+    with Keystore("group.keystore") as store:
+        assert store.participant_ids() == [1, 2, 3]
+        assert store.min_signers == 2
+        for pid, share in share_files.items():
+            assert store.share_record(pid) == (bytes.fromhex(share["identifier"]),
+                                               bytes.fromhex(share["signing_share"]))
+        key_package = store.load_key_package(1)
+        assert key_package.identifier == frostpy.KeyPackage.from_json(json.dumps(share_files[1])).identifier
+
+    assert keystore.export_legacy_layout("group.keystore", "exported") == 3
+    for pid, share in share_files.items():
+        assert json.loads((tmp_path / "exported" / str(pid) / "secret_share.txt").read_text()) == share
+    assert (tmp_path / "exported" / "group_key_bundle.txt").read_text() == bundle
@@ -0,0 +1,37 @@
+import os
+import pytest
+
+pytest.importorskip("frostpy")
+
+import required_shares_sign_event as signing
+from keygen import generate_and_store_shares
+
+@pytest.fixture
+def share_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(signing, "_signing_sessions", type(signing._signing_sessions)())
+    generate_and_store_shares(3, 2)
+    return [os.path.join("keys", str(i), "secret_share.txt") for i in (1, 2)]
+
+def test_refill_fills_pools_of_cached_sessions(share_paths):
+    session = signing.get_signing_session(share_paths, 2)
+    assert session.metrics()["available"] == 0
+
+    signing.refill_nonce_pools()
+
+    metrics = session.metrics()
+    assert metrics["available"] == metrics["pool_capacity"] == signing.NONCE_POOL_CAPACITY
+    assert metrics["refills"] == 1
+
+    assert signing.required_shares_sign_event("pre-warmed", share_paths, 2)
+    metrics = session.metrics()
+    assert metrics["pool_misses"] == 0
+    assert metrics["available"] == signing.NONCE_POOL_CAPACITY - 1
+
+def test_signing_sessions_are_bounded(share_paths, monkeypatch):
+    monkeypatch.setattr(signing, "SIGNING_SESSION_CACHE_SIZE", 2)
+    signing.get_signing_session(share_paths, 2)
+    signing.get_signing_session(share_paths[::-1], 2)
+    signing.get_signing_session(share_paths + [os.path.join("keys", "3", "secret_share.txt")], 2)
+    assert len(signing._signing_sessions) == 2
+    assert (tuple(share_paths), 2) not in signing._signing_sessions
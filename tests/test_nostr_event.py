@@ -0,0 +1,55 @@
+import json
+import base64
+import hashlib
+import pytest
+
+frostpy = pytest.importorskip("frostpy")
+
+from nostr_event import event_id, nostr_pubkey, unsigned_text_note, verify_event
+
+# BIP-340 test vector 0: secret key 3, 32 zero bytes signed with zero aux randomness.
+BIP340_PUBKEY = "f9308a019258c31049344f85f89d5229b531c845836f99b08601f113bce036f9"
+BIP340_MESSAGE = bytes(32)
+BIP340_SIGNATURE = ("e907831f80848d1069a5371b402410364bdf1c5f8307b0084c55f1ce2dca8215"
+                    "25f66a4a85ea8b71e482a74f382d2ce5ebeee8fdb2172f477df4900d310536c0")
+
+def new_group(odd_y, attempts=64):
+    """(verifying key, key packages, public key package) for a fresh 2-of-3 group with the given y parity."""
+    for _ in range(attempts):
+        group = json.loads(frostpy.generate_keys_py(3, 2))
+        verifying_key = group["group_verifying_key"]
+        if base64.b64decode(verifying_key)[0] == (3 if odd_y else 2):
+            key_packages = [frostpy.KeyPackage.from_json(json.dumps(share["share"])) for share in group["shares"][:2]]
+            return verifying_key, key_packages, frostpy.PublicKeyPackage.from_base64(group["group_public_key"])
+    pytest.fail(f"No group key with {'odd' if odd_y else 'even'} y in {attempts} tries")
+
+def sign_text_note(content, group, created_at=1700000000):
+    verifying_key, key_packages, pubkey_package = group
+    event = unsigned_text_note(content, nostr_pubkey(verifying_key), created_at)
+    event["sig"] = frostpy.sign_event_id_py(bytes.fromhex(event["id"]), key_packages, 2, pubkey_package)
+    return event
+
+def test_event_id_follows_nip01_serialization():
+    # NIP-01: compact JSON, UTF-8 kept as is, quotes and newlines escaped.
+    content = 'hello "nostr"\n\u2713'
+    serialized = ('[0,"f9308a019258c31049344f85f89d5229b531c845836f99b08601f113bce036f9",1700000000,1,'
+                  '[["t","frost"]],"hello \\"nostr\\"\\n\u2713"]')
+    assert event_id(BIP340_PUBKEY, 1700000000, 1, [["t", "frost"]], content) == \
+        "61f356fad88180965c6b173573832ba29e2d88f6f1174503ceb3f5a91657d263"
+    assert unsigned_text_note(content, BIP340_PUBKEY, 1700000000, [["t", "frost"]])["id"] == \
+        hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+def test_bip340_vector_verifies():
+    assert frostpy.verify_event_signature_py(BIP340_MESSAGE, BIP340_SIGNATURE, BIP340_PUBKEY)
+    assert not frostpy.verify_event_signature_py(bytes([1]) + BIP340_MESSAGE[1:], BIP340_SIGNATURE, BIP340_PUBKEY)
+
+@pytest.mark.parametrize("odd_y", [False, True])
+def test_group_signed_event_verifies(odd_y):
+    group = new_group(odd_y)
+    event = sign_text_note("signed by the group", group)
+    pubkey = nostr_pubkey(group[0])
+    assert event["pubkey"] == pubkey and len(pubkey) == 64
+    assert verify_event(event, pubkey)
+    assert not verify_event(event, BIP340_PUBKEY)
+    assert not verify_event({**event, "content": "tampered"})
+    assert not verify_event({key: value for key, value in event.items() if key != "sig"})
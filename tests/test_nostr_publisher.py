@@ -0,0 +1,97 @@
+import os
+import asyncio
+import pytest
+
+pytest.importorskip("frostpy")
+nostr_sdk = pytest.importorskip("nostr_sdk")
+
+import nostr
+from local_relay import LocalRelay
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("NOSTR_PRIVATE_KEY", raising=False)
+
+async def publish_all(publisher, notes):
+    futures = [await publisher.publish(note, "c2ln") for note in notes]
+    return [await future for future in futures]
+
+def test_publish_queue_is_bounded_and_delivers_in_order():
+    async def run():
+        async with LocalRelay(port=0, delay=0.01) as relay:
+            async with nostr.NostrPublisher([relay.url], queue_size=2, concurrency=1) as publisher:
+                futures = []
+                for i in range(6):
+                    futures.append(await publisher.publish(f"note {i}", "c2ln"))
+                    assert publisher.queue.qsize() <= 2
+                results = [await future for future in futures]
+            return relay, publisher, results
+
+    relay, publisher, results = asyncio.run(run())
+    assert all(result["relays"] == {relay.url: True} for result in results)
+    assert [event["content"].split("\n")[0] for event in relay.events] == [f"note {i}" for i in range(6)]
+    assert publisher.report()[relay.url]["sent"] == 6
+
+def test_stats_are_kept_per_relay(monkeypatch):
+    monkeypatch.setattr(nostr, "RECONNECT_BACKOFF_MIN", 0.01)
+
+    async def run():
+        async with LocalRelay(port=0) as good, LocalRelay(port=0, failure_rate=1.0) as bad:
+            async with nostr.NostrPublisher([good.url, bad.url], concurrency=1) as publisher:
+                results = await publish_all(publisher, ["a", "b"])
+            return good, bad, publisher, results
+
+    good, bad, publisher, results = asyncio.run(run())
+    assert all(result["relays"] == {good.url: True, bad.url: False} for result in results)
+    report = publisher.report()
+    assert report[good.url]["sent"] == 2 and report[good.url]["failed"] == 0
+    assert report[bad.url]["sent"] == 0 and report[bad.url]["failed"] == 2
+    assert report[bad.url]["last_error"]
+    assert len(good.events) == 2 and not bad.events
+
+def test_failing_relay_is_reconnected_with_backoff(monkeypatch):
+    monkeypatch.setattr(nostr, "RECONNECT_BACKOFF_MIN", 0.01)
+
+    async def run():
+        async with LocalRelay(port=0, failure_rate=1.0) as relay:
+            async with nostr.NostrPublisher([relay.url], concurrency=1) as publisher:
+                await publish_all(publisher, ["a"])
+                stats = publisher.stats[relay.url]
+                first_backoff = stats.backoff
+                await publish_all(publisher, ["b"])
+                second_backoff = stats.backoff
+                relay.failure_rate = 0.0
+                await publish_all(publisher, ["c"])
+            return relay, stats, first_backoff, second_backoff
+
+    relay, stats, first_backoff, second_backoff = asyncio.run(run())
+    assert first_backoff == 0.01
+    assert second_backoff == 0.02
+    assert stats.reconnects == 2
+    assert stats.backoff == 0.0
+    assert [event["content"].split("\n")[0] for event in relay.events] == ["c"]
+
+def test_backoff_is_capped(monkeypatch):
+    monkeypatch.setattr(nostr, "RECONNECT_BACKOFF_MAX", 0.5)
+    stats = nostr.RelayStats("ws://relay")
+    for _ in range(10):
+        stats.record(False, 0.0, "down")
+    assert stats.backoff == 0.5
+    stats.record(True, 0.01)
+    assert stats.backoff == 0.0
+
+def test_private_key_comes_from_env_then_file(monkeypatch):
+    env_key = nostr_sdk.Keys.generate()
+    file_key = nostr_sdk.Keys.generate()
+    monkeypatch.setenv("NOSTR_PRIVATE_KEY", env_key.secret_key().to_bech32())
+    assert nostr.configured_private_key() == env_key.secret_key().to_bech32()
+
+    monkeypatch.delenv("NOSTR_PRIVATE_KEY")
+    assert nostr.configured_private_key() == nostr.DEV_NOSTR_PRIVATE_KEY
+
+    os.makedirs(nostr.SECRETS_DIR)
+    with open(nostr.NOSTR_KEY_FILE, "w") as f:
+        f.write(file_key.secret_key().to_bech32() + "\n")
+    publisher = nostr.NostrPublisher(["ws://127.0.0.1:1"])
+    assert publisher.keys.public_key().to_bech32() == file_key.public_key().to_bech32()
@@ -0,0 +1,86 @@
+import os
+import sys
+import types
+import pytest
+
+import cli
+import signature_ledger
+from note_store import NoteStore
+
+GROUP_KEY = "Z3JvdXAga2V5"
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with NoteStore() as store:
+        yield store
+
+@pytest.fixture
+def cli_workdir(tmp_path, monkeypatch):
+    """A directory with a group key and a fresh default ledger, where loading the signing code fails the test."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(signature_ledger, "_default_ledger", None)
+    signing = types.ModuleType("required_shares_sign_event")
+
+    def no_signing(name):
+        raise AssertionError(f"submit must not sign (required_shares_sign_event.{name})")
+    signing.__getattr__ = no_signing
+    monkeypatch.setitem(sys.modules, "required_shares_sign_event", signing)
+    os.makedirs("keys")
+    with open(cli.PUBLIC_KEY_FILE, "w") as f:
+        f.write(GROUP_KEY + "\n")
+    yield
+    if signature_ledger._default_ledger is not None:
+        signature_ledger._default_ledger.close()
+
+def test_resubmitted_note_attaches_to_the_same_id(store):
+    note_id, created = store.submit_note("hello", GROUP_KEY)
+    assert created
+    assert store.submit_note("hello", GROUP_KEY) == (note_id, False)
+    assert store.count("pending") == 1
+
+    with NoteStore() as other:
+        # A fresh process has an empty cache and finds the note in the table.
+        assert other.submit_note("hello", GROUP_KEY) == (note_id, False)
+        assert other.dedup["cache_hits"] == 0
+
+def test_same_content_under_another_group_key_is_a_new_note(store):
+    first, _ = store.submit_note("hello", GROUP_KEY)
+    second, created = store.submit_note("hello", "b3RoZXIga2V5")
+    assert created and second != first
+    assert store.submit_note("hello", "")[1]
+
+def test_dedup_stats_count_hits(store):
+    for note_content in ["a", "b", "a", "a", "b"]:
+        store.submit_note(note_content, GROUP_KEY)
+    stats = store.dedup_stats()
+    assert (stats["unique"], stats["duplicates"], stats["hit_rate"]) == (2, 3, 0.6)
+    assert stats["session"] == {"submitted": 5, "duplicates": 3, "cache_hits": 3}
+    assert stats["cache_size"] == 2
+
+def test_digest_cache_is_bounded(store):
+    store.digest_cache_size = 2
+    ids = [store.submit_note(f"note {i}", GROUP_KEY)[0] for i in range(3)]
+    assert store.dedup_stats()["cache_size"] == 2
+    # The oldest digest was evicted, so it is found in the table instead of the cache.
+    assert store.submit_note("note 0", GROUP_KEY) == (ids[0], False)
+    assert store.dedup["cache_hits"] == 0
+    assert store.submit_note("note 2", GROUP_KEY) == (ids[2], False)
+    assert store.dedup["cache_hits"] == 1
+
+def test_cli_submit_attaches_to_pending_note(cli_workdir, capsys):
+    note_id, signature = cli.submit_note_content("hello")
+    assert signature is None
+    assert cli.submit_note_content("hello") == (note_id, None)
+    assert f"Duplicate of pending message ID {note_id}" in capsys.readouterr().out
+
+def test_cli_submit_returns_the_ledger_signature_of_a_signed_note(cli_workdir, capsys):
+    note_id, _ = cli.submit_note_content("hello")
+    with NoteStore() as store:
+        store.set_status(note_id, "broadcasted")
+    signature_ledger.default_ledger().append("hello", "c2lnbmF0dXJl")
+
+    assert cli.submit_note_content("hello") == (note_id, "c2lnbmF0dXJl")
+    assert "Already signed as message ID" in capsys.readouterr().out
+    with NoteStore() as store:
+        assert store.count() == 1
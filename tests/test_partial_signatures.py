@@ -0,0 +1,97 @@
+import os
+import stat
+import pytest
+
+pytest.importorskip("frostpy")
+
+import partial_signatures
+from partial_signatures import NonceVault, contribute, finalize
+from note_store import NoteStore
+from keygen import generate_and_store_shares
+from verify_note_signature import verify_note_signature, read_public_key
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_and_store_shares(4, 3)
+    with NoteStore() as store:
+        yield store
+
+def frozen_note(store):
+    """A note whose signer set 1, 2, 3 is fixed and where only share 3 has signed."""
+    note_id = store.add_note("partial note")
+    assert [contribute(store, note_id, share) for share in (1, 2, 3)] == ["committed", "committed", "signed"]
+    return note_id
+
+def age_signer_set(store, note_id, seconds):
+    with store.conn:
+        store.conn.execute("UPDATE notes SET signer_set_at = signer_set_at - ? WHERE id = ?", (seconds, note_id))
+
+def test_vault_keeps_nonces_until_taken(store):
+    vault = NonceVault("1")
+    nonces, _ = partial_signatures.round1_commit_py(partial_signatures.load_key_package(
+        partial_signatures.share_path_for("1")))
+    vault.put(7, nonces)
+    assert stat.S_IMODE(os.stat(vault.path).st_mode) == 0o600
+    assert NonceVault("1").take(7).to_bytes() == nonces.to_bytes()
+    assert vault.take(7) is None
+
+def test_signer_set_signs_and_finalizes(store):
+    note_id = frozen_note(store)
+    note = store.get_note(note_id)
+    assert note["signer_set"] == ["1", "2", "3"]
+    assert finalize(store, note) is None
+    assert contribute(store, note_id, 4) == "not_selected"
+    assert [contribute(store, note_id, share) for share in (1, 2)] == ["signed", "signed"]
+    assert contribute(store, note_id, 1) == "done"
+
+    signature = finalize(store, store.get_note(note_id))
+    assert verify_note_signature("partial note", signature, read_public_key())
+
+def test_freeze_keeps_the_first_set(store):
+    note_id = store.add_note("race")
+    assert store.freeze_signer_set(note_id, ["1", "2", "3"]) == ["1", "2", "3"]
+    assert store.freeze_signer_set(note_id, ["2", "3", "4"]) == ["1", "2", "3"]
+
+def test_incomplete_set_is_reset_after_timeout(store):
+    note_id = frozen_note(store)
+    assert contribute(store, note_id, 4) == "not_selected"
+    age_signer_set(store, note_id, partial_signatures.SIGNER_SET_TIMEOUT + 1)
+
+    assert contribute(store, note_id, 4) == "committed"
+    note = store.get_note(note_id)
+    assert note["signer_set"] is None and note["note_signatures"] == []
+    assert [share for share, _, _ in store.commitments(note_id)] == ["4"]
+
+def test_expire_signer_sets_resets_stuck_notes(store):
+    note_id = frozen_note(store)
+    assert partial_signatures.expire_signer_sets(store) == []
+    age_signer_set(store, note_id, partial_signatures.SIGNER_SET_TIMEOUT + 1)
+    assert partial_signatures.expire_signer_sets(store) == [note_id]
+    assert store.get_note(note_id)["signer_set"] is None
+
+def test_member_without_nonces_resets_the_set(store):
+    note_id = frozen_note(store)
+    NonceVault("1").take(note_id)
+    assert contribute(store, note_id, 1) == "missing_nonce"
+    note = store.get_note(note_id)
+    assert note["signer_set"] is None and note["note_signatures"] == []
+    assert store.commitments(note_id) == []
+
+def test_share_signed_for_a_reset_set_is_not_stored(store, monkeypatch):
+    note_id = frozen_note(store)
+    round2_sign = partial_signatures.round2_sign_py
+
+    def reset_while_signing(*args):
+        # Another process resets the set after this share took its nonces.
+        with NoteStore() as other:
+            assert other.reset_signer_set(note_id)
+        return round2_sign(*args)
+
+    monkeypatch.setattr(partial_signatures, "round2_sign_py", reset_while_signing)
+    assert contribute(store, note_id, 1) == "stale"
+    monkeypatch.setattr(partial_signatures, "round2_sign_py", round2_sign)
+    assert store.get_note(note_id)["note_signatures"] == []
+    assert note_id in store.pending_ids_without_share("1")
+    # Share 1 is not treated as done, so it can join the next signer set.
+    assert contribute(store, note_id, 1) == "committed"
@@ -0,0 +1,124 @@
+import json
+import asyncio
+import hashlib
+import pytest
+
+frostpy = pytest.importorskip("frostpy")
+
+import relay_ingest
+from metrics import metrics
+from nostr_event import nostr_pubkey, unsigned_text_note
+
+def new_group():
+    """(verifying key, sign(message) -> signature_b64) for a fresh 2-of-3 group."""
+    group = json.loads(frostpy.generate_keys_py(3, 2))
+    shares_json = json.dumps([share["share"] for share in group["shares"][:2]])
+    return group["group_verifying_key"], lambda message: frostpy.sign_message_py(
+        message, shares_json, 2, group["group_public_key"])[0]
+
+def new_event_group():
+    """(verifying key, sign(content) -> event) for a group that signs Nostr events under its own pubkey."""
+    group = json.loads(frostpy.generate_keys_py(3, 2))
+    key_packages = [frostpy.KeyPackage.from_json(json.dumps(share["share"])) for share in group["shares"][:2]]
+    pubkey_package = frostpy.PublicKeyPackage.from_base64(group["group_public_key"])
+
+    def sign(content, created_at=1700000000):
+        event = unsigned_text_note(content, nostr_pubkey(group["group_verifying_key"]), created_at)
+        event["sig"] = frostpy.sign_event_id_py(bytes.fromhex(event["id"]), key_packages, 2, pubkey_package)
+        return event
+    return group["group_verifying_key"], sign
+
+def frost_event(note_content, signature_b64, created_at=1700000000):
+    content = f"{note_content}{relay_ingest.SIGNATURE_MARKER}{signature_b64}"
+    return {"id": hashlib.sha256(content.encode()).hexdigest(), "kind": 1, "created_at": created_at,
+            "content": content}
+
+def counter(counter_name, **labels):
+    return sum(value for (name, key), value in metrics.counters.items()
+               if name == counter_name and dict(key) == labels)
+
+@pytest.fixture
+def groups(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return new_group(), new_group()
+
+def test_dump_is_indexed_and_foreign_keys_share_one_label(groups, tmp_path):
+    (own_key, own_sign), (_, foreign_sign) = groups
+    events = [frost_event(f"note {i}", own_sign(f"note {i}")) for i in range(3)]
+    events.append(frost_event("forged", foreign_sign("forged")))
+    events.append(frost_event("other group", foreign_sign("other group")))
+    events.append({"id": "00" * 32, "kind": 1, "content": "plain note"})
+    dump = tmp_path / "events.jsonl"
+    with open(dump, "w") as f:
+        for i, event in enumerate(events):
+            # Mix bare events and relay EVENT messages, as dumps contain both.
+            f.write(json.dumps(["EVENT", "sub", event] if i % 2 else event) + "\n")
+    foreign_before = counter("ingest_events", result="foreign_key")
+
+    report = asyncio.run(relay_ingest.ingest(relay_ingest.dump_source(str(dump)), [own_key], batch_size=2))
+
+    assert (report["notes"], report["valid"], report["invalid"], report["not_frost"]) == (5, 3, 2, 1)
+    assert counter("ingest_events", result="foreign_key") - foreign_before == 2
+    records = {record[0].hex(): record for record in relay_ingest.IngestIndex().records()}
+    own_id = relay_ingest.key_id(own_key)
+    for event in events[:3]:
+        assert records[event["id"]][1:] == (own_id, event["created_at"], relay_ingest.STATUS_VALID)
+    for event in events[3:5]:
+        assert records[event["id"]][1::2] == (relay_ingest.NO_KEY, relay_ingest.STATUS_INVALID)
+
+    again = asyncio.run(relay_ingest.ingest(relay_ingest.dump_source(str(dump)), [own_key]))
+    assert (again["duplicates"], again["notes"], again["indexed"]) == (5, 0, 5)
+
+def test_notes_published_to_local_relay_are_ingested(groups):
+    pytest.importorskip("nostr_sdk")
+    from nostr import NostrPublisher, DEV_NOSTR_PRIVATE_KEY
+    from local_relay import LocalRelay
+    (own_key, own_sign), (_, foreign_sign) = groups
+    notes = [(f"relay note {i}", own_sign(f"relay note {i}")) for i in range(4)]
+    notes.append(("foreign", foreign_sign("foreign")))
+
+    async def run():
+        async with LocalRelay(port=0) as relay:
+            async with NostrPublisher([relay.url], private_key=DEV_NOSTR_PRIVATE_KEY) as publisher:
+                for future in [await publisher.publish(*note) for note in notes]:
+                    await future
+            report = await relay_ingest.ingest(relay_ingest.relay_source([relay.url]), [own_key], duration=1.0)
+            return relay, report
+
+    relay, report = asyncio.run(run())
+    assert len(relay.events) == 5
+    assert (report["notes"], report["valid"], report["invalid"]) == (5, 4, 1)
+    statuses = {record[0].hex(): record[3] for record in relay_ingest.IngestIndex().records()}
+    assert sorted(statuses.values()) == [relay_ingest.STATUS_INVALID] + [relay_ingest.STATUS_VALID] * 4
+
+def test_events_signed_with_a_group_pubkey_are_verified(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    group_key, sign = new_event_group()
+    events = [sign(f"group note {i}", 1700000000 + i) for i in range(2)]
+    events.append({**sign("original"), "content": "tampered"})
+    events.append({"id": "11" * 32, "pubkey": "22" * 32, "kind": 1, "content": "someone else"})
+    dump = tmp_path / "events.jsonl"
+    dump.write_text("".join(json.dumps(event) + "\n" for event in events))
+
+    report = asyncio.run(relay_ingest.ingest(relay_ingest.dump_source(str(dump)), [group_key]))
+
+    assert (report["notes"], report["valid"], report["invalid"], report["not_frost"]) == (3, 2, 1, 1)
+    records = {record[0].hex(): record for record in relay_ingest.IngestIndex().records()}
+    for event in events[:2]:
+        assert records[event["id"]][1:] == (relay_ingest.key_id(group_key), event["created_at"],
+                                            relay_ingest.STATUS_VALID)
+    assert records[events[2]["id"]][3] == relay_ingest.STATUS_INVALID
+
+def test_each_note_counts_one_verification_whatever_the_number_of_keys(groups, tmp_path):
+    (own_key, own_sign), (other_key, _) = groups
+    _, stranger_sign = new_group()
+    dump = tmp_path / "events.jsonl"
+    dump.write_text(json.dumps(frost_event("mine", own_sign("mine"))) + "\n" +
+                    json.dumps(frost_event("stranger", stranger_sign("stranger"))) + "\n")
+    before = counter("verifications", result="valid"), counter("verifications", result="invalid")
+
+    report = asyncio.run(relay_ingest.ingest(relay_ingest.dump_source(str(dump)), [other_key, own_key]))
+
+    assert (report["valid"], report["invalid"]) == (1, 1)
+    assert counter("verifications", result="valid") - before[0] == 1
+    assert counter("verifications", result="invalid") - before[1] == 1
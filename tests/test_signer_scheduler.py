@@ -0,0 +1,81 @@
+import os
+import asyncio
+from datetime import datetime
+import pytest
+
+from signer_scheduler import SignerScheduler, FAILURE_BACKOFF_MIN
+
+NOW = datetime(2026, 1, 5, 12, 0).timestamp()
+
+def measured_scheduler(latencies):
+    scheduler = SignerScheduler()
+    for name, latency in latencies.items():
+        scheduler.profile(name).record(True, latency, now=NOW)
+    return scheduler
+
+def test_signers_are_ranked_cheapest_first_and_unmeasured_last():
+    scheduler = measured_scheduler({"a": 0.3, "b": 0.1, "c": 0.2})
+    assert scheduler.rank(["a", "b", "c", "new"], NOW) == ["b", "c", "a", "new"]
+
+def test_backing_off_signer_is_ranked_last_not_dropped():
+    scheduler = measured_scheduler({"a": 0.1, "b": 0.2, "c": 0.3})
+    scheduler.profile("a").record(False, now=NOW)
+    assert not scheduler.profile("a").available(NOW)
+    assert scheduler.rank(["a", "b", "c"], NOW) == ["b", "c", "a"]
+    assert scheduler.rank(["a", "b", "c"], NOW + FAILURE_BACKOFF_MIN + 1) == ["a", "b", "c"]
+
+def test_choose_falls_back_to_backing_off_signers_only_when_needed():
+    scheduler = measured_scheduler({"a": 0.1, "b": 0.2, "c": 0.3, "d": 0.4})
+    scheduler.profile("a").record(False, now=NOW)
+    assert scheduler.choose(["a", "b", "c", "d"], 3, hedge=1, now=NOW) == (["b", "c", "d"], [])
+    assert scheduler.choose(["a", "b", "c"], 3, hedge=1, now=NOW) == (["b", "c", "a"], [])
+    assert scheduler.choose(["b", "c", "d"], 2, hedge=1, now=NOW) == (["b", "c"], ["d"])
+
+def test_sign_window_is_checked_at_the_given_time():
+    scheduler = measured_scheduler({"a": 0.1, "b": 0.2})
+    scheduler.set_window("a", "09:00", "17:00")
+    early = datetime(2026, 1, 5, 8, 0).timestamp()
+    assert scheduler.profile("a").available(NOW)
+    assert not scheduler.profile("a").available(early)
+    assert scheduler.choose(["a", "b"], 2, now=early) == (["b"], [])
+
+def test_profiles_survive_save_and_load(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    scheduler = measured_scheduler({"a": 0.1})
+    scheduler.set_window("a", "09:00", "17:00")
+    scheduler.record_failure("b")
+    scheduler.save(path)
+    loaded = SignerScheduler(path=path)
+    assert loaded.profile("a").as_dict() == scheduler.profile("a").as_dict()
+    assert loaded.profile("b").consecutive_failures == 1
+
+def sign_with_backed_off_signer(shares, threshold):
+    """Sign once after the first participant failed; returns each participant's signature count."""
+    from keygen import generate_and_store_shares
+    from required_shares_sign_event import load_key_package, load_public_key_package
+    from network_signing import ParticipantServer, Coordinator
+    generate_and_store_shares(shares, threshold)
+    addresses = [f"unix:p{i}.sock" for i in range(1, shares + 1)]
+
+    async def run():
+        servers = [await ParticipantServer(load_key_package(os.path.join("keys", str(i), "secret_share.txt")),
+                                           address).start() for i, address in enumerate(addresses, 1)]
+        try:
+            async with Coordinator(addresses, load_public_key_package(), threshold, timeout=5) as coordinator:
+                coordinator.scheduler.record_failure(coordinator.connections[0].identifier)
+                assert await coordinator.sign("backed off")
+        finally:
+            for server in servers:
+                await server.close()
+        return [server.stats["signatures"] for server in servers]
+    return asyncio.run(run())
+
+def test_coordinator_skips_backing_off_signer_when_others_suffice(tmp_path, monkeypatch):
+    pytest.importorskip("frostpy")
+    monkeypatch.chdir(tmp_path)
+    assert sign_with_backed_off_signer(4, 3) == [0, 1, 1, 1]
+
+def test_coordinator_uses_backing_off_signer_to_reach_threshold(tmp_path, monkeypatch):
+    pytest.importorskip("frostpy")
+    monkeypatch.chdir(tmp_path)
+    assert sign_with_backed_off_signer(3, 3) == [1, 1, 1]
@@ -0,0 +1,56 @@
+import io
+import json
+import pytest
+
+pytest.importorskip("frostpy")
+
+import verify_note_signature as verifying
+from signature_ledger import SignatureLedger
+
+RECORDS = [{"note_content": f"note {i}, with [brackets] and \"quotes\"", "signature": f"sig{i}"} for i in range(50)]
+
+def test_json_lines_log(tmp_path):
+    path = tmp_path / "signatures.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in RECORDS) + "\nnot json\n")
+    assert list(verifying.iter_log_records(str(path))) == RECORDS
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_json_array_log_is_streamed(tmp_path, monkeypatch, indent):
+    # A chunk far smaller than one record forces records to span reads.
+    monkeypatch.setattr(verifying, "LOG_READ_CHUNK", 7)
+    path = tmp_path / "note_signatures.txt"
+    path.write_text("\n  " + json.dumps(RECORDS, indent=indent) + "\n")
+    assert list(verifying.iter_log_records(str(path))) == RECORDS
+
+def test_empty_and_truncated_json_array_logs(tmp_path):
+    path = tmp_path / "note_signatures.txt"
+    path.write_text("[]")
+    assert list(verifying.iter_log_records(str(path))) == []
+    path.write_text(json.dumps(RECORDS[:2])[:-20])
+    assert list(verifying.iter_log_records(str(path))) == RECORDS[:1]
+
+def test_corrupt_json_array_log_stops_reading(tmp_path, monkeypatch, capsys):
+    text = json.dumps(RECORDS[:2])[:-1] + ', {"note_content": oops}, ' + json.dumps(RECORDS * 20)[1:]
+    f = io.StringIO(text[1:])
+    assert list(verifying._iter_json_array(f, 7, 256)) == RECORDS[:2]
+    assert "malformed log array" in capsys.readouterr().out
+    # It gave up after about max_record_size characters instead of reading to the end.
+    assert f.tell() < len(text) // 10
+
+    monkeypatch.setattr(verifying, "LOG_READ_CHUNK", 7)
+    monkeypatch.setattr(verifying, "LOG_MAX_RECORD_SIZE", 256)
+    path = tmp_path / "note_signatures.txt"
+    path.write_text(text)
+    assert list(verifying.iter_log_records(str(path))) == RECORDS[:2]
+
+def test_legacy_array_log_is_imported_into_the_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(verifying, "LOG_READ_CHUNK", 7)
+    path = tmp_path / "note_signatures.txt"
+    legacy = [{"note_content": "old", "note_signature": "sig-old"}] + RECORDS
+    path.write_text(json.dumps(legacy, indent=2))
+    with SignatureLedger(str(tmp_path / "ledger"), legacy_path=str(path)) as ledger:
+        records = list(ledger.iter_records())
+        assert [(r["note_content"], r["signature"]) for r in records] == \
+            [("old", "sig-old")] + [(r["note_content"], r["signature"]) for r in RECORDS]
+        assert ledger.find("note 3, with [brackets] and \"quotes\"")["signature"] == "sig3"
+    assert not path.exists() and (tmp_path / "note_signatures.txt.migrated").exists()
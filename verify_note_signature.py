@@ -1,22 +1,195 @@
 import os
+import re
 import json
-from frostpy import verify_signature_py
+import hashlib
+import threading
+from collections import OrderedDict
+from frostpy import verify_signature_py, verify_batch_parallel_py
+from signature_ledger import default_ledger
+from metrics import metrics
+from prehash import prehash_message, is_prehash_message
+from nostr_event import nostr_pubkey, verify_event
 
 SECRETS_DIR = "keys"
 LATEST_SIGNATURE_FILE = os.path.join(SECRETS_DIR, "latest_note_signature.txt")
 PUBKEY_FILE = os.path.join(SECRETS_DIR, "public_key.txt")
+VERIFY_CHUNK_SIZE = 1000
+VERIFY_CACHE_SIZE = 4096
+VERIFY_CACHE_FILE = os.path.join(SECRETS_DIR, "verified_signatures.txt")
+VERIFY_CACHE_ENV = "FROST_VERIFY_CACHE"
+LOG_READ_CHUNK = 1 << 16
+# A log array record that still does not decode once this many characters
+# are pending is corrupt; reading on would pull the rest of the file into memory.
+LOG_MAX_RECORD_SIZE = 16 * LOG_READ_CHUNK
+_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
 
-def read_note_signature(note_content):
-    if not os.path.exists(LATEST_SIGNATURE_FILE):
-        print("❌ No signature file found.")
-        return None
-    with open(LATEST_SIGNATURE_FILE, "r") as f:
-        data = json.load(f)
-        if data["note_content"] == note_content:
-            return data["signature"]
+class VerificationCache:
+    """Bounded LRU set of (message, signature, public key) digests known to verify.
+
+    Only valid signatures are remembered, so a hit can always skip the curve
+    math and a miss falls through to a real verification. The cache is
+    dropped whenever keys/public_key.txt changes. With a path, entries are
+    also appended to a file that later processes load on first use.
+    """
+
+    def __init__(self, capacity=VERIFY_CACHE_SIZE, path=None, key_path=PUBKEY_FILE):
+        self.capacity = capacity
+        self.path = path
+        self.key_path = key_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_stamp = None
+        self._key_fingerprint = None
+        self._loaded = False
+
+    @staticmethod
+    def digest(message, signature_b64, public_key_b64):
+        if isinstance(message, str):
+            message = message.encode("utf-8")
+        h = hashlib.sha256()
+        for part in (public_key_b64.encode(), signature_b64.encode()):
+            h.update(len(part).to_bytes(8, "big"))
+            h.update(part)
+        h.update(message)
+        return h.hexdigest()
+
+    def _check_key(self):
+        try:
+            st = os.stat(self.key_path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._key_stamp and self._loaded:
+            return
+        self._key_stamp = stamp
+        fingerprint = None
+        if stamp is not None:
+            with open(self.key_path, "rb") as f:
+                fingerprint = hashlib.sha256(f.read().strip()).hexdigest()
+        if fingerprint != self._key_fingerprint or not self._loaded:
+            self._key_fingerprint = fingerprint
+            self._entries.clear()
+            self._load()
+            self._loaded = True
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            if f.readline().strip() != f"key {self._key_fingerprint}":
+                return
+            for line in f:
+                digest = line.strip()
+                if len(digest) == 64:
+                    self._entries[digest] = None
+                    self._entries.move_to_end(digest)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        if self._file_lines() > 2 * self.capacity:
+            self._rewrite()
+
+    def _file_lines(self):
+        with open(self.path, "rb") as f:
+            return sum(1 for _ in f)
+
+    def _rewrite(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f"key {self._key_fingerprint}\n")
+            f.writelines(digest + "\n" for digest in self._entries)
+        os.replace(tmp_path, self.path)
+
+    def _persist(self, digest):
+        if not self.path:
+            return
+        header = f"key {self._key_fingerprint}\n"
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                stale = f.readline() != header
+            if stale:
+                self._rewrite()
+                return
+        else:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w") as f:
+                f.write(header)
+        with open(self.path, "a") as f:
+            f.write(digest + "\n")
+
+    def contains(self, message, signature_b64, public_key_b64):
+        digest = self.digest(message, signature_b64, public_key_b64)
+        with self._lock:
+            self._check_key()
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                hit = True
+            else:
+                self.misses += 1
+                hit = False
+        metrics.inc("verify_cache", result="hit" if hit else "miss")
+        return hit
+
+    def add(self, message, signature_b64, public_key_b64):
+        """Remember a signature that verified (or that native code just produced and self-verified)."""
+        digest = self.digest(message, signature_b64, public_key_b64)
+        with self._lock:
+            self._check_key()
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                return
+            self._entries[digest] = None
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            self._persist(digest)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "persistent": bool(self.path),
+            }
+
+def _cache_from_env():
+    """FROST_VERIFY_CACHE=1 persists to keys/verified_signatures.txt, =<path> to that file."""
+    target = os.getenv(VERIFY_CACHE_ENV)
+    if not target:
+        return VerificationCache()
+    return VerificationCache(path=VERIFY_CACHE_FILE if target == "1" else target)
+
+verification_cache = _cache_from_env()
+
+def read_note_record(note_content):
+    """The latest signature record for a note content, or None."""
+    if os.path.exists(LATEST_SIGNATURE_FILE):
+        with open(LATEST_SIGNATURE_FILE, "r") as f:
+            data = json.load(f)
+            if data["note_content"] == note_content:
+                return data
+    record = default_ledger().find(note_content)
+    if record:
+        return record
     print("❌ No matching signature for provided message.")
     return None
 
+def read_note_signature(note_content):
+    record = read_note_record(note_content)
+    return record["signature"] if record else None
+
 def read_public_key():
     if not os.path.exists(PUBKEY_FILE):
         print("❌ Public key file not found.")
@@ -24,9 +197,148 @@ def read_public_key():
     with open(PUBKEY_FILE, "r") as f:
         return f.read().strip()
 
-def verify_note_signature(note_content, signature_b64, public_key_b64):
+def verify_note_signature(note_content, signature_b64, public_key_b64, prehashed=False):
+    if not prehashed and is_prehash_message(note_content):
+        # Only verify_stream may check a signature over a pre-hash.
+        print("❌ Message starts with the pre-hash domain tag; verify the payload as a stream.")
+        metrics.inc("verifications", result="invalid")
+        return False
+    if verification_cache.contains(note_content, signature_b64, public_key_b64):
+        metrics.inc("verifications", result="valid")
+        return True
     try:
-        return verify_signature_py(note_content, signature_b64, public_key_b64)
+        with metrics.span("verify"):
+            is_valid = verify_signature_py(note_content, signature_b64, public_key_b64)
     except Exception as e:
         print(f"❌ Verification failed: {e}")
-        return None
\ No newline at end of file
+        metrics.inc("verifications", result="error")
+        return None
+    if is_valid:
+        verification_cache.add(note_content, signature_b64, public_key_b64)
+    metrics.inc("verifications", result="valid" if is_valid else "invalid")
+    return is_valid
+
+def verify_stream(source, signature_b64, public_key_b64):
+    """Verify a signature made by required_shares_sign_stream over a path, binary file or chunks."""
+    with metrics.span("prehash"):
+        message = prehash_message(source)
+    return verify_note_signature(message, signature_b64, public_key_b64, prehashed=True)
+
+def _iter_json_array(f, chunk_size, max_record_size):
+    """Yield the elements of a JSON array whose opening bracket was already read, a chunk at a time.
+
+    Stops at the first element that does not decode within max_record_size characters.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    while True:
+        pos = _ARRAY_SEPARATORS.match(buffer, pos).end()
+        if buffer.startswith("]", pos):
+            return
+        if pos < len(buffer):
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof or len(buffer) - pos > max_record_size:
+                    print(f"❌ Skipping the rest of a malformed log array: {e}")
+                    return
+            else:
+                yield record
+                continue
+        if eof:
+            return
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+def iter_log_records(path):
+    """Yield the records of a JSON lines log, or of a legacy log holding one JSON array."""
+    with open(path, "r") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        if first == "[":
+            yield from _iter_json_array(f, LOG_READ_CHUNK, LOG_MAX_RECORD_SIZE)
+            return
+        f.seek(0)
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"❌ Skipping malformed log line: {e}")
+
+def verify_items(items, public_key_b64, verify_batch=verify_batch_parallel_py, record_metrics=True):
+    """Verify (message, signature_b64) pairs, batch-verifying only the ones not already cached.
+
+    Raw messages that start with the pre-hash domain tag never verify. Callers
+    that try several keys per item pass record_metrics=False and count each
+    item's final outcome themselves.
+    """
+    refused = [is_prehash_message(message) for message, _ in items]
+    results = [not tagged and verification_cache.contains(message, signature, public_key_b64)
+               for (message, signature), tagged in zip(items, refused)]
+    misses = [index for index, hit in enumerate(results) if not hit and not refused[index]]
+    if misses:
+        with metrics.span("verify_batch"):
+            verified = verify_batch([items[index] for index in misses], public_key_b64)
+        for index, is_valid in zip(misses, verified):
+            results[index] = is_valid
+            if is_valid:
+                verification_cache.add(*items[index], public_key_b64)
+    if record_metrics:
+        valid = sum(results)
+        metrics.inc("verifications", valid, result="valid")
+        metrics.inc("verifications", len(results) - valid, result="invalid")
+    return results
+
+def verify_event_record(record, pubkey):
+    """A note published as a group-key Nostr event: its event must carry the note and verify."""
+    event = record["event"]
+    return (isinstance(event, dict) and event.get("content") == record["note_content"]
+            and event.get("sig") == record.get("signature") and verify_event(event, pubkey))
+
+def verify_record(record, public_key_b64):
+    """Verify one ledger record: a group-key Nostr event as an event, anything else as a FROST signature."""
+    if "event" in record:
+        is_valid = verify_event_record(record, nostr_pubkey(public_key_b64))
+        metrics.inc("verifications", result="valid" if is_valid else "invalid")
+        return is_valid
+    return verify_note_signature(record["note_content"], record.get("signature", record.get("note_signature", "")),
+                                 public_key_b64)
+
+def verify_chunk(records, public_key_b64):
+    notes = [r for r in records if "event" not in r]
+    items = [(r["note_content"], r.get("signature", r.get("note_signature", ""))) for r in notes]
+    try:
+        results = verify_items(items, public_key_b64) if items else []
+    except Exception as e:
+        print(f"❌ Batch verification failed: {e}")
+        results = [None] * len(notes)
+        metrics.inc("verifications", len(notes), result="error")
+    results = iter(results)
+    pubkey = nostr_pubkey(public_key_b64)
+    return [(r, verify_event_record(r, pubkey) if "event" in r else next(results)) for r in records]
+
+def verify_log(path=None, public_key_b64=None, chunk_size=VERIFY_CHUNK_SIZE):
+    """Yield (record, is_valid) for every signature in the ledger, or in a log at path.
+
+    A log holds JSON lines or, like the legacy note_signatures.txt, one JSON
+    array; both are streamed. Records are read lazily and verified
+    chunk_size records at a time, so the group key is parsed once per chunk
+    instead of once per note.
+    """
+    if public_key_b64 is None:
+        public_key_b64 = read_public_key()
+        if public_key_b64 is None:
+            return
+    chunk = []
+    records = iter_log_records(path) if path else default_ledger().iter_records()
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield from verify_chunk(chunk, public_key_b64)
+            chunk = []
+    if chunk:
+        yield from verify_chunk(chunk, public_key_b64)